@@ -0,0 +1,340 @@
+# admission.py
+# LLM 호출 입장 제어 (Azure OpenAI 429 폭주 방지)
+#   - 동시에 진행하는 모델 호출 수 상한 (LLM_MAX_IN_FLIGHT)
+#   - 분당 토큰 예산 (LLM_TOKENS_PER_MINUTE). 프롬프트 길이로 토큰을 추정하고 token bucket 으로 관리
+#   - 크기가 정해진 대기열 (LLM_QUEUE_SIZE). 사용자 요청 (INTERACTIVE) 이 백그라운드 작업 (BACKGROUND) 보다 먼저
+#   - 대기열이 가득 차거나 LLM_QUEUE_TIMEOUT 초 안에 차례가 오지 않으면 Overloaded -> 503 + Retry-After
+#
+# 한도는 프로세스 단위이므로 gunicorn worker 가 여럿이면 (배포 한도 / worker 수) 로 설정한다.
+# 두 한도 모두 0 이면 (기본값은 LLM_MAX_IN_FLIGHT=8) 기다리지 않고 바로 통과한다.
+#
+# 대기 시간은 llm_queue 단계 (metrics.phase_seconds) 로, 대기열 길이/진행 중 호출 수는
+# stats() 로 /metrics 에 노출된다.
+
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from dotenv import load_dotenv
+import asyncio
+import functools
+import heapq
+import itertools
+import math
+import os
+import threading
+import time
+
+import metrics
+
+load_dotenv()
+
+INTERACTIVE = 0
+BACKGROUND = 1
+PRIORITY_NAMES = {INTERACTIVE: "interactive", BACKGROUND: "background"}
+
+# 현재 요청/작업의 우선순위 (jobs.py 의 작업은 BACKGROUND 로 설정)
+_priority = ContextVar("llm_priority", default=INTERACTIVE)
+
+
+def set_priority(priority):
+    _priority.set(priority)
+
+
+class Overloaded(RuntimeError):
+    """대기열이 가득 찼거나 기다리는 시간이 너무 길어 LLM 호출을 받지 못함"""
+
+    def __init__(self, retry_after, reason="LLM is overloaded"):
+        super().__init__(reason)
+        self.retry_after = retry_after
+
+
+def estimate_tokens(text, completion_tokens=0):
+    """
+    프롬프트 토큰 수 추정 (토크나이저 없이): ASCII 는 약 4글자에 1토큰, 한글 등은 글자마다 1토큰.
+    응답 토큰 (completion_tokens) 도 예산에서 같이 뺀다.
+    """
+    ascii_chars = sum(1 for char in text if ord(char) < 128)
+    return math.ceil(ascii_chars / 4) + (len(text) - ascii_chars) + completion_tokens
+
+
+class _Waiter:
+    __slots__ = ("priority", "tokens", "enqueued", "evicted")
+
+    def __init__(self, priority, tokens, enqueued):
+        self.priority = priority
+        self.tokens = tokens
+        self.enqueued = enqueued
+        self.evicted = False
+
+
+class Slot:
+    """
+    Admission.acquire() 로 얻은 자리. release() 는 여러 번 불러도 한 번만 반납한다.
+    hedge 로 결과를 버리게 된 호출은 모델이 돌아오기 전에 자리를 먼저 반납한다 (llm.invoke).
+    """
+
+    def __init__(self, release=None):
+        self._release = release
+        self._lock = threading.Lock()
+
+    def release(self):
+        with self._lock:
+            release, self._release = self._release, None
+        if release is not None:
+            release()
+
+
+class _AdmissionState:
+    """
+    대기열/토큰 예산 계산 (Admission, AsyncAdmission 공통).
+    _ 로 시작하는 메서드는 하위 클래스가 잠금을 잡은 채로 호출한다.
+    """
+
+    def __init__(self, max_in_flight=8, tokens_per_minute=0, queue_size=32, queue_timeout=20.0,
+                 completion_tokens=200):
+        self.max_in_flight = max_in_flight
+        self.tokens_per_minute = tokens_per_minute
+        self.queue_size = queue_size
+        self.queue_timeout = queue_timeout
+        self.completion_tokens = completion_tokens
+
+        self._queue = []  # heap: (우선순위, 도착 순서, _Waiter)
+        self._order = itertools.count()
+        self._tokens = float(tokens_per_minute)
+        self._refilled_at = time.monotonic()
+        self._call_seconds = 5.0  # 모델 호출 시간 이동 평균 (Retry-After 추정용)
+        self.in_flight = 0
+
+        # counters
+        self.admitted = 0
+        self.queued = 0  # 바로 들어가지 못하고 기다린 호출
+        self.rejected = 0  # 대기열이 가득 참
+        self.evicted = 0  # 우선순위가 높은 요청에 자리를 내줌
+        self.timed_out = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            max_in_flight=int(os.getenv("LLM_MAX_IN_FLIGHT", "8")),
+            tokens_per_minute=int(os.getenv("LLM_TOKENS_PER_MINUTE", "0")),
+            queue_size=int(os.getenv("LLM_QUEUE_SIZE", "32")),
+            queue_timeout=float(os.getenv("LLM_QUEUE_TIMEOUT", "20")),
+            completion_tokens=int(os.getenv("LLM_COMPLETION_TOKENS", "200")),
+        )
+
+    @property
+    def enabled(self):
+        return bool(self.max_in_flight or self.tokens_per_minute)
+
+    def estimate(self, text):
+        return estimate_tokens(text, self.completion_tokens)
+
+    def _refill(self, now):
+        if self.tokens_per_minute:
+            rate = self.tokens_per_minute / 60
+            self._tokens = min(self.tokens_per_minute, self._tokens + (now - self._refilled_at) * rate)
+        self._refilled_at = now
+
+    def _token_wait(self, tokens):
+        """토큰이 모일 때까지 남은 초 (예산보다 큰 요청은 예산이 가득 찰 때까지)"""
+        if not self.tokens_per_minute:
+            return 0.0
+        missing = min(tokens, self.tokens_per_minute) - self._tokens
+        return max(0.0, missing * 60 / self.tokens_per_minute)
+
+    def _retry_after(self):
+        """대기열이 한 번 빠지는 데 걸릴 시간 추정 (초, 올림)"""
+        seconds = self._call_seconds * (len(self._queue) + 1) / max(self.max_in_flight, 1)
+        if self.tokens_per_minute:
+            queued_tokens = sum(waiter.tokens for _, _, waiter in self._queue)
+            seconds = max(seconds, self._token_wait(queued_tokens + self.completion_tokens))
+        return max(1, math.ceil(seconds))
+
+    def _enqueue(self, tokens, priority, now):
+        """대기열에 넣음. 가득 찼으면 우선순위가 더 낮은 대기자를 내보내거나 Overloaded"""
+        if len(self._queue) >= self.queue_size:
+            lowest = max(self._queue)
+            if lowest[0] <= priority:
+                self.rejected += 1
+                raise Overloaded(self._retry_after(), "LLM queue is full")
+            self._queue.remove(lowest)
+            heapq.heapify(self._queue)
+            lowest[2].evicted = True
+            self.evicted += 1
+        waiter = _Waiter(priority, tokens, now)
+        heapq.heappush(self._queue, (priority, next(self._order), waiter))
+        return waiter
+
+    def _remove(self, waiter):
+        for i, entry in enumerate(self._queue):
+            if entry[2] is waiter:
+                self._queue.pop(i)
+                heapq.heapify(self._queue)
+                return
+
+    def _try_start(self, waiter, now):
+        """waiter 가 맨 앞이고 자리와 토큰이 있으면 시작 처리 후 True"""
+        if waiter.evicted or self._queue[0][2] is not waiter:
+            return False
+        if self.max_in_flight and self.in_flight >= self.max_in_flight:
+            return False
+        self._refill(now)
+        if self._token_wait(waiter.tokens) > 0:
+            return False
+        heapq.heappop(self._queue)
+        if self.tokens_per_minute:
+            self._tokens -= min(waiter.tokens, self.tokens_per_minute)
+        self.in_flight += 1
+        self.admitted += 1
+        waited = now - waiter.enqueued
+        if waited > 0.001:
+            self.queued += 1
+        self.wait_seconds += waited
+        self.max_wait_seconds = max(self.max_wait_seconds, waited)
+        metrics.record_phase("llm_queue", waited)
+        return True
+
+    def _next_check(self, waiter, now, deadline):
+        """다시 확인할 때까지 기다릴 초 (토큰이 부족한 맨 앞 대기자는 토큰이 모일 때 깨어남)"""
+        remaining = deadline - now
+        if self._queue and self._queue[0][2] is waiter:
+            self._refill(now)
+            token_wait = self._token_wait(waiter.tokens)
+            if token_wait > 0:
+                return min(remaining, token_wait)
+        return remaining
+
+    def _fail(self, waiter):
+        """차례가 오지 않아 포기 (evicted 또는 timeout) -> Overloaded"""
+        if waiter.evicted:
+            return Overloaded(self._retry_after(), "LLM queue is full")
+        self._remove(waiter)
+        self.timed_out += 1
+        return Overloaded(self._retry_after(), "Timed out waiting for the LLM")
+
+    def _finish(self, started, now):
+        self.in_flight -= 1
+        self._call_seconds = 0.8 * self._call_seconds + 0.2 * (now - started)
+
+    def _stats(self):
+        waiting = [waiter.priority for _, _, waiter in self._queue]
+        stats = {
+            "in_flight": self.in_flight,
+            "max_in_flight": self.max_in_flight,
+            "queue_depth": len(waiting),
+            "queue_size": self.queue_size,
+            "admitted": self.admitted,
+            "queued": self.queued,
+            "rejected": self.rejected,
+            "evicted": self.evicted,
+            "timed_out": self.timed_out,
+            "wait_seconds_total": round(self.wait_seconds, 3),
+            "wait_seconds_max": round(self.max_wait_seconds, 3),
+        }
+        for priority, name in PRIORITY_NAMES.items():
+            stats[f"queue_depth_{name}"] = waiting.count(priority)
+        if self.tokens_per_minute:
+            self._refill(time.monotonic())
+            stats["tokens_per_minute"] = self.tokens_per_minute
+            stats["tokens_available"] = int(self._tokens)
+        return stats
+
+
+class Admission(_AdmissionState):
+    """
+    스레드용 입장 제어.
+
+    사용 예:
+        with admission.acquire(admission.estimate(prompt_text)) as slot:
+            model.invoke(prompt_value)  # slot.release() 로 끝나기 전에 자리를 반납할 수 있음
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._cond = threading.Condition()
+
+    def stats(self):
+        with self._cond:
+            return self._stats()
+
+    def _release(self, started):
+        with self._cond:
+            self._finish(started, time.monotonic())
+            self._cond.notify_all()
+
+    @contextmanager
+    def acquire(self, tokens=0, priority=None, timeout=None):
+        if not self.enabled:
+            yield Slot()
+            return
+        priority = _priority.get() if priority is None else priority
+        with self._cond:
+            now = time.monotonic()
+            waiter = self._enqueue(tokens, priority, now)
+            self._cond.notify_all()  # 자리를 내준 대기자가 있으면 깨움
+            # timeout: 요청의 남은 시간 (hedge.py). 0 이면 바로 들어갈 수 없을 때 기다리지 않고 Overloaded
+            deadline = now + (self.queue_timeout if timeout is None else min(timeout, self.queue_timeout))
+            while not self._try_start(waiter, now):
+                if waiter.evicted or now >= deadline:
+                    error = self._fail(waiter)
+                    self._cond.notify_all()
+                    raise error
+                self._cond.wait(self._next_check(waiter, now, deadline))
+                now = time.monotonic()
+            # 다음 대기자도 바로 들어갈 수 있으면 들어가도록
+            self._cond.notify_all()
+
+        slot = Slot(functools.partial(self._release, time.monotonic()))
+        try:
+            yield slot
+        finally:
+            slot.release()
+
+
+class AsyncAdmission(_AdmissionState):
+    """asyncio 용 입장 제어 (asgi_app.py). 한 이벤트 루프 안에서만 사용"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._cond = asyncio.Condition()
+
+    def stats(self):
+        return self._stats()
+
+    @asynccontextmanager
+    async def acquire(self, tokens=0, priority=None, timeout=None):
+        if not self.enabled:
+            yield
+            return
+        priority = _priority.get() if priority is None else priority
+        async with self._cond:
+            now = time.monotonic()
+            waiter = self._enqueue(tokens, priority, now)
+            self._cond.notify_all()  # 자리를 내준 대기자가 있으면 깨움
+            # timeout: 요청의 남은 시간 (hedge.py). 0 이면 바로 들어갈 수 없을 때 기다리지 않고 Overloaded
+            deadline = now + (self.queue_timeout if timeout is None else min(timeout, self.queue_timeout))
+            try:
+                while not self._try_start(waiter, now):
+                    if waiter.evicted or now >= deadline:
+                        raise self._fail(waiter)
+                    try:
+                        await asyncio.wait_for(self._cond.wait(), self._next_check(waiter, now, deadline))
+                    except asyncio.TimeoutError:
+                        pass
+                    now = time.monotonic()
+            except asyncio.CancelledError:
+                # 클라이언트가 끊겨 요청이 취소됨 -> 대기열에서 빼고 다음 대기자를 깨움
+                if not waiter.evicted:
+                    self._remove(waiter)
+                raise
+            finally:
+                self._cond.notify_all()
+
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            async with self._cond:
+                self._finish(started, time.monotonic())
+                self._cond.notify_all()
@@ -1,81 +1,106 @@
-from langchain_core.prompts import ChatPromptTemplate
-from langchain_openai import AzureChatOpenAI
-from langchain_core.pydantic_v1 import BaseModel, Field
-from langchain_core.output_parsers import JsonOutputParser
-from flask import Flask, request, jsonify
+# app.py
+# 식단 기록 API. create_app() 이 모든 라우트(블루프린트)를 하나의 Flask 앱에 등록한다.
+#   api           : 이 파일의 라우트 (로그인, 음식 추가/수정/삭제, 월별/분기별 조회 ...)
+#   calendar      : detail.py (/api/calendar)
+#   food_monthly  : monthly.py (/api/food/monthly)
+#   trends        : trends.py (/api/trends)
+# DB 풀(db.py), LLM 클라이언트(llm.py), 캐시는 모듈 단위로 하나씩만 만들어 모든 앱/블루프린트가 공유한다.
+#
+# 실행: python app.py  또는  gunicorn -c gunicorn.conf.py app:app
+#   GUNICORN_PRELOAD=1 이면 LLM 파이프라인까지 master 에서 불러온 뒤 fork (gunicorn.conf.py)
+#   cold start 측정: python bench/import_time.py
+
+import time
+
+MODULE_STARTED = time.perf_counter()  # 시작 시간 예산(STARTUP_BUDGET_MS) 측정 기준
+
+from flask import Blueprint, Flask, Response, current_app, request, jsonify
 from flask_cors import CORS
-import mysql.connector
-from mysql.connector import Error
 from dotenv import load_dotenv
 import os
-import llm
-import calendar
+import itertools
+import logging
 import pymysql
-from datetime import datetime
-
-app = Flask(__name__)
-CORS(app)  # Enable cross-origin requests
+from pymysql.cursors import DictCursor, SSCursor
+from datetime import date
+import auth
+import db
+import detail
+import food_store
+import hedge
+import log
+import metrics
+import monthly
+import nutrition
+import trends
+import food_kb
+import http_cache
+from http_cache import buffered, response_cache
+from admission import Overloaded
+from llm import do, do_many, do_stream, llm_admission, llm_hedger, nutrition_cache, nutrition_flight
+from nutrition_cache import REQUIRED_KEYS
+from month_cache import FOODS_BY_DAY, MONTHLY_DATA, month_cache, invalidate_month
+from food_jobs import update_food_nutrition, resolve_food_nutrition, delete_pending_food
+from food_store import (
+    MAX_BATCH_FOODS,
+    FOOD_WINDOW_QUERY,
+    DAILY_TOTALS_WINDOW_QUERY,
+    DaysWriter,
+    QuarterlyWriter,
+    build_monthly_data,
+    build_quarterly_data,
+    food_info_response,
+    food_item,
+    group_foods_by_day,
+    index_daily_totals,
+    month_label,
+    month_start,
+    next_month_start,
+    quarter_months,
+)
+from jobs import job_queue, PENDING, RUNNING
 
 # Load environment variables from .env
 load_dotenv()
 
-# Define db_config
-db_config = {
-    "host": os.getenv("DB_HOST"),
-    "database": os.getenv("DB_NAME"),
-    "user": os.getenv("DB_USER"),
-    "password": os.getenv("DB_PASSWORD"),
-}
+logger = logging.getLogger(__name__)
 
+api = Blueprint("api", __name__)
 
-# Database connection function
-def create_db_connection():
-    try:
-        connection = mysql.connector.connect(
-            host=db_config["host"],
-            database=db_config["database"],
-            user=db_config["user"],
-            password=db_config["password"],
-        )
-        return connection
-    except Error as e:
-        print(f"Error connecting to MySQL database: {e}")
-        return None
+# 요청 컨텍스트 밖 (스트리밍 제너레이터, SSE) 에서 쓰는 JSON 직렬화.
+# create_app() 이 만든 앱의 provider 로 설정되므로 jsonify 와 같은 출력을 낸다.
+json_provider = None
+
+# /api/send 일반 (JSON) 응답도 결과를 FOOD 에 저장할지 (기본: 저장하지 않음, /api/send2 로 저장).
+# 예전 send.py 서버는 매번 저장했으므로 그 동작이 필요한 배포는 SEND_SAVES_TO_DB=1 (python send.py 는 기본 1)
+SEND_SAVES_TO_DB = os.getenv("SEND_SAVES_TO_DB", "0").lower() in ("1", "true")
 
 
-@app.route("/api/login", methods=["POST"])
+@api.route("/api/login", methods=["POST"])
 def login():
     data = request.json
-    print(f"Received login request for user ID: {data.get('id')}")  # 디버깅 메시지
-
-    connection = create_db_connection()
-    if connection is None:
-        print("Database connection failed")  # 디버깅 메시지
-        return jsonify({"error": "Database connection failed"}), 500
+    logger.debug("Received login request for user ID: %s", data.get("id"))
 
     try:
-        cursor = connection.cursor(dictionary=True)
-        query = "SELECT * FROM USER WHERE ID = %s AND PASSWORD = %s"
-        print(f"Executing query: {query}")  # 디버깅 메시지
-        cursor.execute(query, (data["id"], data["password"]))
-        user = cursor.fetchone()
+        with db.connection() as connection:
+            with connection.cursor(DictCursor) as cursor:
+                query = "SELECT * FROM USER WHERE ID = %s AND PASSWORD = %s"
+                cursor.execute(query, (data["id"], data["password"]))
+                user = cursor.fetchone()
 
         if user:
-            print(f"Login successful for user: {user['ID']}")  # 디버깅 메시지
+            logger.debug("Login successful for user: %s", user["ID"])
             user.pop("PASSWORD", None)
-            return jsonify({"message": "Login successful", "user": user}), 200
+            # 이후 요청은 Authorization: Bearer <token> 으로 (프로필/RDI 가 토큰에 들어 있음, auth.py)
+            token = auth.issue_token(user)
+            return jsonify({"message": "Login successful", "user": user, "token": token}), 200
         else:
-            print("Invalid credentials")  # 디버깅 메시지
+            logger.info("Invalid credentials for user ID: %s", data.get("id"))
             return jsonify({"error": "Invalid credentials"}), 401
 
-    except Error as e:
-        print(f"Database error occurred: {str(e)}")  # 디버깅 메시지
+    except pymysql.MySQLError as e:
+        logger.error("Database error occurred: %s", e)
         return jsonify({"error": f"An error occurred: {str(e)}"}), 500
-    finally:
-        if connection.is_connected():
-            cursor.close()
-            connection.close()
-            print("Database connection closed")  # 디버깅 메시지
 
 
 def insert_test_data():
@@ -93,130 +118,123 @@ def insert_test_data():
         "age": 30,  # 예시 데이터
     }
 
-    connection = create_db_connection()
-    if connection is None:
-        print("Database connection failed")
-        return
-
     try:
-        cursor = connection.cursor()
-
-        # 아이디 중복 확인
-        query = "SELECT * FROM USER WHERE ID = %s"
-        cursor.execute(query, (data["id"],))
-        existing_user = cursor.fetchone()
-
-        if existing_user:
-            print(
-                f"User ID {data['id']} already exists. Skipping insertion."
-            )  # 디버깅 메시지
-        else:
-            query = """INSERT INTO USER (ID, PASSWORD, BODY_WEIGHT, HEIGHT, AGE) 
-                       VALUES (%s, %s, %s, %s, %s)"""
-            values = (
-                data["id"],
-                data["password"],
-                data["bodyweight"],
-                data["height"],
-                data["age"],
-            )
-            cursor.execute(query, values)
-            connection.commit()
-            print("Test user inserted successfully")  # 디버깅 메시지
-    except Error as e:
+        with db.connection() as connection:
+            with connection.cursor() as cursor:
+                # 아이디 중복 확인
+                query = "SELECT * FROM USER WHERE ID = %s"
+                cursor.execute(query, (data["id"],))
+                existing_user = cursor.fetchone()
+
+                if existing_user:
+                    print(
+                        f"User ID {data['id']} already exists. Skipping insertion."
+                    )  # 디버깅 메시지
+                else:
+                    query = """INSERT INTO USER (ID, PASSWORD, BODY_WEIGHT, HEIGHT, AGE) 
+                               VALUES (%s, %s, %s, %s, %s)"""
+                    values = (
+                        data["id"],
+                        data["password"],
+                        data["bodyweight"],
+                        data["height"],
+                        data["age"],
+                    )
+                    cursor.execute(query, values)
+                    connection.commit()
+                    print("Test user inserted successfully")  # 디버깅 메시지
+    except pymysql.MySQLError as e:
         print(f"An error occurred: {str(e)}")  # 디버깅 메시지
-    finally:
-        if connection.is_connected():
-            cursor.close()
-            connection.close()
-            print("Database connection closed")  # 디버깅 메시지
-
-
-model = AzureChatOpenAI(
-    azure_deployment=os.getenv("AZURE_OPENAI_DEPLOYMENT"),  # gpt-4o is set by env
-    temperature=1.0,
-)
-
-
-class NutritionInfo(BaseModel):
-    food_name:str = Field(description="The food name")
-    calorie: str = Field(description="The amount of Calories")
-    carbohydrate: str = Field(description="The amount of Carbohydrate")
-    protein: str = Field(description="The amount of Protein")
-    fat: str = Field(description="The amount of Fat")
-
-
-output_parser = JsonOutputParser(pydantic_object=NutritionInfo)
-
-prompt_template = ChatPromptTemplate.from_template(
-    """
-    음식이 입력되면 영양정보를 분석해줘
-    필수 요소는 음식 이름, 칼로리, 탄수화물, 단백질, 지방이야
-    입력: {string}
-    
-    {format_instructions}
-    """
-).partial(format_instructions=output_parser.get_format_instructions())
-
-
-def do(param):
-    print(f"Received input: {param}")  # Debugging 출력 추가
-    prompt_value = prompt_template.invoke({"string": param})
-    model_output = model.invoke(prompt_value)
-    output = output_parser.invoke(model_output)
-    return output
 
 
 def save_to_db(user_id, nutrition_info):
-    connection = create_db_connection()
-    print(1)
-    try:
+    """오늘 날짜의 FOOD 행으로 저장. (날짜, FOOD_INDEX)"""
+    today = date.today()
+    with db.connection() as connection:
         with connection.cursor() as cursor:
-            print(2)
-            sql = """
-                INSERT INTO FOOD (ID, DATE, FOOD_NAME, FOOD_PT, FOOD_FAT, FOOD_CH, FOOD_KCAL)
-                VALUES (%s, %s, %s, %s, %s, %s, %s)
-            """
-            cursor.execute(
-                sql,
-                (
-                    user_id,
-                    datetime.now(),
-                    nutrition_info["food_name"],
-                    nutrition_info["protein"],
-                    nutrition_info["fat"],
-                    nutrition_info["carbohydrate"],
-                    nutrition_info["calorie"],
-                ),
-            )
-            print("Data saved to database")  # Debugging 출력 추가
+            # FOOD 의 (ID, DATE, FOOD_INDEX) 는 유일해야 하므로 오늘 날짜로 번호를 할당해서 저장
+            food_index = food_store.insert_food(cursor, user_id, today, nutrition_info)
+            logger.debug("Data saved to database")
         connection.commit()
-    finally:
-        connection.close()
+    invalidate_month(user_id, today)
+    return today, food_index
 
 
-@app.route("/api/send", methods=["POST"])
+@api.route("/api/send", methods=["POST"])
 def send():
+    """
+    음식 이름을 분석해 영양 정보를 돌려준다.
+    - 일반 (JSON) 응답: 기본은 저장하지 않고, 사용자가 결과를 확인한 뒤 /api/send2 로 저장한다.
+      SEND_SAVES_TO_DB=1 이면 예전 send.py 처럼 오늘 날짜의 FOOD 행으로 바로 저장한다 (응답 본문은 같음).
+    - SSE (Accept: text/event-stream 또는 ?events=1): 전체 결과가 나오면 오늘 날짜의 FOOD 행으로 저장하고,
+      result 이벤트에 DATE, FOOD_INDEX 를 함께 보낸다 (send_events). 이 모드에서는 /api/send2 를 다시 부르지 않는다.
+    """
     data = request.json
-    user_id = data.get("user_id")
+    user_id = auth.user_id(data.get("user_id"))
     food_name = data.get("food_name")
 
     if not user_id or not food_name:
         return jsonify({"error": "user_id and food_name are required"}), 400
 
+    if wants_events():
+        # 입장 제어 (503) / 마감 (504) 오류는 첫 이벤트를 만들 때 나므로 여기서 터져 일반 모드와 같은 응답이 됨
+        fields = do_stream(food_name)
+        return event_stream_response(send_events(user_id, itertools.chain([next(fields)], fields)))
+
     nutrition_info = do(food_name)
 
-    # save_to_db(user_id, nutrition_info)
+    # 저장 여부는 위 docstring 참고
+    if SEND_SAVES_TO_DB:
+        save_to_db(user_id, nutrition_info)
 
     return jsonify(nutrition_info)
 
 
-@app.route("/api/send2", methods=["POST"])
+def wants_events():
+    """Server-Sent Events 로 응답할지 (Accept: text/event-stream 또는 ?events=1)"""
+    return ("text/event-stream" in request.headers.get("Accept", "")
+            or request.args.get("events", "").lower() in ("1", "true"))
+
+
+def event_stream_response(events):
+    response = Response(events, mimetype="text/event-stream")
+    response.headers["Cache-Control"] = "no-cache"
+    response.headers["X-Accel-Buffering"] = "no"  # nginx 가 모아서 보내지 않도록
+    return response
+
+
+def send_events(user_id, fields):
+    """
+    /api/send SSE. 모델이 필드를 쓰는 대로 partial (확정된 필드만) 을 보내고,
+    전체 결과가 나오면 FOOD 에 저장한 뒤 result (+ DATE, FOOD_INDEX) 를 보낸다. 중간에 실패하면 error
+    """
+    try:
+        for nutrition_info, complete in fields:
+            if not complete:
+                yield sse("partial", nutrition_info)
+                continue
+            if not all(nutrition_info.get(key) is not None for key in REQUIRED_KEYS):
+                yield sse("error", {"error": "영양 정보를 분석하지 못했습니다.", "status": 502})
+                return
+            day, food_index = save_to_db(user_id, nutrition_info)
+            yield sse("result", {**nutrition_info, "DATE": day.isoformat(), "FOOD_INDEX": food_index})
+    except hedge.DeadlineExceeded:
+        yield sse("error", {"error": "분석 시간이 초과되었습니다. 다시 시도해 주세요.", "status": 504})
+    except pymysql.MySQLError as e:
+        logger.error("Database error: %s", e)
+        yield sse("error", {"error": "DB save error", "status": 500})
+    except Exception:
+        # 응답을 이미 보내기 시작했으므로 상태 코드 대신 error 이벤트로 알림
+        logger.exception("Streaming analysis failed")
+        yield sse("error", {"error": "영양 정보를 분석하지 못했습니다.", "status": 500})
+
+
+@api.route("/api/send2", methods=["POST"])
 def send2():
     data = request.json
-    user_id = data.get("user_id")
+    user_id = auth.user_id(data.get("user_id"))
     nutrition_info = data.get("nutrition_info")
-    print(data)
+    logger.debug("send2 request: %s", data)
     try:
         save_to_db(user_id, nutrition_info)
         return jsonify({"message": "good"}), 200
@@ -224,83 +242,141 @@ def send2():
         return jsonify({"message": "DB save error"}), 500
 
 
-@app.route("/api/add_food", methods=["POST"])
+def wants_async():
+    return request.args.get("async", "").lower() in ("1", "true")
+
+
+def job_accepted_response(job_id, message, data):
+    return (
+        jsonify(
+            {
+                "message": message,
+                "job_id": job_id,
+                "status_url": f"/api/jobs/{job_id}",
+                "data": data,
+            }
+        ),
+        202,
+    )
+
+
+@api.route("/api/add_food", methods=["POST"])
 def add_food():
     data = request.json
 
-    user_id = data.get("ID")
+    user_id = auth.user_id(data.get("ID"))
     date = data.get("DATE")
     food_name = data.get("FOOD_NAME")
 
     if not user_id or not date or not food_name:
         return jsonify({"error": "필수 정보가 누락되었습니다."}), 400
 
+    if wants_async():
+        return add_food_async(user_id, date, food_name)
+
     # LLM을 통해 음식 영양 정보를 가져옴
     nutrition_info = do(food_name)
 
     try:
-        connection = pymysql.connect(**db_config)
-        with connection.cursor() as cursor:
-            # FOOD_INDEX를 구함 (해당 날짜의 가장 높은 인덱스를 찾아 +1)
-            cursor.execute(
-                "SELECT MAX(FOOD_INDEX) FROM FOOD WHERE ID = %s AND DATE = %s",
-                (user_id, date),
-            )
-            max_index = cursor.fetchone()[0]
-            food_index = max_index + 1 if max_index is not None else 0
-
-            insert_query = """
-            INSERT INTO FOOD (ID, DATE, FOOD_INDEX, FOOD_NAME, FOOD_CH, FOOD_PT, FOOD_FAT, FOOD_KCAL)
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-            """
-            cursor.execute(
-                insert_query,
-                (
-                    user_id,
-                    date,
-                    food_index,
-                    nutrition_info["food_name"],
-                    nutrition_info["carbohydrate"],
-                    nutrition_info["protein"],
-                    nutrition_info["fat"],
-                    nutrition_info["calorie"],
-                ),
-            )
-            connection.commit()
+        with db.connection() as connection:
+            with connection.cursor() as cursor:
+                food_index = food_store.insert_food(cursor, user_id, date, nutrition_info)
+                connection.commit()
+                invalidate_month(user_id, date)
+
+                added_food_info = food_info_response(user_id, date, food_index, nutrition_info)
+                logger.debug("Added food: %s", added_food_info)
+                return (
+                    jsonify(
+                        {
+                            "message": "음식이 성공적으로 추가되었습니다.",
+                            "data": added_food_info,
+                        }
+                    ),
+                    201,
+                )
 
-            added_food_info = {
-                "ID": user_id,
-                "DATE": date,
-                "FOOD_INDEX": food_index,
-                "food_name": nutrition_info["food_name"],
-                "carbohydrates": nutrition_info["carbohydrate"],
-                "protein": nutrition_info["protein"],
-                "fat": nutrition_info["fat"],
-                "calorie": nutrition_info["calorie"],
-            }
-            print(added_food_info)
-            return (
-                jsonify(
-                    {
-                        "message": "음식이 성공적으로 추가되었습니다.",
-                        "data": added_food_info,
-                    }
-                ),
-                201,
-            )
+    except pymysql.MySQLError as e:
+        return jsonify({"error": str(e)}), 500
+
+
+# 한 끼에 먹은 여러 음식을 한 번에 기록하는 엔드포인트
+@api.route("/api/add_foods", methods=["POST"])
+def add_foods():
+    data = request.json
 
+    user_id = auth.user_id(data.get("ID"))
+    date = data.get("DATE")
+    food_names = data.get("FOOD_NAMES")
+
+    if (
+        not user_id
+        or not date
+        or not isinstance(food_names, list)
+        or not food_names
+        or not all(isinstance(name, str) and name.strip() for name in food_names)
+    ):
+        return jsonify({"error": "필수 정보가 누락되었습니다."}), 400
+    if len(food_names) > MAX_BATCH_FOODS:
+        return jsonify({"error": f"한 번에 최대 {MAX_BATCH_FOODS}개까지 추가할 수 있습니다."}), 400
+
+    # LLM 호출 한 번으로 모든 음식의 영양 정보를 가져옴
+    nutrition_infos = do_many(food_names)
+
+    try:
+        with db.connection() as connection:
+            with connection.cursor() as cursor:
+                food_indexes = food_store.insert_foods(cursor, user_id, date, nutrition_infos)
+            connection.commit()
+        invalidate_month(user_id, date)
     except pymysql.MySQLError as e:
         return jsonify({"error": str(e)}), 500
 
-    finally:
-        connection.close()
+    added_foods = [
+        food_info_response(user_id, date, food_index, nutrition_info)
+        for food_index, nutrition_info in zip(food_indexes, nutrition_infos)
+    ]
+    return (
+        jsonify(
+            {
+                "message": "음식이 성공적으로 추가되었습니다.",
+                "data": added_foods,
+            }
+        ),
+        201,
+    )
 
 
-@app.route("/api/update_food", methods=["POST"])
+def add_food_async(user_id, date, food_name):
+    # 영양 정보가 비어 있는 대기 행을 먼저 넣고, LLM 분석은 작업 큐에서 처리
+    try:
+        with db.connection() as connection:
+            with connection.cursor() as cursor:
+                food_index = food_store.insert_pending_food(cursor, user_id, date, food_name)
+            connection.commit()
+        invalidate_month(user_id, date)
+    except pymysql.MySQLError as e:
+        return jsonify({"error": str(e)}), 500
+
+    job_id = job_queue.submit(
+        "add_food",
+        resolve_food_nutrition,
+        user_id, date, food_index, food_name,
+        owner=user_id,
+        on_failure=delete_pending_food,
+    )
+    return job_accepted_response(
+        job_id,
+        "음식 분석이 접수되었습니다.",
+        {"ID": user_id, "DATE": date, "FOOD_INDEX": food_index, "food_name": food_name},
+    )
+
+
+@api.route("/api/update_food", methods=["POST"])
 def update_food():
     data = request.json
 
-    user_id = data.get("ID")
+    user_id = auth.user_id(data.get("ID"))
     date = data.get("DATE")
     food_index = data.get("FOOD_INDEX")
     new_food_name = data.get("NEW_FOOD_NAME")
@@ -308,251 +384,314 @@ def update_food():
     if not user_id or not date or not food_index or not new_food_name:
         return jsonify({"error": "필수 정보가 누락되었습니다."}), 400
 
+    if wants_async():
+        job_id = job_queue.submit(
+            "update_food", resolve_food_nutrition, user_id, date, food_index, new_food_name, owner=user_id
+        )
+        return job_accepted_response(
+            job_id,
+            "음식 수정이 접수되었습니다.",
+            {"ID": user_id, "DATE": date, "FOOD_INDEX": food_index, "food_name": new_food_name},
+        )
+
     # LLM을 통해 새로운 음식 영양 정보를 가져옴
     new_nutrition_info = do(new_food_name)
 
     try:
-        connection = pymysql.connect(**db_config)
-        with connection.cursor() as cursor:
-            update_query = """
-            UPDATE FOOD
-            SET FOOD_NAME = %s, FOOD_CH = %s, FOOD_PT = %s, FOOD_FAT = %s, FOOD_KCAL = %s
-            WHERE ID = %s AND DATE = %s AND FOOD_INDEX = %s
-            """
-            cursor.execute(
-                update_query,
-                (
-                    new_nutrition_info["food_name"],
-                    new_nutrition_info["carbohydrate"],
-                    new_nutrition_info["protein"],
-                    new_nutrition_info["fat"],
-                    new_nutrition_info["calorie"],
-                    user_id,
-                    date,
-                    food_index,
-                ),
-            )
-            connection.commit()
-
-            updated_food_info = {
-                "ID": user_id,
-                "DATE": date,
-                "FOOD_INDEX": food_index,
-                "food_name": new_nutrition_info["food_name"],
-                "carbohydrates": new_nutrition_info["carbohydrate"],
-                "protein": new_nutrition_info["protein"],
-                "fat": new_nutrition_info["fat"],
-                "calorie": new_nutrition_info["calorie"],
-            }
-
-            return (
-                jsonify(
-                    {
-                        "message": "음식이 성공적으로 수정되었습니다.",
-                        "data": updated_food_info,
-                    }
-                ),
-                200,
-            )
+        update_food_nutrition(user_id, date, food_index, new_nutrition_info)
+        updated_food_info = food_info_response(user_id, date, food_index, new_nutrition_info)
+
+        return (
+            jsonify(
+                {
+                    "message": "음식이 성공적으로 수정되었습니다.",
+                    "data": updated_food_info,
+                }
+            ),
+            200,
+        )
 
     except pymysql.MySQLError as e:
         return jsonify({"error": str(e)}), 500
 
-    finally:
-        connection.close()
 
+# 백그라운드 작업 상태 조회 (?wait=초 를 주면 완료될 때까지 최대 30초 대기)
+# 작업을 요청한 사용자만 볼 수 있음 (?ID=<user> 또는 토큰)
+@api.route("/api/jobs/<job_id>", methods=["GET"])
+def get_job(job_id):
+    user_id = auth.user_id(request.args.get("ID"))
+    if not user_id:
+        return jsonify({"error": "ID is required"}), 400
+    try:
+        wait = min(float(request.args.get("wait", 0)), 30)
+    except ValueError:
+        return jsonify({"error": "wait must be a number"}), 400
+
+    job = job_queue.get(job_id)
+    # 다른 사용자의 작업은 없는 작업과 같게 응답 (기다리기 전에 확인)
+    if job is None or job["owner"] != str(user_id):
+        return jsonify({"error": "Job not found"}), 404
+    if wait > 0 and job["status"] in (PENDING, RUNNING):
+        job = job_queue.get(job_id, wait)
+
+    body = {
+        "job_id": job["job_id"],
+        "kind": job["kind"],
+        "status": job["status"],
+        "data": job["result"],
+        "error": job["error"],
+    }
+    status_code = 202 if job["status"] in (PENDING, RUNNING) else 200
+    return jsonify(body), status_code
+
+
+@api.route("/api/llm_stats", methods=["GET"])
+def llm_stats():
+    return jsonify({
+        "food_kb": food_kb.default_kb().stats(),
+        "cache": nutrition_cache.stats(),
+        "singleflight": nutrition_flight.stats(),
+        "response_cache": response_cache.stats(),
+        "month_cache": month_cache.stats(),
+        "admission": llm_admission.stats(),
+        "hedging": llm_hedger.stats(),
+    }), 200
 
-@app.route("/api/register", methods=["POST", "PUT"])
+
+def overloaded_response(e):
+    """LLM 대기열이 가득 찼거나 차례가 오지 않음 (admission.Overloaded) -> 503 + Retry-After"""
+    response = jsonify({"error": "요청이 많아 잠시 후 다시 시도해 주세요.", "retry_after": e.retry_after})
+    response.status_code = 503
+    response.headers["Retry-After"] = str(e.retry_after)
+    return response
+
+
+def deadline_response(e):
+    """마감 시간 (LLM_REQUEST_TIMEOUT) 안에 LLM 결과를 받지 못함 (hedge.DeadlineExceeded) -> 504"""
+    return jsonify({"error": "분석 시간이 초과되었습니다. 다시 시도해 주세요."}), 504
+
+
+@api.route("/api/register", methods=["POST", "PUT"])
 def register():
     data = request.json
     if not data or "id" not in data or "pw" not in data:
         return jsonify({"error": "Invalid input"}), 400
 
-    connection = create_db_connection()
-    if connection is None:
-        return jsonify({"error": "Database connection failed"}), 500
-
     try:
-        cursor = connection.cursor(dictionary=True)
-        if request.method == "POST":
-            # POST 요청: 새로운 사용자 등록
-            query = """INSERT INTO USER (ID, PASSWORD, BODY_WEIGHT, HEIGHT, AGE, GENDER, ACTIVITY, RDI) 
-                       VALUES (%s, %s, %s, %s, %s, %s, %s, %s)"""
-            values = (
-                data["id"],
-                data["pw"],
-                data["bodyweight"],
-                data["height"],
-                data["age"],
-                data["gender"],
-                data["activity"],
-                None,  # RDI 값을 기본값으로 설정 (필요에 따라 계산 후 설정 가능)
-            )
-            cursor.execute(query, values)
-            connection.commit()
-            return jsonify({"message": "User registered successfully"}), 201
-
-        elif request.method == "PUT":
-            # Check if the user exists
-            check_user_query = "SELECT * FROM USER WHERE ID = %s"
-            cursor.execute(check_user_query, (data["id"],))
-            existing_user = cursor.fetchone()
-
-            if not existing_user:
-                return jsonify({"error": "User not found"}), 404
-
-            # PUT 요청: 기존 사용자 정보 업데이트
-            query = """UPDATE USER SET PASSWORD=%s, BODY_WEIGHT=%s, HEIGHT=%s, AGE=%s, GENDER=%s, ACTIVITY=%s
-                       WHERE ID=%s"""
-            values = (
-                data["pw"],
-                data["bodyweight"],
-                data["height"],
-                data["age"],
-                data["gender"],
-                data["activity"],
-                data["id"],
-            )
-            cursor.execute(query, values)
-            connection.commit()
+        with db.connection() as connection:
+            with connection.cursor(DictCursor) as cursor:
+                if request.method == "POST":
+                    # POST 요청: 새로운 사용자 등록
+                    query = """INSERT INTO USER (ID, PASSWORD, BODY_WEIGHT, HEIGHT, AGE, GENDER, ACTIVITY, RDI) 
+                               VALUES (%s, %s, %s, %s, %s, %s, %s, %s)"""
+                    values = (
+                        data["id"],
+                        data["pw"],
+                        data["bodyweight"],
+                        data["height"],
+                        data["age"],
+                        data["gender"],
+                        data["activity"],
+                        None,  # RDI 값을 기본값으로 설정 (필요에 따라 계산 후 설정 가능)
+                    )
+                    cursor.execute(query, values)
+                    connection.commit()
+                    return jsonify({"message": "User registered successfully"}), 201
+
+                elif request.method == "PUT":
+                    # Check if the user exists
+                    check_user_query = "SELECT * FROM USER WHERE ID = %s"
+                    cursor.execute(check_user_query, (data["id"],))
+                    existing_user = cursor.fetchone()
+
+                    if not existing_user:
+                        return jsonify({"error": "User not found"}), 404
+
+                    # PUT 요청: 기존 사용자 정보 업데이트
+                    query = """UPDATE USER SET PASSWORD=%s, BODY_WEIGHT=%s, HEIGHT=%s, AGE=%s, GENDER=%s, ACTIVITY=%s
+                               WHERE ID=%s"""
+                    values = (
+                        data["pw"],
+                        data["bodyweight"],
+                        data["height"],
+                        data["age"],
+                        data["gender"],
+                        data["activity"],
+                        data["id"],
+                    )
+                    cursor.execute(query, values)
+                    updated = cursor.rowcount
+                    if updated:
+                        food_store.bump_profile_version(cursor, data["id"])
+                    connection.commit()
+
+                    # Check if any row was actually updated
+                    if updated == 0:
+                        return (
+                            jsonify({"message": "No changes made to the user information"}),
+                            200,
+                        )
+
+                    # 토큰에 담긴 프로필이 바뀌었으므로 새 토큰을 돌려줌 (옛 토큰은 만료될 때까지 옛 프로필)
+                    refreshed = {}
+                    if auth.current_user() is not None:
+                        refreshed["token"] = auth.issue_token(auth.updated_profile(existing_user, data))
+
+                    # USER_NT 테이블에서 RD_PROTEIN, RD_CARBO, RD_FAT 값을 가져옴
+                    query_nutrients = (
+                        """SELECT RD_PROTEIN, RD_CARBO, RD_FAT FROM USER_NT WHERE ID=%s"""
+                    )
+                    cursor.execute(query_nutrients, (data["id"],))
+                    nutrients_result = cursor.fetchone()
+
+                    if nutrients_result is None:
+                        return jsonify({"error": "User NT not found", **refreshed}), 404
+
+                    rd_protein, rd_carbo, rd_fat = nutrients_result
+                    return (
+                        jsonify(
+                            {
+                                "message": "User updated successfully",
+                                "RD_PROTEIN": rd_protein,
+                                "RD_CARBO": rd_carbo,
+                                "RD_FAT": rd_fat,
+                                **refreshed,
+                            }
+                        ),
+                        200,
+                    )
 
-            # Check if any row was actually updated
-            if cursor.rowcount == 0:
-                return (
-                    jsonify({"message": "No changes made to the user information"}),
-                    200,
-                )
-
-            # USER_NT 테이블에서 RD_PROTEIN, RD_CARBO, RD_FAT 값을 가져옴
-            query_nutrients = (
-                """SELECT RD_PROTEIN, RD_CARBO, RD_FAT FROM USER_NT WHERE ID=%s"""
-            )
-            cursor.execute(query_nutrients, (data["id"],))
-            nutrients_result = cursor.fetchone()
-
-            if nutrients_result is None:
-                return jsonify({"error": "User NT not found"}), 404
-
-            rd_protein, rd_carbo, rd_fat = nutrients_result
-            return (
-                jsonify(
-                    {
-                        "message": "User updated successfully",
-                        "RD_PROTEIN": rd_protein,
-                        "RD_CARBO": rd_carbo,
-                        "RD_FAT": rd_fat,
-                    }
-                ),
-                200,
-            )
-
-    except Error as e:
-        print(f"Database query error: {e}")
+    except pymysql.MySQLError as e:
+        logger.error("Database query error: %s", e)
         return jsonify({"error": "Database query failed"}), 500
-    finally:
-        if connection.is_connected():
-            cursor.close()
-            connection.close()
 
 
 # 특정 음식을 삭제하는 엔드포인트
-@app.route("/api/delete_food", methods=["DELETE"])
+@api.route("/api/delete_food", methods=["DELETE"])
 def delete_food():
-    user_id = request.args.get("ID")
+    user_id = auth.user_id(request.args.get("ID"))
     date = request.args.get("DATE")
     food_index = request.args.get("FOOD_INDEX")
 
     if not user_id or not date or not food_index:
         return jsonify({"error": "필수 정보가 누락되었습니다."}), 400
 
-    connection = create_db_connection()
-    if connection is None:
-        return jsonify({"error": "데이터베이스 연결 실패"}), 500
-
     try:
-        cursor = connection.cursor()
-        delete_query = """
-        DELETE FROM FOOD
-        WHERE ID = %s AND DATE = %s AND FOOD_INDEX = %s
-        """
-        cursor.execute(delete_query, (user_id, date, food_index))
-        connection.commit()
+        with db.connection() as connection:
+            with connection.cursor() as cursor:
+                deleted = food_store.delete_food(cursor, user_id, date, food_index)
+            connection.commit()
 
-        if cursor.rowcount == 0:
+        if not deleted:
             return jsonify({"message": "삭제할 데이터가 없습니다."}), 404
 
+        invalidate_month(user_id, date)
         return jsonify({"message": "음식이 성공적으로 삭제되었습니다."}), 200
 
-    except Error as e:
+    except pymysql.MySQLError as e:
         return jsonify({"error": str(e)}), 500
 
-    finally:
-        if connection.is_connected():
-            cursor.close()
-            connection.close()
 
-
-@app.route("/api/monthly", methods=["POST"])
+@api.route("/api/monthly", methods=["GET", "POST"])
 def get_monthly_food():
-    data = request.json
+    data = request_data()
     year = data.get("year")
     month = data.get("month")
-    UID = data.get("UID")
+    UID = auth.user_id(data.get("UID"))
     if not year or not month:
         return jsonify({"error": "Year and month are required"}), 400
 
-    connection = create_db_connection()
     try:
-        with connection.cursor() as cursor:
-            sql = """
-                SELECT DATE, FOOD_INDEX, FOOD_NAME, FOOD_PT, FOOD_FAT, FOOD_CH, FOOD_KCAL
-                FROM FOOD
-                WHERE YEAR(DATE) = %s AND MONTH(DATE) = %s
-                AND ID = %s
-                ORDER BY DATE
-            """
-            cursor.execute(sql, (year, month, UID))
-            results = cursor.fetchall()
-            monthly_data = {}
-
-            for row in results:
-                day = row[0].day
-                food_info = {
-                    "food_index": row[1],
-                    "food_name": row[2],
-                    "protein": row[3],
-                    "fat": row[4],
-                    "carbohydrates": row[5],
-                    "calories": row[6],
-                }
+        year = int(year)
+        month = int(month)
+        if month < 1 or month > 12:
+            return jsonify({"error": "Invalid month. Please enter a value between 1 and 12."}), 400
+    except ValueError:
+        return jsonify({"error": "Year and month must be integers."}), 400
 
-                # Ensuring the output order
-                food_info_ordered = {
-                    "food_index": food_info["food_index"],
-                    "food_name": food_info["food_name"],
-                    "protein": food_info["protein"],
-                    "fat": food_info["fat"],
-                    "carbohydrates": food_info["carbohydrates"],
-                    "calories": food_info["calories"],
-                }
+    try:
+        ((version, foods_by_day),) = cached_months(FOODS_BY_DAY, UID, [(year, month)])
+        etag = http_cache.make_etag("monthly", UID, year, month, version)
+        if http_cache.is_fresh(request, etag):
+            return http_cache.not_modified_response(current_app.response_class, etag)
+        body = response_cache.get(etag)
+        if body is not None:
+            return http_cache.json_response(current_app.response_class, current_app.json, body, etag)
+
+        if wants_stream():
+            # 쿼리 오류는 첫 조각을 만들 때 나므로 여기서 터져 일반 모드와 같은 500 이 됨
+            fragments = stream_foods_by_day(UID, year, month)
+            response = Response(buffered(itertools.chain([next(fragments)], fragments)),
+                                mimetype=current_app.json.mimetype)
+            return http_cache.tag_response(response, etag)
+
+        if foods_by_day is None:
+            with db.connection() as connection:
+                with connection.cursor() as cursor:
+                    # YEAR(DATE)/MONTH(DATE) 대신 반열림 구간으로 조회해야 (ID, DATE) 인덱스를 탈 수 있음
+                    cursor.execute(
+                        FOOD_WINDOW_QUERY, (UID, month_start(year, month), next_month_start(year, month))
+                    )
+                    results = cursor.fetchall()
+            foods_by_day = group_foods_by_day(results)
+            month_cache.set(FOODS_BY_DAY, UID, year, month, version, foods_by_day)
+
+        body = http_cache.render_json(current_app.json, foods_by_day)
+        response_cache.set(etag, body)
+        return http_cache.json_response(current_app.response_class, current_app.json, body, etag)
+    except pymysql.MySQLError as e:
+        logger.error("Database error: %s", e)
+        return jsonify({"error": "Database error"}), 500
+
+
+# /metrics 에 gauge 로 함께 노출할 통계
+metrics.register_collector("db_pool", db.pool_stats)
+metrics.register_collector("food_kb", lambda: food_kb.default_kb().stats())
+metrics.register_collector("nutrition_cache", nutrition_cache.stats)
+metrics.register_collector("singleflight", nutrition_flight.stats)
+metrics.register_collector("response_cache", response_cache.stats)
+metrics.register_collector("month_cache", month_cache.stats)
+metrics.register_collector("auth", auth.stats)
+metrics.register_collector("llm_admission", llm_admission.stats)
+metrics.register_collector("llm_hedging", llm_hedger.stats)
 
-                if day not in monthly_data:
-                    monthly_data[day] = []
 
-                monthly_data[day].append(food_info_ordered)
+def request_data():
+    """조회 API 는 GET 쿼리 문자열 (브라우저 HTTP 캐시용) 과 POST JSON 본문을 모두 받음"""
+    if request.method == "GET":
+        return request.args
+    return request.json
 
-            # Create a list of 31 days, each day is a list of food items (which may be empty)
-            grouped_data = [monthly_data.get(day, []) for day in range(1, 32)]
 
-            return jsonify(grouped_data)
-    finally:
-        connection.close()
+def cached_months(kind, user_id, months):
+    """
+    [(year, month), ...] 의 (데이터 버전, 캐시된 값 또는 None).
+    마감된 달은 캐시 항목의 버전을 그대로 쓰고 (month_cache.lookup), 나머지 달만 버전을 읽는다.
+    """
+    found = {key: month_cache.lookup(kind, user_id, *key) for key in months}
+    unchecked = [key for key in months if found[key] is None]
+    if unchecked:
+        for key, version in zip(unchecked, data_versions(user_id, unchecked)):
+            found[key] = (version, month_cache.get(kind, user_id, *key, version))
+    return [found[key] for key in months]
+
+
+def data_versions(user_id, months):
+    """
+    [(year, month), ...] 의 데이터 버전. ETag 를 만들 때는 데이터보다 버전을 먼저 읽어야 한다
+    (사이에 쓰기가 끼어들면 더 새로운 데이터가 옛 버전으로 저장될 뿐, 옛 데이터가 새 버전으로 저장되지는 않음).
+    """
+    with db.connection() as connection, connection.cursor() as cursor:
+        return food_store.month_versions(cursor, user_id, [month_start(y, m) for y, m in months])
 
 
 def get_user_nutritional_needs(user_id):
-    connection = pymysql.connect(**db_config)
+    # 토큰으로 인증된 요청이면 토큰에 담긴 프로필로 답함 (DB 조회 없음)
+    profile = auth.current_profile(user_id)
+    if profile is not None:
+        return profile["BODY_WEIGHT"], profile["RDI"]
     try:
-        with connection.cursor() as cursor:
+        with db.connection() as connection, connection.cursor() as cursor:
             sql = "SELECT BODY_WEIGHT, RDI FROM USER WHERE ID = %s"
             cursor.execute(sql, (user_id,))
             result = cursor.fetchone()
@@ -562,85 +701,117 @@ def get_user_nutritional_needs(user_id):
             else:
                 return None
     except pymysql.MySQLError as e:
-        logging.error(f"Database error: {e}")
+        logger.error("Database error: %s", e)
         return None
-    finally:
-        connection.close()
 
-def get_daily_totals(user_id, date):
-    connection = pymysql.connect(**db_config)
-    try:
-        with connection.cursor() as cursor:
-            sql = "SELECT CARBO, PROTEIN, FAT, RD_CARBO, RD_PROTEIN, RD_FAT FROM USER_NT WHERE ID = %s AND DATE = %s"
-            cursor.execute(sql, (user_id, date))
-            result = cursor.fetchone()
-            if result:
-                return result
-            else:
-                return None
-    except pymysql.MySQLError as e:
-        logging.error(f"Database error: {e}")
-        return None
-    finally:
-        connection.close()
+
+@api.route("/api/nutritional_needs", methods=["GET"])
+def nutritional_needs():
+    """체중 / RDI 조회. 토큰으로 인증된 요청은 DB 를 거치지 않음 (get_user_nutritional_needs)"""
+    user_id = auth.user_id(request.args.get("ID"))
+    if not user_id:
+        return jsonify({"error": "ID is required"}), 400
+
+    needs = get_user_nutritional_needs(user_id)
+    if needs is None:
+        return jsonify({"error": "User not found"}), 404
+    body_weight, rdi = needs
+    # 토큰 (float) 과 DB (DECIMAL) 어느 쪽에서 읽어도 같은 JSON 숫자로
+    return jsonify({"ID": user_id, "BODY_WEIGHT": nutrition.number(body_weight), "RDI": nutrition.number(rdi)})
+
+
+def fetch_nutrition_window(user_id, start, end):
+    """
+    [start, end) 구간의 FOOD 행과 USER_NT 일별 합계를 범위 쿼리 두 번으로 가져온다.
+    반환값: (FOOD 행 리스트, {date: (CARBO, PROTEIN, FAT, RD_CARBO, RD_PROTEIN, RD_FAT)})
+    """
+    with db.connection() as connection, connection.cursor() as cursor:
+        cursor.execute(FOOD_WINDOW_QUERY, (user_id, start, end))
+        food_rows = cursor.fetchall()
+
+        cursor.execute(DAILY_TOTALS_WINDOW_QUERY, (user_id, start, end))
+        totals_rows = cursor.fetchall()
+
+    return food_rows, index_daily_totals(totals_rows)
+
 
 def get_monthly_data(year, month, user_id):
-    connection = pymysql.connect(**db_config)
     try:
-        with connection.cursor() as cursor:
-            sql = """
-                SELECT DATE, FOOD_INDEX, FOOD_NAME, FOOD_PT, FOOD_FAT, FOOD_CH, FOOD_KCAL
-                FROM FOOD
-                WHERE YEAR(DATE) = %s AND MONTH(DATE) = %s AND ID = %s
-                ORDER BY DATE
-            """
-            cursor.execute(sql, (year, month, user_id))
-            results = cursor.fetchall()
-
-            num_days = calendar.monthrange(year, month)[1]  # 해당 월의 일수 계산
-            foods_list = [[] for _ in range(num_days)]  # 각 날짜별 음식 리스트
-            percentages_list = [{} for _ in range(num_days)]  # 각 날짜별 백분율 리스트
-
-            for row in results:
-                day = row[0].day - 1  # 0-based index for lists
-                food_info = {
-                    "food_index": row[1],
-                    "food_name": row[2],
-                    "protein": row[3],
-                    "fat": row[4],
-                    "carbohydrates": row[5],
-                    "calories": row[6]
-                }
-                foods_list[day].append(food_info)
-
-            # Add daily percentages
-            for day in range(num_days):
-                date_str = f"{year}-{str(month).zfill(2)}-{str(day+1).zfill(2)}"  # 1-based day for dates
-                daily_totals = get_daily_totals(user_id, date_str)
-                if daily_totals:
-                    carb_total, protein_total, fat_total, rd_carb, rd_protein, rd_fat = daily_totals
-                    percentages_list[day] = {
-                        "carbohydrates_percentage": round((carb_total / rd_carb) * 100, 1) if rd_carb > 0 else 0,
-                        "protein_percentage": round((protein_total / rd_protein) * 100, 1) if rd_protein > 0 else 0,
-                        "fat_percentage": round((fat_total / rd_fat) * 100, 1) if rd_fat > 0 else 0
-                    }
-
-            return {
-                "foods": foods_list,
-                "percentages": percentages_list
-            }
+        ((version, monthly_data),) = cached_months(MONTHLY_DATA, user_id, [(year, month)])
+        if monthly_data is not None:
+            return monthly_data
+        food_rows, totals_by_date = fetch_nutrition_window(
+            user_id, month_start(year, month), next_month_start(year, month)
+        )
     except pymysql.MySQLError as e:
-        logging.error(f"Database error: {e}")
+        logger.error("Database error: %s", e)
         return {"error": "Database error"}
-    finally:
-        connection.close()
 
-@app.route('/api/food/quarterly', methods=['POST'])
+    monthly_data = build_monthly_data(year, month, food_rows, totals_by_date)
+    month_cache.set(MONTHLY_DATA, user_id, year, month, version, monthly_data)
+    return monthly_data
+
+
+# --- 스트리밍 응답 (?stream=1) ---
+# 행을 전부 메모리에 올리지 않고 server-side cursor 로 하나씩 읽으며 JSON 을 조각으로 내보낸다.
+# 조각을 이어 붙이면 jsonify 결과와 바이트 단위로 같다 (키 정렬, compact, 끝의 줄바꿈).
+
+def wants_stream():
+    # indent 를 쓰는 (debug) 모드에서는 조각을 이어 붙여 같은 출력을 만들 수 없으므로 일반 응답
+    compact = current_app.json.compact
+    pretty = compact is False or (compact is None and current_app.debug)
+    return not pretty and request.args.get("stream", "").lower() in ("1", "true")
+
+
+def json_fragment(value):
+    return http_cache.json_fragment(json_provider, value)
+
+
+def sse(event, data):
+    return http_cache.sse(json_provider, event, data)
+
+
+def stream_foods_by_day(user_id, year, month):
+    """/api/monthly 응답 (group_foods_by_day 결과) 을 조각으로 생성"""
+    with db.connection() as connection, connection.cursor(SSCursor) as cursor:
+        cursor.execute(
+            FOOD_WINDOW_QUERY, (user_id, month_start(year, month), next_month_start(year, month))
+        )
+        writer = DaysWriter(31)
+        yield writer.start()
+        for row in cursor:
+            yield writer.item(row[0].day, json_fragment(food_item(row)))
+        yield writer.close() + "\n"
+
+
+def stream_quarterly_data(user_id, months):
+    """/api/food/quarterly 응답을 조각으로 생성 (USER_NT 는 작으므로 먼저 모두 읽음)"""
+    start, end = month_start(*months[0]), next_month_start(*months[-1])
+    with db.connection() as connection:
+        with connection.cursor() as cursor:
+            cursor.execute(DAILY_TOTALS_WINDOW_QUERY, (user_id, start, end))
+            totals_by_date = index_daily_totals(cursor.fetchall())
+
+        with connection.cursor(SSCursor) as cursor:
+            cursor.execute(FOOD_WINDOW_QUERY, (user_id, start, end))
+            writer = QuarterlyWriter(months, totals_by_date, json_fragment)
+            yield writer.start()
+            try:
+                for row in cursor:
+                    yield writer.row(row)
+            except pymysql.MySQLError as e:
+                # 이미 응답을 보내기 시작했으므로 상태 코드를 바꿀 수 없음
+                logger.error("Database error while streaming: %s", e)
+                raise
+            yield writer.close()
+
+
+@api.route('/api/food/quarterly', methods=['GET', 'POST'])
 def get_quarterly_food():
-    data = request.json
+    data = request_data()
     year = data.get("year")
     start_month = data.get("month")
-    user_id= data.get("UID")
+    user_id = auth.user_id(data.get("UID"))
 
     if not year or not start_month or not user_id:
         return jsonify({"error": "Year, start month, and user_id are required"}), 400
@@ -653,16 +824,104 @@ def get_quarterly_food():
     except ValueError:
         return jsonify({"error": "Year and month must be integers."}), 400
 
+    months = quarter_months(year, start_month)
+
+    try:
+        cached = cached_months(MONTHLY_DATA, user_id, months)
+    except pymysql.MySQLError as e:
+        logger.error("Database error: %s", e)
+        return jsonify(build_quarterly_data(months, None, None))
+    versions = [version for version, _ in cached]
+    etag = http_cache.make_etag("quarterly", user_id, year, start_month, *versions)
+    if http_cache.is_fresh(request, etag):
+        return http_cache.not_modified_response(current_app.response_class, etag)
+    body = response_cache.get(etag)
+    if body is not None:
+        return http_cache.json_response(current_app.response_class, current_app.json, body, etag)
+
+    if wants_stream():
+        fragments = stream_quarterly_data(user_id, months)
+        try:
+            first = next(fragments)
+        except pymysql.MySQLError as e:
+            logger.error("Database error: %s", e)
+            return jsonify(build_quarterly_data(months, None, None))
+        response = Response(buffered(itertools.chain([first], fragments)),
+                            mimetype=current_app.json.mimetype)
+        return http_cache.tag_response(response, etag)
+
+    # 캐시에 있는 달은 그대로 쓰고, 나머지 달만 한 번에 조회한 뒤 메모리에서 월별로 나눔
     quarterly_data = {}
-    for i in range(-1, 2):  # 이전 달, 현재 달, 다음 달 순서로 데이터를 가져오기
-        month = (start_month + i - 1) % 12 + 1
-        current_year = year + (start_month + i - 1) // 12
-        monthly_data = get_monthly_data(current_year, month, user_id)
-        quarterly_data[f"{current_year}-{str(month).zfill(2)}"] = monthly_data
+    missing = []
+    for (current_year, month), (_, monthly_data) in zip(months, cached):
+        quarterly_data[month_label(current_year, month)] = monthly_data
+        if monthly_data is None:
+            missing.append((current_year, month))
+
+    if missing:
+        try:
+            food_rows, totals_by_date = fetch_nutrition_window(
+                user_id, month_start(*missing[0]), next_month_start(*missing[-1])
+            )
+        except pymysql.MySQLError as e:
+            logger.error("Database error: %s", e)
+            food_rows, totals_by_date = None, None
+
+        quarterly_data.update(build_quarterly_data(missing, food_rows, totals_by_date))
+        if food_rows is None:
+            # 오류 응답은 캐시하지 않음
+            return jsonify(quarterly_data)
+        for (current_year, month), version in zip(months, versions):
+            if (current_year, month) in missing:
+                month_cache.set(MONTHLY_DATA, user_id, current_year, month, version,
+                                quarterly_data[month_label(current_year, month)])
+
+    body = http_cache.render_json(current_app.json, quarterly_data)
+    response_cache.set(etag, body)
+    return http_cache.json_response(current_app.response_class, current_app.json, body, etag)
+
+
+startup = {"seconds": None}
+metrics.register_collector("startup", lambda: startup)
+
+
+def create_app():
+    """
+    모든 블루프린트를 등록한 Flask 앱을 만든다.
+    ASGI 모드 (asgi_app.py) 는 이 팩토리를 쓰지 않고 api 블루프린트 라우트를 비동기로 따로 정의한다.
+    처음 만들 때 모듈 import 부터 걸린 시간을 STARTUP_BUDGET_MS (기본 1000) 와 비교해 로그로 남긴다.
+    """
+    global json_provider
+    log.setup_logging()
+
+    app = Flask(__name__)
+    CORS(app)  # Enable cross-origin requests
+    metrics.init_app(app)
+    auth.init_app(app)
+    hedge.init_app(app)
+    app.register_blueprint(api)
+    app.register_blueprint(detail.calendar_api)
+    app.register_blueprint(monthly.food_monthly_api)
+    app.register_blueprint(trends.trends_api)
+    app.register_error_handler(Overloaded, overloaded_response)
+    app.register_error_handler(hedge.DeadlineExceeded, deadline_response)
+    json_provider = app.json
+    month_cache.dumps = app.json.dumps
+
+    if startup["seconds"] is None:
+        startup["seconds"] = time.perf_counter() - MODULE_STARTED
+        budget_ms = float(os.getenv("STARTUP_BUDGET_MS", "1000"))
+        elapsed_ms = startup["seconds"] * 1000
+        if elapsed_ms > budget_ms:
+            logger.warning("Startup took %.0f ms (budget %.0f ms)", elapsed_ms, budget_ms)
+        else:
+            logger.info("Startup took %.0f ms (budget %.0f ms)", elapsed_ms, budget_ms)
+    return app
+
 
-    return jsonify(quarterly_data)
+app = create_app()
 
 if __name__ == "__main__":
-    print("Starting Flask application")  # 디버깅 메시지
+    logger.info("Starting Flask application")
     # insert_test_data()  # 애플리케이션 시작 시 테스트 데이터 삽입
     app.run(host="0.0.0.0", port=5000)
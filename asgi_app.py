@@ -0,0 +1,948 @@
+# asgi_app.py
+# app.py 와 같은 라우트/JSON 응답을 비동기로 제공하는 ASGI 서버 모드
+#   - DB: aiomysql 커넥션 풀 (이벤트 루프를 막지 않음)
+#   - LLM: model.ainvoke (한 프로세스에서 수백 개의 LLM 요청을 동시에 대기)
+#
+# app.py 를 import 하지 않는다 (Flask 앱을 만들지 않음). 캐시/무효화는 month_cache.py, http_cache.py,
+# 응답 만들기는 food_store.py, 백그라운드 작업은 food_jobs.py 를 app.py 와 함께 쓴다.
+#
+# 라우트는 app.create_app() 의 블루프린트를 쓰지 않고 이 파일에 비동기로 따로 정의한다 (aiomysql / ainvoke 를
+# 쓰려면 핸들러가 코루틴이어야 함). 그래서 app.py 의 api 블루프린트 라우트를 바꾸면 여기도 함께 바꿔야 한다.
+# 블루프린트를 공유하는 단일 앱 팩토리는 Flask (app.py) 만 대상이고, ASGI 모드는 그 범위 밖이다.
+# 제공하지 않는 라우트 (Flask 블루프린트로만 있음, app.py 로 실행해야 함):
+#   /api/calendar (detail.py), /api/food/monthly (monthly.py), /api/trends (trends.py)
+#
+# 실행: uvicorn asgi_app:app --host 0.0.0.0 --port 8000
+# 필요 패키지: quart, quart-cors, aiomysql
+
+from quart import Quart, Response, request, jsonify
+from quart_cors import cors
+from dotenv import load_dotenv
+from contextlib import asynccontextmanager
+from datetime import date
+import asyncio
+import logging
+import os
+import time
+import aiomysql
+import pymysql
+
+import auth
+import food_store
+import food_kb
+import hedge
+import http_cache
+import llm
+import metrics
+import nutrition
+from http_cache import response_cache
+from http_cache import STREAM_CHUNK_SIZE
+from month_cache import FOODS_BY_DAY, MONTHLY_DATA, month_cache, invalidate_month as invalidate_month_sync
+from food_jobs import resolve_food_nutrition, delete_pending_food
+from food_store import (
+    MAX_BATCH_FOODS,
+    FOOD_WINDOW_QUERY,
+    DAILY_TOTALS_WINDOW_QUERY,
+    DaysWriter,
+    QuarterlyWriter,
+    build_quarterly_data,
+    food_info_response,
+    food_item,
+    group_foods_by_day,
+    index_daily_totals,
+    month_label,
+    month_start,
+    next_month_start,
+    quarter_months,
+)
+from nutrition_cache import REQUIRED_KEYS
+from jobs import job_queue, PENDING, RUNNING
+from singleflight import AsyncSingleFlight, lease_ttl
+from admission import BACKGROUND, AsyncAdmission, Overloaded
+
+load_dotenv()
+
+app = Quart(__name__)
+app = cors(app, allow_origin="*")  # Enable cross-origin requests
+metrics.init_quart_app(app)
+auth.init_quart_app(app)
+hedge.init_quart_app(app)
+# 월 캐시를 Redis 에 저장할 때도 jsonify 와 같은 직렬화
+month_cache.dumps = app.json.dumps
+
+logger = logging.getLogger(__name__)
+
+pool = None
+
+# execute 시간을 metrics 의 query 단계로 기록하는 커서 (METRICS_ENABLED=0 이면 aiomysql 커서 그대로)
+Cursor = metrics.timed_cursor_class(aiomysql.Cursor)
+DictCursor = metrics.timed_cursor_class(aiomysql.DictCursor)
+SSCursor = metrics.timed_cursor_class(aiomysql.SSCursor)
+
+
+@app.before_serving
+async def create_pool():
+    global pool
+    pool = await aiomysql.create_pool(
+        host=os.getenv("DB_HOST"),
+        db=os.getenv("DB_NAME"),
+        user=os.getenv("DB_USER"),
+        password=os.getenv("DB_PASSWORD"),
+        minsize=int(os.getenv("DB_POOL_MIN_SIZE", "1")),
+        maxsize=int(os.getenv("DB_POOL_SIZE", "10")),
+        pool_recycle=int(os.getenv("DB_POOL_RECYCLE", "300")),
+        autocommit=False,
+        cursorclass=Cursor,
+    )
+
+
+@app.after_serving
+async def close_pool():
+    pool.close()
+    await pool.wait_closed()
+
+
+@asynccontextmanager
+async def acquire():
+    """pool.acquire() 와 같지만 커넥션을 얻기까지 걸린 시간을 db_connect 단계로 기록"""
+    started = time.perf_counter()
+    async with pool.acquire() as connection:
+        metrics.record_phase("db_connect", time.perf_counter() - started)
+        yield connection
+
+
+# --- LLM ---
+
+nutrition_flight = AsyncSingleFlight(llm.nutrition_cache, lease_ttl=lease_ttl())
+# llm.llm_admission 과 같은 설정 (백그라운드 작업은 llm.do() 를 쓰므로 그쪽 한도를 따름)
+llm_admission = AsyncAdmission.from_env()
+metrics.register_collector("llm_admission_async", llm_admission.stats)
+llm_hedger = hedge.AsyncHedger.from_env()
+metrics.register_collector("llm_hedging_async", llm_hedger.stats)
+
+
+async def ainvoke(prompt_value, parse, deadline=None):
+    """llm.invoke() 의 비동기 버전 (진 호출은 취소됨)"""
+    tokens = llm_admission.estimate(prompt_value.to_string())
+
+    async def attempt(until, hedged):
+        async with llm_admission.acquire(tokens, BACKGROUND if hedged else None,
+                                         timeout=0 if hedged else hedge.remaining(until)):
+            with metrics.phase("llm"):
+                model_output = await llm.get_model().ainvoke(prompt_value, timeout=hedge.remaining(until))
+        return parse(model_output)
+
+    return await llm_hedger.run(attempt, deadline or hedge.deadline())
+
+
+async def ado(param, deadline=None):
+    """llm.do() 의 비동기 버전 (같은 프롬프트/파서/캐시 사용, 마감도 같은 방식으로 전달)"""
+    cached = await asyncio.to_thread(llm.known_nutrition, param)
+    if cached is not None:
+        return cached
+    return dict(await nutrition_flight.do(param, lambda: aanalyze(param, deadline), deadline))
+
+
+async def aanalyze(param, deadline=None):
+    steps = llm.pipeline()
+    prompt_value = steps.prompt_template.invoke({"string": param})
+    output = await ainvoke(prompt_value,
+                           lambda model_output: nutrition.normalize(steps.output_parser.invoke(model_output)),
+                           deadline)
+    await asyncio.to_thread(llm.nutrition_cache.set, param, output)
+    return output
+
+
+async def ado_many(params, deadline=None):
+    """llm.do_many() 의 비동기 버전"""
+    results = [await asyncio.to_thread(llm.known_nutrition, param) for param in params]
+    missing = [i for i, result in enumerate(results) if result is None]
+    if not missing:
+        return results
+
+    strings = "\n".join(f"{n}. {params[i]}" for n, i in enumerate(missing, start=1))
+    steps = llm.pipeline()
+    prompt_value = steps.meal_prompt_template.invoke({"strings": strings})
+    items = await ainvoke(prompt_value,
+                          lambda model_output: steps.meal_output_parser.invoke(model_output).get("items") or [],
+                          deadline)
+
+    if len(items) != len(missing):
+        # 개수가 맞지 않으면 하나씩 다시 분석 (동시에 요청)
+        fallbacks = await asyncio.gather(*(ado(params[i], deadline) for i in missing))
+        for i, result in zip(missing, fallbacks):
+            results[i] = result
+        return results
+
+    for i, item in zip(missing, items):
+        item = nutrition.normalize(item)
+        if isinstance(item, dict) and all(key in item for key in REQUIRED_KEYS):
+            await asyncio.to_thread(llm.nutrition_cache.set, params[i], item)
+            results[i] = item
+        else:
+            results[i] = await ado(params[i], deadline)
+    return results
+
+
+async def ado_stream(param, deadline=None):
+    """llm.do_stream() 의 비동기 버전"""
+    cached = await asyncio.to_thread(llm.known_nutrition, param)
+    if cached is not None:
+        yield cached, True
+        return
+
+    steps = llm.pipeline()
+    prompt_value = steps.prompt_template.invoke({"string": param})
+    until = deadline or hedge.deadline()
+    pieces = []
+
+    async def chunks():
+        started = time.perf_counter()
+        try:
+            async for chunk in llm.get_model().astream(prompt_value, timeout=hedge.remaining(until)):
+                pieces.append(chunk.content)
+                yield chunk
+                hedge.remaining(until)
+        finally:
+            metrics.record_phase("llm", time.perf_counter() - started)
+
+    tokens = llm_admission.estimate(prompt_value.to_string())
+    async with llm_admission.acquire(tokens, timeout=hedge.remaining(until)):
+        sent = {}
+        async for partial in steps.output_parser.atransform(chunks()):
+            fields = llm.settled_fields(partial)
+            if fields != sent:
+                sent = fields
+                yield fields, False
+
+    output = nutrition.normalize(steps.output_parser.parse("".join(pieces)))
+    await asyncio.to_thread(llm.nutrition_cache.set, param, output)
+    yield output, True
+
+
+@app.errorhandler(Overloaded)
+async def overloaded(e):
+    """app.overloaded_response 와 같은 503 + Retry-After"""
+    response = jsonify({"error": "요청이 많아 잠시 후 다시 시도해 주세요.", "retry_after": e.retry_after})
+    response.status_code = 503
+    response.headers["Retry-After"] = str(e.retry_after)
+    return response
+
+
+@app.errorhandler(hedge.DeadlineExceeded)
+async def deadline_exceeded(e):
+    """app.deadline_response 와 같은 504"""
+    return jsonify({"error": "분석 시간이 초과되었습니다. 다시 시도해 주세요."}), 504
+
+
+# --- routes (app.py 와 같은 요청/응답 형식) ---
+
+@app.route("/api/login", methods=["POST"])
+async def login():
+    data = await request.get_json()
+
+    try:
+        async with acquire() as connection:
+            async with connection.cursor(DictCursor) as cursor:
+                query = "SELECT * FROM USER WHERE ID = %s AND PASSWORD = %s"
+                await cursor.execute(query, (data["id"], data["password"]))
+                user = await cursor.fetchone()
+
+        if user:
+            user.pop("PASSWORD", None)
+            token = auth.issue_token(user)
+            return jsonify({"message": "Login successful", "user": user, "token": token}), 200
+        else:
+            return jsonify({"error": "Invalid credentials"}), 401
+
+    except pymysql.MySQLError as e:
+        return jsonify({"error": f"An error occurred: {str(e)}"}), 500
+
+
+async def save_to_db(user_id, nutrition_info):
+    today = date.today()
+    async with acquire() as connection:
+        async with connection.cursor() as cursor:
+            food_index = await food_store.insert_food_async(cursor, user_id, today, nutrition_info)
+        await connection.commit()
+    await invalidate_month(user_id, today)
+    return today, food_index
+
+
+# app.SEND_SAVES_TO_DB 와 같은 설정
+SEND_SAVES_TO_DB = os.getenv("SEND_SAVES_TO_DB", "0").lower() in ("1", "true")
+
+
+@app.route("/api/send", methods=["POST"])
+async def send():
+    """
+    app.send 와 같음: 일반 응답은 기본적으로 저장하지 않고 (/api/send2 로 저장, SEND_SAVES_TO_DB=1 이면 바로 저장),
+    SSE 모드는 결과가 나오면 FOOD 에 저장
+    """
+    data = await request.get_json()
+    user_id = auth.user_id(data.get("user_id"))
+    food_name = data.get("food_name")
+
+    if not user_id or not food_name:
+        return jsonify({"error": "user_id and food_name are required"}), 400
+
+    if wants_events():
+        # app.send 와 같게: 503 / 504 는 첫 이벤트를 만들 때 일반 응답으로
+        fields = ado_stream(food_name)
+        first = await fields.__anext__()
+        response = Response(send_events(user_id, first, fields), mimetype="text/event-stream")
+        response.headers["Cache-Control"] = "no-cache"
+        response.headers["X-Accel-Buffering"] = "no"
+        response.timeout = None  # 마감은 hedge.deadline() 이 지킴
+        return response
+
+    nutrition_info = await ado(food_name)
+
+    if SEND_SAVES_TO_DB:
+        await save_to_db(user_id, nutrition_info)
+
+    return jsonify(nutrition_info)
+
+
+def wants_events():
+    return ("text/event-stream" in request.headers.get("Accept", "")
+            or request.args.get("events", "").lower() in ("1", "true"))
+
+
+async def send_events(user_id, first, fields):
+    """app.send_events 의 비동기 버전"""
+
+    async def chained():
+        yield first
+        async for item in fields:
+            yield item
+
+    try:
+        async for nutrition_info, complete in chained():
+            if not complete:
+                yield sse("partial", nutrition_info).encode()
+                continue
+            if not all(nutrition_info.get(key) is not None for key in REQUIRED_KEYS):
+                yield sse("error", {"error": "영양 정보를 분석하지 못했습니다.", "status": 502}).encode()
+                return
+            day, food_index = await save_to_db(user_id, nutrition_info)
+            yield sse("result", {**nutrition_info, "DATE": day.isoformat(), "FOOD_INDEX": food_index}).encode()
+    except hedge.DeadlineExceeded:
+        yield sse("error", {"error": "분석 시간이 초과되었습니다. 다시 시도해 주세요.", "status": 504}).encode()
+    except pymysql.MySQLError as e:
+        logger.error("Database error: %s", e)
+        yield sse("error", {"error": "DB save error", "status": 500}).encode()
+    except Exception:
+        logger.exception("Streaming analysis failed")
+        yield sse("error", {"error": "영양 정보를 분석하지 못했습니다.", "status": 500}).encode()
+
+
+@app.route("/api/send2", methods=["POST"])
+async def send2():
+    data = await request.get_json()
+    user_id = auth.user_id(data.get("user_id"))
+    nutrition_info = data.get("nutrition_info")
+    try:
+        await save_to_db(user_id, nutrition_info)
+        return jsonify({"message": "good"}), 200
+    except Exception:
+        return jsonify({"message": "DB save error"}), 500
+
+
+def wants_async():
+    return request.args.get("async", "").lower() in ("1", "true")
+
+
+def job_accepted_response(job_id, message, data):
+    return (
+        jsonify(
+            {
+                "message": message,
+                "job_id": job_id,
+                "status_url": f"/api/jobs/{job_id}",
+                "data": data,
+            }
+        ),
+        202,
+    )
+
+
+@app.route("/api/add_food", methods=["POST"])
+async def add_food():
+    data = await request.get_json()
+
+    user_id = auth.user_id(data.get("ID"))
+    date = data.get("DATE")
+    food_name = data.get("FOOD_NAME")
+
+    if not user_id or not date or not food_name:
+        return jsonify({"error": "필수 정보가 누락되었습니다."}), 400
+
+    if wants_async():
+        return await add_food_async(user_id, date, food_name)
+
+    nutrition_info = await ado(food_name)
+
+    try:
+        async with acquire() as connection:
+            async with connection.cursor() as cursor:
+                food_index = await food_store.insert_food_async(cursor, user_id, date, nutrition_info)
+            await connection.commit()
+        await invalidate_month(user_id, date)
+    except pymysql.MySQLError as e:
+        return jsonify({"error": str(e)}), 500
+
+    added_food_info = food_info_response(user_id, date, food_index, nutrition_info)
+    return (
+        jsonify(
+            {
+                "message": "음식이 성공적으로 추가되었습니다.",
+                "data": added_food_info,
+            }
+        ),
+        201,
+    )
+
+
+@app.route("/api/add_foods", methods=["POST"])
+async def add_foods():
+    data = await request.get_json()
+
+    user_id = auth.user_id(data.get("ID"))
+    date = data.get("DATE")
+    food_names = data.get("FOOD_NAMES")
+
+    if (
+        not user_id
+        or not date
+        or not isinstance(food_names, list)
+        or not food_names
+        or not all(isinstance(name, str) and name.strip() for name in food_names)
+    ):
+        return jsonify({"error": "필수 정보가 누락되었습니다."}), 400
+    if len(food_names) > MAX_BATCH_FOODS:
+        return jsonify({"error": f"한 번에 최대 {MAX_BATCH_FOODS}개까지 추가할 수 있습니다."}), 400
+
+    nutrition_infos = await ado_many(food_names)
+
+    try:
+        async with acquire() as connection:
+            async with connection.cursor() as cursor:
+                food_indexes = await food_store.insert_foods_async(cursor, user_id, date, nutrition_infos)
+            await connection.commit()
+        await invalidate_month(user_id, date)
+    except pymysql.MySQLError as e:
+        return jsonify({"error": str(e)}), 500
+
+    added_foods = [
+        food_info_response(user_id, date, food_index, nutrition_info)
+        for food_index, nutrition_info in zip(food_indexes, nutrition_infos)
+    ]
+    return (
+        jsonify(
+            {
+                "message": "음식이 성공적으로 추가되었습니다.",
+                "data": added_foods,
+            }
+        ),
+        201,
+    )
+
+
+async def add_food_async(user_id, date, food_name):
+    # 대기 행만 넣고, 분석은 app.py 와 같은 작업 큐(스레드)에서 처리
+    try:
+        async with acquire() as connection:
+            async with connection.cursor() as cursor:
+                food_index = await food_store.insert_pending_food_async(cursor, user_id, date, food_name)
+            await connection.commit()
+        await invalidate_month(user_id, date)
+    except pymysql.MySQLError as e:
+        return jsonify({"error": str(e)}), 500
+
+    job_id = job_queue.submit(
+        "add_food",
+        resolve_food_nutrition,
+        user_id, date, food_index, food_name,
+        owner=user_id,
+        on_failure=delete_pending_food,
+    )
+    return job_accepted_response(
+        job_id,
+        "음식 분석이 접수되었습니다.",
+        {"ID": user_id, "DATE": date, "FOOD_INDEX": food_index, "food_name": food_name},
+    )
+
+
+@app.route("/api/update_food", methods=["POST"])
+async def update_food():
+    data = await request.get_json()
+
+    user_id = auth.user_id(data.get("ID"))
+    date = data.get("DATE")
+    food_index = data.get("FOOD_INDEX")
+    new_food_name = data.get("NEW_FOOD_NAME")
+
+    if not user_id or not date or not food_index or not new_food_name:
+        return jsonify({"error": "필수 정보가 누락되었습니다."}), 400
+
+    if wants_async():
+        job_id = job_queue.submit(
+            "update_food", resolve_food_nutrition, user_id, date, food_index, new_food_name, owner=user_id
+        )
+        return job_accepted_response(
+            job_id,
+            "음식 수정이 접수되었습니다.",
+            {"ID": user_id, "DATE": date, "FOOD_INDEX": food_index, "food_name": new_food_name},
+        )
+
+    new_nutrition_info = await ado(new_food_name)
+
+    try:
+        async with acquire() as connection:
+            async with connection.cursor() as cursor:
+                updated = await food_store.update_food_async(
+                    cursor, user_id, date, food_index, new_nutrition_info
+                )
+            await connection.commit()
+        if updated:
+            await invalidate_month(user_id, date)
+    except pymysql.MySQLError as e:
+        return jsonify({"error": str(e)}), 500
+
+    updated_food_info = food_info_response(user_id, date, food_index, new_nutrition_info)
+    return (
+        jsonify(
+            {
+                "message": "음식이 성공적으로 수정되었습니다.",
+                "data": updated_food_info,
+            }
+        ),
+        200,
+    )
+
+
+@app.route("/api/jobs/<job_id>", methods=["GET"])
+async def get_job(job_id):
+    user_id = auth.user_id(request.args.get("ID"))
+    if not user_id:
+        return jsonify({"error": "ID is required"}), 400
+    try:
+        wait = min(float(request.args.get("wait", 0)), 30)
+    except ValueError:
+        return jsonify({"error": "wait must be a number"}), 400
+
+    job = await asyncio.to_thread(job_queue.get, job_id)
+    if job is None or job["owner"] != str(user_id):
+        return jsonify({"error": "Job not found"}), 404
+    if wait > 0 and job["status"] in (PENDING, RUNNING):
+        job = await asyncio.to_thread(job_queue.get, job_id, wait)
+
+    body = {
+        "job_id": job["job_id"],
+        "kind": job["kind"],
+        "status": job["status"],
+        "data": job["result"],
+        "error": job["error"],
+    }
+    status_code = 202 if job["status"] in (PENDING, RUNNING) else 200
+    return jsonify(body), status_code
+
+
+@app.route("/api/llm_stats", methods=["GET"])
+async def llm_stats():
+    return jsonify({
+        "food_kb": food_kb.default_kb().stats(),
+        "cache": llm.nutrition_cache.stats(),
+        "singleflight": nutrition_flight.stats(),
+        # 비동기 작업(job) 모드는 llm.do() 를 쓰므로 그쪽 single-flight 도 함께 보고
+        "singleflight_jobs": llm.nutrition_flight.stats(),
+        "response_cache": response_cache.stats(),
+        "month_cache": month_cache.stats(),
+        "admission": llm_admission.stats(),
+        "admission_jobs": llm.llm_admission.stats(),
+        "hedging": llm_hedger.stats(),
+        "hedging_jobs": llm.llm_hedger.stats(),
+    }), 200
+
+
+@app.route("/api/register", methods=["POST", "PUT"])
+async def register():
+    data = await request.get_json()
+    if not data or "id" not in data or "pw" not in data:
+        return jsonify({"error": "Invalid input"}), 400
+
+    try:
+        async with acquire() as connection:
+            async with connection.cursor(DictCursor) as cursor:
+                if request.method == "POST":
+                    query = """INSERT INTO USER (ID, PASSWORD, BODY_WEIGHT, HEIGHT, AGE, GENDER, ACTIVITY, RDI)
+                               VALUES (%s, %s, %s, %s, %s, %s, %s, %s)"""
+                    values = (
+                        data["id"],
+                        data["pw"],
+                        data["bodyweight"],
+                        data["height"],
+                        data["age"],
+                        data["gender"],
+                        data["activity"],
+                        None,
+                    )
+                    await cursor.execute(query, values)
+                    await connection.commit()
+                    return jsonify({"message": "User registered successfully"}), 201
+
+                check_user_query = "SELECT * FROM USER WHERE ID = %s"
+                await cursor.execute(check_user_query, (data["id"],))
+                existing_user = await cursor.fetchone()
+
+                if not existing_user:
+                    return jsonify({"error": "User not found"}), 404
+
+                query = """UPDATE USER SET PASSWORD=%s, BODY_WEIGHT=%s, HEIGHT=%s, AGE=%s, GENDER=%s, ACTIVITY=%s
+                           WHERE ID=%s"""
+                values = (
+                    data["pw"],
+                    data["bodyweight"],
+                    data["height"],
+                    data["age"],
+                    data["gender"],
+                    data["activity"],
+                    data["id"],
+                )
+                await cursor.execute(query, values)
+                updated = cursor.rowcount
+                if updated:
+                    await food_store.bump_profile_version_async(cursor, data["id"])
+                await connection.commit()
+
+                if updated == 0:
+                    return (
+                        jsonify({"message": "No changes made to the user information"}),
+                        200,
+                    )
+
+                # app.register 와 같게: 프로필이 바뀌었으므로 새 토큰을 돌려줌
+                refreshed = {}
+                if auth.current_user() is not None:
+                    refreshed["token"] = auth.issue_token(auth.updated_profile(existing_user, data))
+
+                query_nutrients = (
+                    """SELECT RD_PROTEIN, RD_CARBO, RD_FAT FROM USER_NT WHERE ID=%s"""
+                )
+                await cursor.execute(query_nutrients, (data["id"],))
+                nutrients_result = await cursor.fetchone()
+
+                if nutrients_result is None:
+                    return jsonify({"error": "User NT not found", **refreshed}), 404
+
+                rd_protein, rd_carbo, rd_fat = nutrients_result
+                return (
+                    jsonify(
+                        {
+                            "message": "User updated successfully",
+                            "RD_PROTEIN": rd_protein,
+                            "RD_CARBO": rd_carbo,
+                            "RD_FAT": rd_fat,
+                            **refreshed,
+                        }
+                    ),
+                    200,
+                )
+
+    except pymysql.MySQLError as e:
+        logger.error("Database query error: %s", e)
+        return jsonify({"error": "Database query failed"}), 500
+
+
+@app.route("/api/delete_food", methods=["DELETE"])
+async def delete_food():
+    user_id = auth.user_id(request.args.get("ID"))
+    date = request.args.get("DATE")
+    food_index = request.args.get("FOOD_INDEX")
+
+    if not user_id or not date or not food_index:
+        return jsonify({"error": "필수 정보가 누락되었습니다."}), 400
+
+    try:
+        async with acquire() as connection:
+            async with connection.cursor() as cursor:
+                deleted = await food_store.delete_food_async(cursor, user_id, date, food_index)
+            await connection.commit()
+
+        if not deleted:
+            return jsonify({"message": "삭제할 데이터가 없습니다."}), 404
+
+        await invalidate_month(user_id, date)
+        return jsonify({"message": "음식이 성공적으로 삭제되었습니다."}), 200
+
+    except pymysql.MySQLError as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@app.route("/api/monthly", methods=["GET", "POST"])
+async def get_monthly_food():
+    data = await request_data()
+    year = data.get("year")
+    month = data.get("month")
+    UID = auth.user_id(data.get("UID"))
+    if not year or not month:
+        return jsonify({"error": "Year and month are required"}), 400
+
+    try:
+        year = int(year)
+        month = int(month)
+        if month < 1 or month > 12:
+            return jsonify({"error": "Invalid month. Please enter a value between 1 and 12."}), 400
+    except ValueError:
+        return jsonify({"error": "Year and month must be integers."}), 400
+
+    try:
+        ((version, foods_by_day),) = await cached_months(FOODS_BY_DAY, UID, [(year, month)])
+        etag = http_cache.make_etag("monthly", UID, year, month, version)
+        if http_cache.is_fresh(request, etag):
+            return http_cache.not_modified_response(app.response_class, etag)
+        body = response_cache.get(etag)
+        if body is not None:
+            return http_cache.json_response(app.response_class, app.json, body, etag)
+
+        if wants_stream():
+            fragments = stream_foods_by_day(UID, year, month)
+            first = await fragments.__anext__()
+            response = Response(buffered(first, fragments), mimetype=app.json.mimetype)
+            return http_cache.tag_response(response, etag)
+
+        if foods_by_day is None:
+            async with acquire() as connection:
+                async with connection.cursor() as cursor:
+                    await cursor.execute(
+                        FOOD_WINDOW_QUERY, (UID, month_start(year, month), next_month_start(year, month))
+                    )
+                    results = await cursor.fetchall()
+            foods_by_day = group_foods_by_day(results)
+            await asyncio.to_thread(month_cache.set, FOODS_BY_DAY, UID, year, month, version, foods_by_day)
+
+        body = http_cache.render_json(app.json, foods_by_day)
+        response_cache.set(etag, body)
+        return http_cache.json_response(app.response_class, app.json, body, etag)
+    except pymysql.MySQLError as e:
+        logger.error("Database error: %s", e)
+        return jsonify({"error": "Database error"}), 500
+
+
+async def invalidate_month(user_id, day):
+    # Redis 왕복이 있을 수 있으므로 스레드에서
+    await asyncio.to_thread(invalidate_month_sync, user_id, day)
+
+
+async def request_data():
+    if request.method == "GET":
+        return request.args
+    return await request.get_json()
+
+
+async def cached_months(kind, user_id, months):
+    """app.cached_months() 와 같음 (마감된 달은 캐시 항목의 버전을 그대로 씀)"""
+    found = {key: month_cache.lookup(kind, user_id, *key) for key in months}
+    unchecked = [key for key in months if found[key] is None]
+    if unchecked:
+        for key, version in zip(unchecked, await data_versions(user_id, unchecked)):
+            # Redis 왕복이 있을 수 있으므로 스레드에서
+            found[key] = (version, await asyncio.to_thread(month_cache.get, kind, user_id, *key, version))
+    return [found[key] for key in months]
+
+
+async def get_user_nutritional_needs(user_id):
+    """app.get_user_nutritional_needs() 와 같음 (토큰의 프로필이 있으면 DB 조회 없음)"""
+    profile = auth.current_profile(user_id)
+    if profile is not None:
+        return profile["BODY_WEIGHT"], profile["RDI"]
+    try:
+        async with acquire() as connection:
+            async with connection.cursor() as cursor:
+                await cursor.execute("SELECT BODY_WEIGHT, RDI FROM USER WHERE ID = %s", (user_id,))
+                return await cursor.fetchone()
+    except pymysql.MySQLError as e:
+        logger.error("Database error: %s", e)
+        return None
+
+
+@app.route("/api/nutritional_needs", methods=["GET"])
+async def nutritional_needs():
+    """app.nutritional_needs 와 같음"""
+    user_id = auth.user_id(request.args.get("ID"))
+    if not user_id:
+        return jsonify({"error": "ID is required"}), 400
+
+    needs = await get_user_nutritional_needs(user_id)
+    if needs is None:
+        return jsonify({"error": "User not found"}), 404
+    body_weight, rdi = needs
+    return jsonify({"ID": user_id, "BODY_WEIGHT": nutrition.number(body_weight), "RDI": nutrition.number(rdi)})
+
+
+async def data_versions(user_id, months):
+    """app.data_versions() 와 같음 (버전을 데이터보다 먼저 읽음)"""
+    async with acquire() as connection:
+        async with connection.cursor() as cursor:
+            return await food_store.month_versions_async(
+                cursor, user_id, [month_start(y, m) for y, m in months]
+            )
+
+
+# --- 스트리밍 응답 (?stream=1, app.py 와 같은 조각 생성기 사용) ---
+
+def wants_stream():
+    compact = app.json.compact
+    pretty = compact is False or (compact is None and app.debug)
+    return not pretty and request.args.get("stream", "").lower() in ("1", "true")
+
+
+def json_fragment(value):
+    return http_cache.json_fragment(app.json, value)
+
+
+def sse(event, data):
+    return http_cache.sse(app.json, event, data)
+
+
+async def buffered(first, fragments, size=STREAM_CHUNK_SIZE):
+    chunk = [first]
+    length = len(first)
+    async for fragment in fragments:
+        chunk.append(fragment)
+        length += len(fragment)
+        if length >= size:
+            yield "".join(chunk).encode()
+            chunk = []
+            length = 0
+    if chunk:
+        yield "".join(chunk).encode()
+
+
+async def stream_foods_by_day(user_id, year, month):
+    async with acquire() as connection:
+        async with connection.cursor(SSCursor) as cursor:
+            await cursor.execute(
+                FOOD_WINDOW_QUERY, (user_id, month_start(year, month), next_month_start(year, month))
+            )
+            writer = DaysWriter(31)
+            yield writer.start()
+            while True:
+                row = await cursor.fetchone()
+                if row is None:
+                    break
+                yield writer.item(row[0].day, json_fragment(food_item(row)))
+            yield writer.close() + "\n"
+
+
+async def stream_quarterly_data(user_id, months):
+    start, end = month_start(*months[0]), next_month_start(*months[-1])
+    async with acquire() as connection:
+        async with connection.cursor() as cursor:
+            await cursor.execute(DAILY_TOTALS_WINDOW_QUERY, (user_id, start, end))
+            totals_by_date = index_daily_totals(await cursor.fetchall())
+
+        async with connection.cursor(SSCursor) as cursor:
+            await cursor.execute(FOOD_WINDOW_QUERY, (user_id, start, end))
+            writer = QuarterlyWriter(months, totals_by_date, json_fragment)
+            yield writer.start()
+            while True:
+                try:
+                    row = await cursor.fetchone()
+                except pymysql.MySQLError as e:
+                    logger.error("Database error while streaming: %s", e)
+                    raise
+                if row is None:
+                    break
+                yield writer.row(row)
+            yield writer.close()
+
+
+async def fetch_nutrition_window(user_id, start, end):
+    async with acquire() as connection:
+        async with connection.cursor() as cursor:
+            await cursor.execute(FOOD_WINDOW_QUERY, (user_id, start, end))
+            food_rows = await cursor.fetchall()
+
+            await cursor.execute(DAILY_TOTALS_WINDOW_QUERY, (user_id, start, end))
+            totals_rows = await cursor.fetchall()
+
+    return food_rows, index_daily_totals(totals_rows)
+
+
+@app.route("/api/food/quarterly", methods=["GET", "POST"])
+async def get_quarterly_food():
+    data = await request_data()
+    year = data.get("year")
+    start_month = data.get("month")
+    user_id = auth.user_id(data.get("UID"))
+
+    if not year or not start_month or not user_id:
+        return jsonify({"error": "Year, start month, and user_id are required"}), 400
+
+    try:
+        year = int(year)
+        start_month = int(start_month)
+        if start_month < 1 or start_month > 12:
+            return jsonify({"error": "Invalid month. Please enter a value between 1 and 12."}), 400
+    except ValueError:
+        return jsonify({"error": "Year and month must be integers."}), 400
+
+    months = quarter_months(year, start_month)
+
+    try:
+        cached = await cached_months(MONTHLY_DATA, user_id, months)
+    except pymysql.MySQLError as e:
+        logger.error("Database error: %s", e)
+        return jsonify(build_quarterly_data(months, None, None))
+    versions = [version for version, _ in cached]
+    etag = http_cache.make_etag("quarterly", user_id, year, start_month, *versions)
+    if http_cache.is_fresh(request, etag):
+        return http_cache.not_modified_response(app.response_class, etag)
+    body = response_cache.get(etag)
+    if body is not None:
+        return http_cache.json_response(app.response_class, app.json, body, etag)
+
+    if wants_stream():
+        fragments = stream_quarterly_data(user_id, months)
+        try:
+            first = await fragments.__anext__()
+        except pymysql.MySQLError as e:
+            logger.error("Database error: %s", e)
+            return jsonify(build_quarterly_data(months, None, None))
+        response = Response(buffered(first, fragments), mimetype=app.json.mimetype)
+        return http_cache.tag_response(response, etag)
+
+    quarterly_data = {}
+    missing = []
+    for (current_year, month), (_, monthly_data) in zip(months, cached):
+        quarterly_data[month_label(current_year, month)] = monthly_data
+        if monthly_data is None:
+            missing.append((current_year, month))
+
+    if missing:
+        try:
+            food_rows, totals_by_date = await fetch_nutrition_window(
+                user_id, month_start(*missing[0]), next_month_start(*missing[-1])
+            )
+        except pymysql.MySQLError as e:
+            logger.error("Database error: %s", e)
+            food_rows, totals_by_date = None, None
+
+        quarterly_data.update(build_quarterly_data(missing, food_rows, totals_by_date))
+        if food_rows is None:
+            return jsonify(quarterly_data)
+        for (current_year, month), version in zip(months, versions):
+            if (current_year, month) in missing:
+                await asyncio.to_thread(
+                    month_cache.set, MONTHLY_DATA, user_id, current_year, month, version,
+                    quarterly_data[month_label(current_year, month)],
+                )
+    body = http_cache.render_json(app.json, quarterly_data)
+    response_cache.set(etag, body)
+    return http_cache.json_response(app.response_class, app.json, body, etag)
+
+
+if __name__ == "__main__":
+    app.run(host="0.0.0.0", port=8000)
@@ -0,0 +1,214 @@
+# auth.py
+# 로그인 토큰: /api/login 이 USER 행에서 이후 요청에 필요한 프로필 (BODY_WEIGHT, RDI ...) 을 골라
+# itsdangerous 로 서명한 stateless 토큰을 발급하고, 다른 라우트는 Authorization: Bearer <token> 을 검증해 쓴다.
+# 토큰에 프로필이 들어 있으므로 get_user_nutritional_needs (GET /api/nutritional_needs) 같은 프로필 조회는
+# DB 를 거치지 않는다 (current_profile).
+#
+#   AUTH_SECRET     서명 키. 모든 worker 가 같은 값을 써야 함 (없으면 프로세스마다 임의 키 -> 재시작하면 토큰 무효)
+#   AUTH_TOKEN_TTL  토큰 유효 시간 (초, 기본 86400)
+#   AUTH_REQUIRED   1 이면 공개 라우트 (로그인, 회원가입, /metrics) 외에는 토큰이 없으면 401.
+#                   기본 0: 토큰 없이 user id 만 보내는 기존 클라이언트도 그대로 동작
+#
+# 토큰이 있으면 요청의 user id (ID / UID / user_id / id) 는 토큰의 ID 와 같아야 하고 (다르면 403),
+# 생략하면 토큰의 ID 를 쓴다 (user_id()).
+# 서버에 저장하지 않으므로 발급한 토큰을 취소할 수는 없다. 프로필을 바꾸면 (PUT /api/register) 새 토큰을 돌려주고,
+# 옛 토큰의 프로필은 만료될 때까지 남는다.
+
+from contextvars import ContextVar
+from datetime import date, datetime
+from decimal import Decimal
+from dotenv import load_dotenv
+import logging
+import os
+import secrets
+import threading
+
+from itsdangerous import BadSignature, SignatureExpired, URLSafeTimedSerializer
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+REQUIRED = os.getenv("AUTH_REQUIRED", "0").lower() in ("1", "true")
+TOKEN_TTL = int(os.getenv("AUTH_TOKEN_TTL", "86400"))
+
+# 토큰에 담는 USER 컬럼 (PASSWORD 는 담지 않음)
+PROFILE_FIELDS = ("ID", "BODY_WEIGHT", "HEIGHT", "AGE", "GENDER", "ACTIVITY", "RDI", "PROFILE_VERSION")
+# 요청 본문/쿼리 문자열에서 user id 가 들어오는 키 (라우트마다 다름)
+USER_ID_KEYS = ("ID", "UID", "user_id", "id")
+# 토큰 없이 호출할 수 있는 (경로, 메서드)
+PUBLIC_ROUTES = {
+    ("/api/login", "POST"),
+    ("/api/register", "POST"),
+    ("/metrics", "GET"),
+}
+
+_secret = os.getenv("AUTH_SECRET")
+if not _secret:
+    logger.warning("AUTH_SECRET is not set; login tokens are only valid in this process")
+    _secret = secrets.token_hex(32)
+_serializer = URLSafeTimedSerializer(_secret, salt="dietback-login")
+
+# 현재 요청의 토큰 프로필 (없으면 None). 요청마다 before_request 에서 다시 설정됨
+_user = ContextVar("dietback_user", default=None)
+
+_lock = threading.Lock()
+_counts = {"issued": 0, "accepted": 0, "rejected": 0, "expired": 0, "missing": 0, "forbidden": 0, "profile_hits": 0}
+
+
+def _count(key):
+    with _lock:
+        _counts[key] += 1
+
+
+def stats():
+    with _lock:
+        return dict(_counts, required=int(REQUIRED), ttl_seconds=TOKEN_TTL)
+
+
+def _plain(value):
+    """DB 값을 JSON 으로 서명할 수 있는 값으로 (DECIMAL -> float, DATE -> 문자열)"""
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return value
+
+
+def profile_from_user(user):
+    """USER 행 (dict) 에서 토큰에 담을 프로필만 골라냄"""
+    return {field: _plain(user.get(field)) for field in PROFILE_FIELDS}
+
+
+def updated_profile(user, data):
+    """PUT /api/register 로 바뀐 값을 반영한 USER 행 (새 토큰 발급용)"""
+    return {
+        **user,
+        "BODY_WEIGHT": data["bodyweight"],
+        "HEIGHT": data["height"],
+        "AGE": data["age"],
+        "GENDER": data["gender"],
+        "ACTIVITY": data["activity"],
+        "PROFILE_VERSION": (user.get("PROFILE_VERSION") or 0) + 1,
+    }
+
+
+def issue_token(user):
+    _count("issued")
+    return _serializer.dumps(profile_from_user(user))
+
+
+def verify_token(token):
+    """서명과 유효 시간을 확인해 프로필 dict 를 돌려줌. 잘못되었거나 만료되었으면 None"""
+    try:
+        profile = _serializer.loads(token, max_age=TOKEN_TTL)
+    except SignatureExpired:
+        _count("expired")
+        return None
+    except BadSignature:
+        _count("rejected")
+        return None
+    _count("accepted")
+    return profile
+
+
+def bearer_token(header):
+    if not header:
+        return None
+    scheme, _, token = header.partition(" ")
+    if scheme.lower() != "bearer" or not token.strip():
+        return None
+    return token.strip()
+
+
+def current_user():
+    """현재 요청의 토큰 프로필 (토큰 없이 들어온 요청이면 None)"""
+    return _user.get()
+
+
+def user_id(requested=None):
+    """라우트에서 쓸 user id: 요청에 있으면 그 값 (미들웨어가 토큰과 같은지 확인함), 없으면 토큰의 ID"""
+    if requested:
+        return requested
+    user = _user.get()
+    return user["ID"] if user else requested
+
+
+def current_profile(user_id):
+    """토큰이 user_id 의 것이면 토큰에 담긴 프로필, 아니면 None (호출한 쪽이 DB 에서 읽음)"""
+    user = _user.get()
+    if user is None or str(user["ID"]) != str(user_id):
+        return None
+    _count("profile_hits")
+    return user
+
+
+def _requested_ids(args, body):
+    for source in (args, body):
+        if not hasattr(source, "get"):  # 본문이 없거나 JSON 객체가 아님
+            continue
+        for key in USER_ID_KEYS:
+            value = source.get(key)
+            if value not in (None, ""):
+                yield value
+
+
+def check_request(path, method, header, args, body):
+    """
+    요청을 검사해 (오류 응답 본문, 상태 코드) 또는 None 을 돌려주고, 통과하면 현재 사용자를 설정한다.
+    Flask / Quart 훅이 같이 쓴다.
+    """
+    _user.set(None)
+    if method == "OPTIONS":  # CORS preflight
+        return None
+
+    public = (path, method) in PUBLIC_ROUTES
+    token = bearer_token(header)
+    user = verify_token(token) if token is not None else None
+    if user is None:
+        if public:  # 로그인/회원가입은 만료된 토큰을 들고 와도 받아줌
+            return None
+        if token is not None:
+            return {"error": "Invalid or expired token"}, 401
+        if REQUIRED:
+            _count("missing")
+            return {"error": "Authentication required"}, 401
+        return None
+
+    if not public:
+        for requested in _requested_ids(args, body):
+            if str(requested) != str(user["ID"]):
+                _count("forbidden")
+                return {"error": "Token does not match the requested user"}, 403
+    _user.set(user)
+    return None
+
+
+def init_app(app):
+    """Flask 앱의 모든 라우트 (블루프린트 포함) 앞에서 토큰을 검증"""
+    from flask import jsonify, request
+
+    @app.before_request
+    def _authenticate():
+        body = request.get_json(silent=True) if request.is_json else None
+        failed = check_request(
+            request.path, request.method, request.headers.get("Authorization"), request.args, body
+        )
+        if failed is not None:
+            error, status_code = failed
+            return jsonify(error), status_code
+
+
+def init_quart_app(app):
+    """Quart (asgi_app.py) 용 init_app"""
+    from quart import jsonify, request
+
+    @app.before_request
+    async def _authenticate():
+        body = await request.get_json(silent=True) if request.is_json else None
+        failed = check_request(
+            request.path, request.method, request.headers.get("Authorization"), request.args, body
+        )
+        if failed is not None:
+            error, status_code = failed
+            return jsonify(error), status_code
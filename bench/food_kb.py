@@ -0,0 +1,77 @@
+# bench/food_kb.py
+# 로컬 성분표(food_kb) 검색 지연시간과 적중률 측정
+#   python bench/food_kb.py
+#   python bench/food_kb.py --log data/sample_meal_log.txt --kb data/food_kb.csv --synthetic 100000
+# --synthetic N 을 주면 성분표에 가짜 음식 N 개를 더 넣어 규모가 커졌을 때의 지연시간도 확인한다.
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from food_kb import FoodKnowledgeBase, parse_quantity
+
+SYLLABLES = "가나다라마바사아자차카타파하고노도로모보소오조초코토포호구누두루무부수우주추쿠투푸후"
+
+
+def add_synthetic(kb, count, seed=0):
+    rng = random.Random(seed)
+    for n in range(count):
+        name = "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(3, 6))) + str(n)
+        kb.add(name, 100, rng.uniform(50, 800), rng.uniform(0, 100), rng.uniform(0, 40), rng.uniform(0, 40))
+
+
+def percentile(sorted_values, p):
+    index = min(len(sorted_values) - 1, int(round(p / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--kb", default=os.path.join(ROOT, "data", "food_kb.csv"))
+    parser.add_argument("--log", default=os.path.join(ROOT, "data", "sample_meal_log.txt"))
+    parser.add_argument("--synthetic", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    kb = FoodKnowledgeBase.load(args.kb)
+    load_ms = (time.perf_counter() - started) * 1000
+    if args.synthetic:
+        add_synthetic(kb, args.synthetic)
+
+    with open(args.log, encoding="utf-8") as f:
+        meals = [line.strip() for line in f if line.strip()]
+
+    hits = 0
+    for meal in meals:
+        result = kb.lookup(meal)
+        if result is not None:
+            hits += 1
+        if args.verbose:
+            print(f"{meal!r:>24} -> {parse_quantity(meal)} -> {result}")
+
+    timings = []
+    for _ in range(args.repeat):
+        for meal in meals:
+            started = time.perf_counter_ns()
+            kb.lookup(meal)
+            timings.append((time.perf_counter_ns() - started) / 1000)
+    timings.sort()
+
+    print(f"foods in kb      : {len(kb)} (csv load {load_ms:.1f} ms)")
+    print(f"meal log entries : {len(meals)}")
+    print(f"hit rate         : {hits / len(meals):.1%} ({hits}/{len(meals)}, 나머지는 LLM 으로)")
+    print(f"lookup latency us: mean {statistics.mean(timings):.1f}  "
+          f"p50 {percentile(timings, 50):.1f}  p95 {percentile(timings, 95):.1f}  "
+          f"p99 {percentile(timings, 99):.1f}")
+
+
+if __name__ == "__main__":
+    main()
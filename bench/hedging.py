@@ -0,0 +1,126 @@
+# bench/hedging.py
+# hedged request (hedge.py) 효과 측정 (DB / Azure 없이)
+#   대부분은 빠르고 가끔 (--slow-ratio) 몇 초씩 걸리는 가짜 모델 (synthetic + TailLatency) 로 llm.do() 를 동시에 호출해
+#   hedge 를 끈 경우와 켠 경우의 p50/p95/p99/평균 지연시간과 요청당 모델 호출 수를 비교한다.
+#   음식 이름은 매번 달라 성분표/캐시/single-flight 를 거치지 않고 모두 모델을 호출한다.
+#
+#   python bench/hedging.py
+#   python bench/hedging.py --requests 600 --concurrency 32 --slow-ratio 0.05 --max-spend 1.2
+#
+# hedge 를 켠 쪽의 p99 가 줄지 않거나, 요청당 모델 호출 수가 끈 쪽의 --max-spend 배 (기본 2) 이상이면 exit 1
+
+import argparse
+import itertools
+import os
+import random
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# LLM 결과 캐시를 디스크에 남기지 않음, Azure 설정 없이 불러오기
+os.environ.setdefault("NUTRITION_CACHE_PATH", "")
+os.environ.setdefault("LLM_BACKEND", "synthetic")
+# 입장 제어가 아니라 모델 지연시간만 보이도록 동시 호출 한도를 넉넉하게
+os.environ.setdefault("LLM_MAX_IN_FLIGHT", "256")
+os.environ.setdefault("LLM_QUEUE_SIZE", "256")
+
+import llm
+from llm_backend import SyntheticModel
+
+
+class TailLatency:
+    """llm_backend.Latency 대신: 대부분 base_ms 근처, slow_ratio 만큼은 slow_ms 범위. 호출 수도 셈"""
+
+    def __init__(self, base_ms=200.0, jitter_ms=30.0, slow_ratio=0.03, slow_ms=(1500.0, 3000.0), seed=None):
+        self.base = base_ms / 1000
+        self.jitter = jitter_ms / 1000
+        self.slow_ratio = slow_ratio
+        self.slow = (slow_ms[0] / 1000, slow_ms[1] / 1000)
+        self.calls = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def sample(self):
+        with self._lock:
+            self.calls += 1
+            if self._rng.random() < self.slow_ratio:
+                return self._rng.uniform(*self.slow)
+            return max(0.0, self._rng.gauss(self.base, self.jitter))
+
+
+def percentile(samples, p):
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(round(p / 100 * (len(samples) - 1))))]
+
+
+_names = itertools.count()
+
+
+def run(requests, concurrency, latency):
+    """llm.do() 를 requests 번 (매번 다른 음식) 동시에 호출. (지연시간 ms 목록, 요청당 모델 호출 수)"""
+
+    def one(_):
+        started = time.perf_counter()
+        llm.do(f"벤치 음식 {next(_names)}번")
+        return (time.perf_counter() - started) * 1000
+
+    calls_before = latency.calls
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        durations = list(executor.map(one, range(requests)))
+    return durations, (latency.calls - calls_before) / requests
+
+
+def report(name, durations, spend):
+    print(f"{name:<10} p50 {statistics.median(durations):7.1f}  p95 {percentile(durations, 95):7.1f}  "
+          f"p99 {percentile(durations, 99):7.1f}  mean {statistics.mean(durations):7.1f} ms  "
+          f"calls/request {spend:.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--warmup", type=int, default=60, help="p95 를 잡기 위해 먼저 보내는 요청 수")
+    parser.add_argument("--base-ms", type=float, default=200)
+    parser.add_argument("--slow-ratio", type=float, default=0.03)
+    parser.add_argument("--slow-ms", type=float, nargs=2, default=(1500, 3000))
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--max-spend", type=float, default=2.0, help="허용하는 호출 수 배율 (켠 쪽 / 끈 쪽)")
+    args = parser.parse_args()
+
+    latency = TailLatency(args.base_ms, slow_ratio=args.slow_ratio, slow_ms=args.slow_ms, seed=args.seed)
+    llm.set_model(SyntheticModel(latency))
+    llm.preload()
+    hedger = llm.llm_hedger
+
+    # 끈 상태로 호출 시간 표본을 먼저 쌓음 (hedge 하지 않아도 기록됨)
+    hedger.enabled = False
+    run(args.warmup, args.concurrency, latency)
+
+    off, off_spend = run(args.requests, args.concurrency, latency)
+    hedger.enabled = True
+    on, on_spend = run(args.requests, args.concurrency, latency)
+
+    print(f"model      : {args.base_ms:.0f} ms, {args.slow_ratio:.0%} at {args.slow_ms[0]:.0f}-{args.slow_ms[1]:.0f} ms")
+    report("hedge off", off, off_spend)
+    report("hedge on", on, on_spend)
+    print(f"hedger     : {hedger.stats()}")
+
+    failed = False
+    if percentile(on, 99) >= percentile(off, 99):
+        print("FAIL: p99 did not improve with hedging")
+        failed = True
+    if on_spend >= off_spend * args.max_spend:
+        print(f"FAIL: model calls per request {on_spend:.3f} >= {args.max_spend:g}x of {off_spend:.3f}")
+        failed = True
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
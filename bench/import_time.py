@@ -0,0 +1,96 @@
+# bench/import_time.py
+# worker cold start 측정: 새 프로세스에서 app 을 import 하고 첫 요청(/metrics)에 응답하기까지의 시간
+#   python bench/import_time.py
+#   python bench/import_time.py --runs 10 --budget-ms 500       # 중앙값이 예산을 넘으면 exit 1
+#   python bench/import_time.py --top 15                        # python -X importtime 기준 느린 모듈
+#
+# LLM 파이프라인(langchain)은 첫 LLM 요청 때 불러오므로 import 만으로는 로드되지 않아야 하고,
+# --with-llm 을 주면 llm.preload() 까지 포함한 시간(= gunicorn preload 모드에서 master 가 치르는 비용)도 잰다.
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROBE = r"""
+import sys, time
+started = time.perf_counter()
+import app
+imported = time.perf_counter()
+response = app.app.test_client().get("/metrics")
+assert response.status_code == 200, response.status_code
+ready = time.perf_counter()
+llm_ms = 0.0
+if {with_llm}:
+    import llm
+    llm.preload()
+    llm_ms = (time.perf_counter() - ready) * 1000
+langchain = any(name.startswith("langchain") for name in sys.modules) and not {with_llm}
+print((imported - started) * 1000, (ready - started) * 1000, llm_ms, int(langchain))
+"""
+
+
+def run_probe(with_llm):
+    env = dict(os.environ, LOG_LEVEL="WARNING", PYTHONPATH=ROOT)
+    output = subprocess.run(
+        [sys.executable, "-c", PROBE.format(with_llm=with_llm)],
+        cwd=ROOT, env=env, check=True, capture_output=True, text=True,
+    ).stdout.split()
+    import_ms, ready_ms, llm_ms, langchain = output
+    return float(import_ms), float(ready_ms), float(llm_ms), langchain == "1"
+
+
+def slowest_modules(top):
+    env = dict(os.environ, LOG_LEVEL="WARNING", PYTHONPATH=ROOT)
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app"],
+        cwd=ROOT, env=env, check=True, capture_output=True, text=True,
+    ).stderr
+    rows = []
+    for line in stderr.splitlines():
+        # "import time:       self [us] | cumulative | imported package"
+        if not line.startswith("import time:"):
+            continue
+        self_us, cumulative_us, name = (part.strip() for part in line[len("import time:"):].split("|", 2))
+        if cumulative_us.isdigit():
+            rows.append((int(cumulative_us), int(self_us), name))
+    rows.sort(reverse=True)
+    return rows[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--with-llm", action="store_true")
+    parser.add_argument("--budget-ms", type=float, default=0, help="ready 중앙값 예산 (0 이면 검사 안 함)")
+    parser.add_argument("--top", type=int, default=0)
+    args = parser.parse_args()
+
+    results = [run_probe(args.with_llm) for _ in range(args.runs)]
+    import_ms = [r[0] for r in results]
+    ready_ms = [r[1] for r in results]
+    llm_ms = [r[2] for r in results]
+
+    print(f"runs             : {args.runs}")
+    print(f"import app ms    : median {statistics.median(import_ms):.0f}  min {min(import_ms):.0f}  max {max(import_ms):.0f}")
+    print(f"first response ms: median {statistics.median(ready_ms):.0f}  min {min(ready_ms):.0f}  max {max(ready_ms):.0f}")
+    if args.with_llm:
+        print(f"llm.preload ms   : median {statistics.median(llm_ms):.0f}")
+    if any(r[3] for r in results):
+        print("WARNING: langchain was imported by 'import app' (LLM pipeline is no longer lazy)")
+
+    if args.top:
+        print("\nslowest imports (cumulative ms, self ms):")
+        for cumulative_us, self_us, name in slowest_modules(args.top):
+            print(f"{cumulative_us / 1000:>9.1f}  {self_us / 1000:>7.1f}  {name}")
+
+    if args.budget_ms and statistics.median(ready_ms) > args.budget_ms:
+        print(f"\nFAIL: median {statistics.median(ready_ms):.0f} ms > budget {args.budget_ms:.0f} ms")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+# bench/loadtest.py
+# 동기 Flask 서버(app.py)와 비동기 ASGI 서버(asgi_app.py)의 처리량 비교
+#
+#   python app.py                                   # :5000
+#   uvicorn asgi_app:app --port 8000 --workers 1    # :8000
+#   python bench/loadtest.py --targets http://localhost:5000,http://localhost:8000 \
+#       --user test --concurrency 200 --duration 30
+#
+# 같은 요청 조합을 각 서버에 --concurrency 개의 동시 클라이언트로 --duration 초 동안 보내고
+# 처리량(req/s)과 p50/p95/p99 지연시간을 출력한다.
+#
+# 측정 결과: 아직 없음. MySQL 과 LLM 백엔드가 있는 환경에서 두 서버를 띄워 실행한 뒤 여기에 기록할 것.
+
+import argparse
+import asyncio
+import random
+import statistics
+import time
+
+import httpx
+
+FOODS = ["떡볶이", "돈까스 2개", "김치찌개", "비빔밥", "라면", "에너지바 1개", "삼겹살 1인분", "김밥 한 줄"]
+
+
+def build_requests(user_id, year, month, mix):
+    """(이름, method, path, json) 목록 - mix 에 따라 가중치를 둔다"""
+    requests = {
+        "send": ("POST", "/api/send", lambda: {"user_id": user_id, "food_name": random.choice(FOODS)}),
+        "monthly": ("POST", "/api/monthly", lambda: {"year": year, "month": month, "UID": user_id}),
+        "quarterly": ("POST", "/api/food/quarterly", lambda: {"year": year, "month": month, "UID": user_id}),
+    }
+    weighted = []
+    for item in mix.split(","):
+        name, weight = item.split(":")
+        weighted.extend([(name, *requests[name])] * int(weight))
+    return weighted
+
+
+def percentile(samples, p):
+    if not samples:
+        return 0.0
+    samples = sorted(samples)
+    k = min(len(samples) - 1, int(round(p / 100 * (len(samples) - 1))))
+    return samples[k]
+
+
+async def run_target(base_url, weighted, concurrency, duration, timeout):
+    latencies = {}
+    errors = 0
+    deadline = time.perf_counter() + duration
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=timeout, limits=limits) as client:
+        async def worker():
+            nonlocal errors
+            while time.perf_counter() < deadline:
+                name, method, path, body = random.choice(weighted)
+                started = time.perf_counter()
+                try:
+                    response = await client.request(method, path, json=body())
+                    ok = response.status_code < 500
+                except httpx.HTTPError:
+                    ok = False
+                elapsed = (time.perf_counter() - started) * 1000
+                if ok:
+                    latencies.setdefault(name, []).append(elapsed)
+                else:
+                    errors += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        wall = time.perf_counter() - started
+
+    return latencies, errors, wall
+
+
+def report(base_url, latencies, errors, wall):
+    total = sum(len(samples) for samples in latencies.values())
+    print(f"\n== {base_url}: {total} ok, {errors} errors in {wall:.1f}s -> {total / wall:.1f} req/s")
+    print(f"{'route':>10} | {'count':>6} | {'p50 ms':>8} | {'p95 ms':>8} | {'p99 ms':>8} | {'mean ms':>8}")
+    for name, samples in sorted(latencies.items()):
+        print(
+            f"{name:>10} | {len(samples):>6} | {percentile(samples, 50):>8.1f} | "
+            f"{percentile(samples, 95):>8.1f} | {percentile(samples, 99):>8.1f} | "
+            f"{statistics.mean(samples):>8.1f}"
+        )
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--targets", default="http://localhost:5000,http://localhost:8000")
+    parser.add_argument("--user", required=True, help="요청에 사용할 사용자 ID")
+    parser.add_argument("--year", type=int, default=2024)
+    parser.add_argument("--month", type=int, default=7)
+    parser.add_argument("--mix", default="send:2,monthly:1,quarterly:1", help="이름:가중치 목록")
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--duration", type=float, default=20)
+    parser.add_argument("--timeout", type=float, default=60)
+    args = parser.parse_args()
+
+    weighted = build_requests(args.user, args.year, args.month, args.mix)
+    for base_url in args.targets.split(","):
+        latencies, errors, wall = await run_target(
+            base_url, weighted, args.concurrency, args.duration, args.timeout
+        )
+        report(base_url, latencies, errors, wall)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
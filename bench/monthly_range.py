@@ -0,0 +1,123 @@
+# bench/monthly_range.py
+# 월별 FOOD 조회: YEAR()/MONTH() 조건 vs 반열림 날짜 구간 조건 지연시간 비교
+# 로컬 MySQL/MariaDB (.env 의 DB_*) 에 migrations/ 를 적용한 뒤 실행:
+#   python bench/monthly_range.py --scales 1000,10000,100000,1000000
+# 사용자 한 명에게 하루 20개씩 과거 날짜로 행을 채워 가며 규모별로 측정하고, 끝나면 지운다.
+#
+# 측정 결과: 아직 없음. MySQL/MariaDB 가 있는 환경에서 실행한 뒤 규모별 p50/p95 를 여기에 기록할 것.
+
+import argparse
+import os
+import statistics
+import sys
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import db
+from food_store import month_start, next_month_start
+
+ROWS_PER_DAY = 20
+LAST_DAY = date(2024, 12, 31)
+TARGET_YEAR, TARGET_MONTH = 2024, 6
+
+FUNCTION_QUERY = """
+    SELECT DATE, FOOD_INDEX, FOOD_NAME, FOOD_PT, FOOD_FAT, FOOD_CH, FOOD_KCAL
+    FROM FOOD
+    WHERE YEAR(DATE) = %s AND MONTH(DATE) = %s AND ID = %s
+    ORDER BY DATE
+"""
+
+RANGE_QUERY = """
+    SELECT DATE, FOOD_INDEX, FOOD_NAME, FOOD_PT, FOOD_FAT, FOOD_CH, FOOD_KCAL
+    FROM FOOD
+    WHERE ID = %s AND DATE >= %s AND DATE < %s
+    ORDER BY DATE
+"""
+
+
+def seed(user_id, start_row, end_row):
+    """행 번호 [start_row, end_row) 를 LAST_DAY 부터 과거로 채움"""
+    batch = []
+    with db.connection() as connection:
+        with connection.cursor() as cursor:
+            for n in range(start_row, end_row):
+                day = LAST_DAY - timedelta(days=n // ROWS_PER_DAY)
+                batch.append((user_id, day, n % ROWS_PER_DAY, "bench", "10", "5", "2", "100"))
+                if len(batch) == 5000:
+                    cursor.executemany(
+                        """INSERT INTO FOOD (ID, DATE, FOOD_INDEX, FOOD_NAME, FOOD_CH, FOOD_PT, FOOD_FAT, FOOD_KCAL)
+                           VALUES (%s, %s, %s, %s, %s, %s, %s, %s)""",
+                        batch,
+                    )
+                    connection.commit()
+                    batch = []
+            if batch:
+                cursor.executemany(
+                    """INSERT INTO FOOD (ID, DATE, FOOD_INDEX, FOOD_NAME, FOOD_CH, FOOD_PT, FOOD_FAT, FOOD_KCAL)
+                       VALUES (%s, %s, %s, %s, %s, %s, %s, %s)""",
+                    batch,
+                )
+        connection.commit()
+
+
+def timed(sql, params, repeat):
+    samples = []
+    with db.connection() as connection:
+        with connection.cursor() as cursor:
+            for _ in range(repeat):
+                started = time.perf_counter()
+                cursor.execute(sql, params)
+                cursor.fetchall()
+                samples.append((time.perf_counter() - started) * 1000)
+            cursor.execute("EXPLAIN " + sql, params)
+            plan = cursor.fetchone()
+    return statistics.median(samples), plan
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--scales", default="1000,10000,100000,1000000")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--user", default="bench_monthly")
+    args = parser.parse_args()
+    scales = sorted(int(n) for n in args.scales.split(","))
+
+    with db.connection() as connection:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                """INSERT IGNORE INTO USER (ID, PASSWORD, BODY_WEIGHT, HEIGHT, AGE, GENDER, ACTIVITY, RDI)
+                   VALUES (%s, %s, %s, %s, %s, %s, %s, %s)""",
+                (args.user, "bench", 70, 175, 30, 1, 3, None),
+            )
+            cursor.execute("DELETE FROM FOOD WHERE ID = %s", (args.user,))
+        connection.commit()
+
+    print(f"{'rows':>9} | {'YEAR()/MONTH() ms':>18} | {'range ms':>9} | range plan")
+    seeded = 0
+    try:
+        for scale in scales:
+            seed(args.user, seeded, scale)
+            seeded = scale
+            with db.connection() as connection:
+                with connection.cursor() as cursor:
+                    cursor.execute("ANALYZE TABLE FOOD")
+                    cursor.fetchall()
+
+            function_ms, _ = timed(FUNCTION_QUERY, (TARGET_YEAR, TARGET_MONTH, args.user), args.repeat)
+            range_ms, plan = timed(
+                RANGE_QUERY,
+                (args.user, month_start(TARGET_YEAR, TARGET_MONTH), next_month_start(TARGET_YEAR, TARGET_MONTH)),
+                args.repeat,
+            )
+            print(f"{scale:>9} | {function_ms:>18.2f} | {range_ms:>9.2f} | {plan}")
+    finally:
+        with db.connection() as connection:
+            with connection.cursor() as cursor:
+                cursor.execute("DELETE FROM FOOD WHERE ID = %s", (args.user,))
+            connection.commit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+# bench/stress_food_index.py
+# FOOD_INDEX 동시 할당 스트레스 테스트
+# 로컬 MySQL/MariaDB (.env 의 DB_*) 에 migrations/001_food_index_seq.sql 을 적용한 뒤 실행:
+#   python bench/stress_food_index.py --adds 500 --threads 64
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import db
+import food_store
+
+TEST_DATE = "2000-01-01"
+
+
+def setup(user_id):
+    with db.connection() as connection:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                """INSERT IGNORE INTO USER (ID, PASSWORD, BODY_WEIGHT, HEIGHT, AGE, GENDER, ACTIVITY, RDI)
+                   VALUES (%s, %s, %s, %s, %s, %s, %s, %s)""",
+                (user_id, "stress", 70, 175, 30, 1, 3, None),
+            )
+        connection.commit()
+    cleanup(user_id)
+
+
+def cleanup(user_id):
+    with db.connection() as connection:
+        with connection.cursor() as cursor:
+            cursor.execute("DELETE FROM FOOD WHERE ID = %s AND DATE = %s", (user_id, TEST_DATE))
+            cursor.execute("DELETE FROM FOOD_INDEX_SEQ WHERE ID = %s AND DATE = %s", (user_id, TEST_DATE))
+        connection.commit()
+
+
+def add_one(user_id, n):
+    nutrition_info = {
+        "food_name": f"stress-{n}",
+        "calorie": "100",
+        "carbohydrate": "10",
+        "protein": "5",
+        "fat": "2",
+    }
+    with db.connection() as connection:
+        with connection.cursor() as cursor:
+            food_index = food_store.insert_food(cursor, user_id, TEST_DATE, nutrition_info)
+        connection.commit()
+    return food_index
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--adds", type=int, default=500)
+    parser.add_argument("--threads", type=int, default=64)
+    parser.add_argument("--user", default="stress_food_index")
+    args = parser.parse_args()
+
+    db.pool.max_size = args.threads
+    setup(args.user)
+    try:
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.threads) as executor:
+            returned = list(executor.map(lambda n: add_one(args.user, n), range(args.adds)))
+        elapsed = time.perf_counter() - started
+
+        with db.connection() as connection:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT FOOD_INDEX FROM FOOD WHERE ID = %s AND DATE = %s ORDER BY FOOD_INDEX",
+                    (args.user, TEST_DATE),
+                )
+                stored = [row[0] for row in cursor.fetchall()]
+
+        expected = list(range(args.adds))
+        print(f"{args.adds} adds with {args.threads} threads in {elapsed:.2f}s "
+              f"({args.adds / elapsed:.0f} adds/s)")
+        print(f"pool: {db.pool_stats()}")
+
+        ok = True
+        if sorted(returned) != expected:
+            print("FAIL: returned indexes are not unique and contiguous")
+            ok = False
+        if stored != expected:
+            print(f"FAIL: stored indexes are not unique and contiguous ({len(stored)} rows)")
+            ok = False
+        if ok:
+            print("OK: indexes are unique and contiguous")
+        return 0 if ok else 1
+    finally:
+        cleanup(args.user)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
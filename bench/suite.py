@@ -0,0 +1,311 @@
+# bench/suite.py
+# 재현 가능한 부하/성능 회귀 측정
+#   app.create_app() 으로 만든 앱 (/api/calendar 포함) 을 이 프로세스 안에서 띄우고, LLM 은 지연시간을 조절할 수 있는
+#   synthetic 모델 (llm_backend.py) 로 바꾼 뒤, 규모별로 가짜 사용자/FOOD 기록을 채워 login, add_food, monthly, quarterly,
+#   calendar, trends 요청을 섞어 보낸다. 라우트별 p50/p95/p99 와 처리량을 출력한다.
+#
+# 로컬 MySQL/MariaDB (.env 의 DB_*, 운영 DB 말고 버려도 되는 DB) 에 migrations/ 를 적용한 뒤 실행:
+#   python bench/suite.py --scales 30,365,1095 --users 20 --concurrency 16 --requests 2000
+#   python bench/suite.py --json-out bench-result.json
+#   python bench/suite.py --baseline bench-result.json --max-regression 0.25   # p95 가 25% 넘게 느려지면 exit 1
+#
+# 사용자 ID 는 모두 "bench-" 로 시작하며, --keep 을 주지 않으면 끝날 때 지운다.
+
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# LLM 결과 캐시를 디스크에 남기지 않음 (실행마다 같은 조건에서 시작)
+os.environ.setdefault("NUTRITION_CACHE_PATH", "")
+# Azure 설정 없이 app 을 불러올 수 있게 (모델은 main() 에서 지연시간을 준 synthetic 모델로 바꿈)
+os.environ.setdefault("LLM_BACKEND", "synthetic")
+
+import httpx
+from werkzeug.serving import make_server
+
+import db
+import food_store
+import llm
+from app import create_app
+from llm_backend import Latency, SyntheticModel
+
+USER_PREFIX = "bench-"
+LAST_DAY = date(2024, 12, 31)
+# 성분표(food_kb)에 있는 음식 -> LLM 을 거치지 않음
+KNOWN_FOODS = ["떡볶이", "돈까스 2개", "김치찌개", "비빔밥", "라면", "삼겹살 1인분", "김밥 한 줄"]
+ROUTES = ("login", "add_food", "monthly", "quarterly", "calendar", "trends")
+
+
+# --- 데이터 준비 ---
+
+def user_ids(scale, users):
+    return [f"{USER_PREFIX}{scale}d-{n}" for n in range(users)]
+
+
+def seed_scale(scale, users, foods_per_day, rng):
+    """사용자마다 LAST_DAY 부터 과거 scale 일 동안 하루 foods_per_day 개의 FOOD 행을 채움"""
+    start = LAST_DAY - timedelta(days=scale - 1)
+    end = LAST_DAY + timedelta(days=1)
+    with db.connection() as connection:
+        with connection.cursor() as cursor:
+            for user_id in user_ids(scale, users):
+                cursor.execute(
+                    """INSERT IGNORE INTO USER (ID, PASSWORD, BODY_WEIGHT, HEIGHT, AGE, GENDER, ACTIVITY, RDI)
+                       VALUES (%s, %s, %s, %s, %s, %s, %s, %s)""",
+                    (user_id, "bench", 70, 175, 30, 1, 3, None),
+                )
+                cursor.execute("SELECT COUNT(*) FROM FOOD WHERE ID = %s", (user_id,))
+                if cursor.fetchone()[0]:
+                    continue  # --keep 으로 남겨 둔 데이터 재사용
+
+                rows, counters = [], []
+                for offset in range(scale):
+                    day = start + timedelta(days=offset)
+                    for food_index in range(foods_per_day):
+                        rows.append((
+                            user_id, day, food_index, rng.choice(KNOWN_FOODS),
+                            rng.randint(5, 90), rng.randint(1, 35),
+                            rng.randint(1, 30), rng.randint(80, 800),
+                        ))
+                    # food_store.allocate_food_indexes 와 같은 인자: 새 행의 LAST_INDEX 는 count - 1
+                    counters.append((user_id, day, foods_per_day - 1, foods_per_day))
+                for n in range(0, len(rows), 5000):
+                    cursor.executemany(food_store.INSERT_FOOD_QUERY, rows[n:n + 5000])
+                cursor.executemany(food_store.ALLOCATE_FOOD_INDEX_QUERY, counters)
+                food_store.rebuild_daily_totals(connection, start, end, user_id)
+                connection.commit()
+        connection.commit()
+    return start
+
+
+def cleanup():
+    with db.connection() as connection:
+        with connection.cursor() as cursor:
+            for table in ("FOOD", "USER_NT", "FOOD_INDEX_SEQ", "USER_MONTH_VERSION", "USER"):
+                cursor.execute(f"DELETE FROM {table} WHERE ID LIKE %s", (USER_PREFIX + "%",))
+        connection.commit()
+
+
+# --- 요청 ---
+
+def build_mix(mix):
+    weighted = []
+    for item in mix.split(","):
+        name, weight = item.split(":")
+        if name not in ROUTES:
+            raise SystemExit(f"unknown route in --mix: {name} (one of {', '.join(ROUTES)})")
+        weighted.extend([name] * int(weight))
+    return weighted
+
+
+def make_request(name, rng, users, first_day, scale, unknown_ratio):
+    """(method, path, params, json)"""
+    user_id = rng.choice(users)
+    day = first_day + timedelta(days=rng.randrange(scale))
+    if name == "login":
+        return "POST", "/api/login", None, {"id": user_id, "password": "bench"}
+    if name == "add_food":
+        if rng.random() < unknown_ratio:
+            food = f"벤치 음식 {rng.randrange(10 ** 9)}"  # 처음 보는 음식 -> 가짜 LLM 호출
+        else:
+            food = rng.choice(KNOWN_FOODS)
+        return "POST", "/api/add_food", None, {"ID": user_id, "DATE": day.isoformat(), "FOOD_NAME": food}
+    if name == "monthly":
+        return "POST", "/api/monthly", None, {"year": day.year, "month": day.month, "UID": user_id}
+    if name == "quarterly":
+        return "POST", "/api/food/quarterly", None, {"year": day.year, "month": day.month, "UID": user_id}
+    if name == "trends":
+        # 채워 둔 기간 전체 (--scales 1826 이면 5년치)
+        params = {"ID": user_id, "start": first_day.isoformat(), "end": LAST_DAY.isoformat()}
+        return "GET", "/api/trends", params, None
+    return "GET", "/api/calendar", {"ID": user_id, "DATE": day.isoformat()}, None
+
+
+def run_scale(base_url, weighted, users, first_day, scale, args):
+    latencies = {name: [] for name in set(weighted)}
+    errors = {name: 0 for name in set(weighted)}
+    lock = threading.Lock()
+    remaining = [args.warmup + args.requests]
+
+    def worker(worker_id):
+        rng = random.Random(f"{args.seed}-{scale}-{worker_id}")
+        etags = {}
+        client = httpx.Client(base_url=base_url, timeout=args.timeout)
+        try:
+            while True:
+                with lock:
+                    if remaining[0] <= 0:
+                        return
+                    remaining[0] -= 1
+                    warm = remaining[0] >= args.requests
+                name = rng.choice(weighted)
+                method, path, params, body = make_request(
+                    name, rng, users, first_day, scale, args.unknown_ratio
+                )
+                headers = {}
+                key = (path, json.dumps(params, sort_keys=True), json.dumps(body, sort_keys=True))
+                if args.etag and key in etags:
+                    headers["If-None-Match"] = etags[key]
+
+                started = time.perf_counter()
+                try:
+                    response = client.request(method, path, params=params, json=body, headers=headers)
+                    ok = response.status_code < 500
+                except httpx.HTTPError:
+                    response, ok = None, False
+                elapsed = (time.perf_counter() - started) * 1000
+
+                if ok and args.etag and response.headers.get("ETag"):
+                    etags[key] = response.headers["ETag"]
+                if warm:
+                    continue
+                with lock:
+                    if ok:
+                        latencies[name].append(elapsed)
+                    else:
+                        errors[name] += 1
+        finally:
+            client.close()
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        list(executor.map(worker, range(args.concurrency)))
+    wall = time.perf_counter() - started
+    return latencies, errors, wall
+
+
+def percentile(samples, p):
+    if not samples:
+        return 0.0
+    samples = sorted(samples)
+    k = min(len(samples) - 1, int(round(p / 100 * (len(samples) - 1))))
+    return samples[k]
+
+
+def summarize(latencies, errors, wall):
+    routes = {}
+    for name, samples in sorted(latencies.items()):
+        routes[name] = {
+            "count": len(samples),
+            "errors": errors[name],
+            "p50_ms": round(percentile(samples, 50), 2),
+            "p95_ms": round(percentile(samples, 95), 2),
+            "p99_ms": round(percentile(samples, 99), 2),
+            "mean_ms": round(statistics.mean(samples), 2) if samples else 0.0,
+        }
+    total = sum(len(samples) for samples in latencies.values())
+    return {"requests": total, "wall_s": round(wall, 3), "throughput_rps": round(total / wall, 1), "routes": routes}
+
+
+def report(scale, summary):
+    print(f"\n== {scale} days of history: {summary['requests']} requests in {summary['wall_s']:.1f}s "
+          f"-> {summary['throughput_rps']:.1f} req/s")
+    print(f"{'route':>10} | {'count':>6} | {'errors':>6} | {'p50 ms':>8} | {'p95 ms':>8} | {'p99 ms':>8} | {'mean ms':>8}")
+    for name, row in summary["routes"].items():
+        print(
+            f"{name:>10} | {row['count']:>6} | {row['errors']:>6} | {row['p50_ms']:>8.1f} | "
+            f"{row['p95_ms']:>8.1f} | {row['p99_ms']:>8.1f} | {row['mean_ms']:>8.1f}"
+        )
+
+
+def compare(results, baseline, max_regression):
+    """baseline 보다 p95 가 max_regression 비율 넘게 느려진 (규모, 라우트) 목록"""
+    regressions = []
+    for scale, summary in results["scales"].items():
+        for name, row in summary["routes"].items():
+            before = baseline.get("scales", {}).get(scale, {}).get("routes", {}).get(name)
+            if not before or not before["p95_ms"]:
+                continue
+            ratio = row["p95_ms"] / before["p95_ms"]
+            if ratio > 1 + max_regression:
+                regressions.append((scale, name, before["p95_ms"], row["p95_ms"], ratio))
+    return regressions
+
+
+def serve(wsgi_app):
+    server = make_server("127.0.0.1", 0, wsgi_app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--scales", default="30,365,1095", help="사용자당 FOOD 기록 일수 목록")
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--foods-per-day", type=int, default=5)
+    parser.add_argument("--mix", default="login:1,add_food:2,monthly:3,quarterly:2,calendar:2",
+                        help="라우트:가중치 목록")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=2000, help="규모별 측정 요청 수")
+    parser.add_argument("--warmup", type=int, default=100, help="측정 전에 보내고 버리는 요청 수")
+    parser.add_argument("--unknown-ratio", type=float, default=0.3,
+                        help="add_food 중 성분표/캐시에 없는 음식 (LLM 호출) 비율")
+    parser.add_argument("--llm-latency-ms", type=float, default=800)
+    parser.add_argument("--llm-jitter-ms", type=float, default=200)
+    parser.add_argument("--etag", action="store_true", help="받은 ETag 를 If-None-Match 로 다시 보냄")
+    parser.add_argument("--timeout", type=float, default=60)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--keep", action="store_true", help="끝나도 bench- 데이터를 지우지 않음")
+    parser.add_argument("--json-out")
+    parser.add_argument("--baseline", help="이전 --json-out 결과와 p95 비교")
+    parser.add_argument("--max-regression", type=float, default=0.25)
+    args = parser.parse_args()
+
+    weighted = build_mix(args.mix)
+    stub = SyntheticModel(Latency(args.llm_latency_ms, args.llm_jitter_ms, args.seed))
+    llm.set_model(stub)
+
+    server = serve(create_app())
+    base_url = f"http://127.0.0.1:{server.server_port}"
+
+    results = {
+        "config": {key: value for key, value in vars(args).items() if key not in ("json_out", "baseline")},
+        "scales": {},
+    }
+    try:
+        for scale in (int(value) for value in args.scales.split(",")):
+            rng = random.Random(f"{args.seed}-seed-{scale}")
+            seed_started = time.perf_counter()
+            first_day = seed_scale(scale, args.users, args.foods_per_day, rng)
+            print(f"\nseeded {args.users} users x {scale} days in {time.perf_counter() - seed_started:.1f}s")
+
+            calls_before = stub.calls
+            latencies, errors, wall = run_scale(
+                base_url, weighted, user_ids(scale, args.users), first_day, scale, args
+            )
+            summary = summarize(latencies, errors, wall)
+            summary["llm_calls"] = stub.calls - calls_before
+            results["scales"][str(scale)] = summary
+            report(scale, summary)
+    finally:
+        server.shutdown()
+        if not args.keep:
+            cleanup()
+
+    if args.json_out:
+        with open(args.json_out, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.max_regression)
+        for scale, name, before, after, ratio in regressions:
+            print(f"REGRESSION {scale}d {name}: p95 {before:.1f} -> {after:.1f} ms ({ratio:.2f}x)")
+        if regressions:
+            sys.exit(1)
+        print(f"\nno p95 regression over {args.max_regression:.0%} against {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
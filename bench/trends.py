@@ -0,0 +1,92 @@
+# bench/trends.py
+# /api/trends 계산 시간 측정 (DB 없이)
+#   5년치 USER_NT 일별 합계를 만들어 trends.build_trends + JSON 직렬화 (jsonify 와 같은 바이트) 를 반복 실행하고
+#   p50/p95 를 출력한다. DB 왕복은 범위 쿼리 한 번이라 여기서는 빼고, 전체 요청은 bench/suite.py 로 잰다:
+#     python bench/suite.py --scales 1826 --mix trends:1
+#
+#   python bench/trends.py
+#   python bench/trends.py --days 1826 --runs 50 --budget-ms 100   # p95 가 예산을 넘으면 exit 1
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from flask import Flask
+
+import http_cache
+import trends
+
+LAST_DAY = date(2024, 12, 31)
+
+
+def make_rows(days, skip_ratio, seed):
+    """trends.COLUMNS 순서의 USER_NT 행 (pymysql 처럼 DATE 는 date, 합계는 Decimal). 일부 날짜는 기록 없음"""
+    rng = random.Random(seed)
+    start = LAST_DAY - timedelta(days=days - 1)
+    rows = []
+    for offset in range(days):
+        if rng.random() < skip_ratio:
+            continue
+        rows.append((
+            start + timedelta(days=offset),
+            Decimal(rng.randint(120, 420)), Decimal(rng.randint(30, 140)),
+            Decimal(rng.randint(20, 110)), Decimal(rng.randint(1200, 3200)),
+            300, 60, 65,
+        ))
+    return start, rows
+
+
+def percentile(samples, p):
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(round(p / 100 * (len(samples) - 1))))]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--days", type=int, default=366 * 5)
+    parser.add_argument("--runs", type=int, default=30)
+    parser.add_argument("--skip-ratio", type=float, default=0.1, help="기록이 없는 날의 비율")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--budget-ms", type=float, default=0, help="p95 예산 (0 이면 검사 안 함)")
+    args = parser.parse_args()
+
+    start, rows = make_rows(args.days, args.skip_ratio, args.seed)
+    flask_app = Flask(__name__)  # provider 가 앱을 weakref 로 잡고 있으므로 변수로 유지
+    json_provider = flask_app.json
+
+    # 첫 실행은 pandas import 포함 -> 따로 출력
+    started = time.perf_counter()
+    body = http_cache.render_json(json_provider, trends.build_trends(rows, start, LAST_DAY))
+    first_ms = (time.perf_counter() - started) * 1000
+
+    compute, total = [], []
+    for _ in range(args.runs):
+        started = time.perf_counter()
+        result = trends.build_trends(rows, start, LAST_DAY)
+        computed = time.perf_counter()
+        body = http_cache.render_json(json_provider, result)
+        finished = time.perf_counter()
+        compute.append((computed - started) * 1000)
+        total.append((finished - started) * 1000)
+
+    print(f"days            : {args.days} ({len(rows)} logged)")
+    print(f"response bytes  : {len(body)}")
+    print(f"first call ms   : {first_ms:.1f} (includes pandas import)")
+    print(f"compute ms      : p50 {statistics.median(compute):.1f}  p95 {percentile(compute, 95):.1f}")
+    print(f"compute+json ms : p50 {statistics.median(total):.1f}  p95 {percentile(total, 95):.1f}")
+
+    if args.budget_ms and percentile(total, 95) > args.budget_ms:
+        print(f"FAIL: p95 {percentile(total, 95):.1f} ms > budget {args.budget_ms:.0f} ms")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,223 @@
+# db.py
+# 모든 라우트가 공유하는 MySQL 커넥션 풀 (pymysql 단일 드라이버)
+
+from contextlib import contextmanager
+from dotenv import load_dotenv
+import os
+import queue
+import threading
+import time
+import pymysql
+import metrics
+
+load_dotenv()
+
+db_config = {
+    "host": os.getenv("DB_HOST"),
+    "database": os.getenv("DB_NAME"),
+    "user": os.getenv("DB_USER"),
+    "password": os.getenv("DB_PASSWORD"),
+}
+
+
+class PoolTimeout(pymysql.MySQLError):
+    """풀에서 정해진 시간 안에 커넥션을 얻지 못했을 때 발생"""
+
+
+class InstrumentedConnection(pymysql.connections.Connection):
+    """cursor.execute 시간을 metrics 의 query 단계로 기록 (METRICS_ENABLED=0 이면 원래 커서 그대로)"""
+
+    def cursor(self, cursor=None):
+        return super().cursor(metrics.timed_cursor_class(cursor or self.cursorclass))
+
+
+class ConnectionPool:
+    """
+    크기가 제한된 커넥션 풀.
+
+    - max_size 개 이상의 커넥션은 만들지 않고, 모두 사용 중이면 timeout 초까지 대기
+    - 체크아웃 시 ping_after 초 이상 놀고 있던 커넥션은 ping 으로 상태를 확인
+    - 연결한 지 recycle 초가 지난 커넥션은 (계속 쓰이고 있었더라도) 체크아웃 시 닫고 새로 연결
+      (서버의 wait_timeout, 오래된 세션 상태가 바쁜 커넥션에도 쌓이지 않도록)
+    """
+
+    def __init__(self, max_size=10, timeout=5.0, recycle=300, ping_after=30, **connect_kwargs):
+        self.max_size = max_size
+        self.timeout = timeout
+        self.recycle = recycle
+        self.ping_after = ping_after
+        self.connect_kwargs = connect_kwargs
+
+        self._idle = queue.LifoQueue()  # (connection, 반납 시각)
+        self._lock = threading.Lock()
+        self._size = 0  # 현재 열려 있는 커넥션 수 (idle + in use)
+
+        # metrics
+        self._in_use = 0
+        self._checkouts = 0
+        self._waits = 0
+        self._wait_time_total = 0.0
+        self._wait_time_max = 0.0
+        self._timeouts = 0
+        self._recycled = 0
+        self._failed_health_checks = 0
+
+    def _connect(self):
+        connection = InstrumentedConnection(**self.connect_kwargs)
+        connection.created_at = time.monotonic()  # recycle 기준 (연결한 시각)
+        return connection
+
+    def _discard(self, connection):
+        with self._lock:
+            self._size -= 1
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+    def _reserve_slot(self):
+        with self._lock:
+            if self._size < self.max_size:
+                self._size += 1
+                return True
+            return False
+
+    def _release_slot(self):
+        with self._lock:
+            self._size -= 1
+
+    def _take(self):
+        """idle 커넥션을 꺼내거나, 여유가 있으면 새로 연결한다."""
+        started = time.monotonic()
+        waited = False
+        while True:
+            try:
+                return self._idle.get_nowait(), waited, started
+            except queue.Empty:
+                pass
+
+            if self._reserve_slot():
+                try:
+                    return (self._connect(), None), waited, started
+                except Exception:
+                    self._release_slot()
+                    raise
+
+            remaining = self.timeout - (time.monotonic() - started)
+            if remaining <= 0:
+                with self._lock:
+                    self._timeouts += 1
+                raise PoolTimeout(f"Timed out waiting {self.timeout}s for a database connection")
+            waited = True
+            try:
+                # 다른 스레드가 커넥션을 버려 슬롯이 비는 경우도 있으므로 짧게 나눠서 대기
+                return self._idle.get(timeout=min(remaining, 0.1)), waited, started
+            except queue.Empty:
+                continue
+
+    def _checkout(self):
+        while True:
+            (connection, released_at), waited, started = self._take()
+
+            if released_at is not None:
+                now = time.monotonic()
+                if now - connection.created_at > self.recycle:
+                    with self._lock:
+                        self._recycled += 1
+                    self._discard(connection)
+                    continue
+                if now - released_at > self.ping_after:
+                    try:
+                        connection.ping(reconnect=False)
+                    except Exception:
+                        with self._lock:
+                            self._failed_health_checks += 1
+                        self._discard(connection)
+                        continue
+
+            wait_time = time.monotonic() - started
+            with self._lock:
+                self._in_use += 1
+                self._checkouts += 1
+                if waited:
+                    self._waits += 1
+                self._wait_time_total += wait_time
+                self._wait_time_max = max(self._wait_time_max, wait_time)
+            return connection
+
+    def _checkin(self, connection, broken=False):
+        with self._lock:
+            self._in_use -= 1
+
+        if broken or not connection.open:
+            self._discard(connection)
+            return
+
+        try:
+            # 커밋되지 않은 작업 / 열린 스냅샷을 정리한 뒤 반납
+            connection.rollback()
+        except Exception:
+            self._discard(connection)
+            return
+        self._idle.put((connection, time.monotonic()))
+
+    @contextmanager
+    def connection(self):
+        with metrics.phase("db_connect"):
+            connection = self._checkout()
+        broken = False
+        try:
+            yield connection
+        except pymysql.err.OperationalError:
+            broken = True
+            raise
+        finally:
+            self._checkin(connection, broken)
+
+    def close(self):
+        while True:
+            try:
+                connection, _ = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(connection)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "max_size": self.max_size,
+                "size": self._size,
+                "in_use": self._in_use,
+                "idle": self._size - self._in_use,
+                "checkouts": self._checkouts,
+                "waits": self._waits,
+                "wait_time_total": self._wait_time_total,
+                "wait_time_max": self._wait_time_max,
+                "timeouts": self._timeouts,
+                "recycled": self._recycled,
+                "failed_health_checks": self._failed_health_checks,
+            }
+
+
+pool = ConnectionPool(
+    max_size=int(os.getenv("DB_POOL_SIZE", "10")),
+    timeout=float(os.getenv("DB_POOL_TIMEOUT", "5")),
+    recycle=int(os.getenv("DB_POOL_RECYCLE", "300")),
+    ping_after=int(os.getenv("DB_POOL_PING_AFTER", "30")),
+    **db_config,
+)
+
+
+def connection():
+    """
+    사용 예:
+        with db.connection() as connection:
+            with connection.cursor() as cursor:
+                ...
+            connection.commit()
+    """
+    return pool.connection()
+
+
+def pool_stats():
+    return pool.stats()
@@ -1,58 +1,55 @@
 #날짜에 따른 총섭취량, 개별 음식 영양성분 return
-from flask import Flask, request, jsonify
-import mysql.connector
-from mysql.connector import Error
+from flask import Blueprint, current_app, request, jsonify
+from pymysql.cursors import DictCursor
 from dotenv import load_dotenv
-import os
+import pymysql
+import auth
+import db
+import food_store
+import nutrition
+import http_cache
+from http_cache import response_cache
 
 #환경변수 load
 load_dotenv()
-app = Flask(__name__)
-
-db_host = os.getenv('DB_HOST')
-db_name = os.getenv('DB_NAME')
-db_user = os.getenv('DB_USER')
-db_password = os.getenv('DB_PASSWORD')
-
-# 데이터베이스 연결 설정
-def create_db_connection():
-    try:
-        connection = mysql.connector.connect(
-            host=db_host,
-            database=db_name,
-            user=db_user,
-            password=db_password
-        )
-        return connection
-    except Error as e:
-        print(f"데이터베이스 연결 오류: {e}")
-        return None
+# app.create_app() 에서 등록
+calendar_api = Blueprint("calendar", __name__)
 
 
 #REQUEST 객체에 ID, DATE 넘겨주세요
-@app.route('/api/calendar', methods=['GET'])
+@calendar_api.route('/api/calendar', methods=['GET'])
 def get_calendar_data():
-    user_id = request.args.get('ID')
+    user_id = auth.user_id(request.args.get('ID'))
     date = request.args.get('DATE')
-    connection = create_db_connection()
-
-    if connection is None:
-        return jsonify({"error": "데이터베이스 연결 실패"}), 500
 
     try:
-        cursor = connection.cursor(dictionary=True)
-        query = """
-        SELECT un.DATE,un.CARBO, un.PROTEIN, un.FAT, un.KCAL,
-               f.FOOD_INDEX, f.FOOD_NAME, f.FOOD_PT, f.FOOD_FAT, f.FOOD_CH
-        FROM USER u
-        JOIN USER_NT un ON u.ID = un.ID
-        LEFT JOIN FOOD f ON u.ID = f.ID AND un.DATE = f.DATE
-        WHERE u.ID = %s AND un.DATE = %s
-        ORDER BY f.FOOD_INDEX
-        """
-        cursor.execute(query, (user_id, date))
-        #fetchall()은 쿼리의 결과를 가져오는 method
-        results = cursor.fetchall()
+        with db.connection() as connection:
+            with connection.cursor() as cursor:
+                # 사용자 정보/해당 월 데이터가 그대로면 ETag 도 같음 -> 304 또는 저장된 응답
+                versions = food_store.day_versions(cursor, user_id, date)
+            etag = None
+            if versions is not None:
+                etag = http_cache.make_etag("calendar", user_id, date, *versions)
+                if http_cache.is_fresh(request, etag):
+                    return http_cache.not_modified_response(current_app.response_class, etag)
+                body = response_cache.get(etag)
+                if body is not None:
+                    return http_cache.json_response(current_app.response_class, current_app.json, body, etag)
+
+            with connection.cursor(DictCursor) as cursor:
+                query = """
+                SELECT u.ID, u.BODY_WEIGHT, u.HEIGHT,
+                       un.DATE, un.CARBO, un.PROTEIN, un.FAT, un.KCAL,
+                       f.FOOD_INDEX, f.FOOD_NAME, f.FOOD_PT, f.FOOD_FAT, f.FOOD_CH
+                FROM USER u
+                JOIN USER_NT un ON u.ID = un.ID
+                LEFT JOIN FOOD f ON u.ID = f.ID AND un.DATE = f.DATE
+                WHERE u.ID = %s AND un.DATE = %s
+                ORDER BY f.FOOD_INDEX
+                """
+                cursor.execute(query, (user_id, date))
+                #fetchall()은 쿼리의 결과를 가져오는 method
+                results = cursor.fetchall()
 
         if not results:
             return jsonify({"message": "데이터가 없습니다."}), 404
@@ -76,20 +73,21 @@ def get_calendar_data():
                 user_data['foods'].append({
                     "food_index": row['FOOD_INDEX'],
                     "food_name": row['FOOD_NAME'],
-                    "food_pt": row['FOOD_PT'],
-                    "food_fat": row['FOOD_FAT'],
-                    "food_ch": row['FOOD_CH']
+                    "food_pt": nutrition.number(row['FOOD_PT']),
+                    "food_fat": nutrition.number(row['FOOD_FAT']),
+                    "food_ch": nutrition.number(row['FOOD_CH'])
                 })
 
-        return jsonify(user_data), 200
+        if etag is None:
+            return jsonify(user_data), 200
+        body = http_cache.render_json(current_app.json, user_data)
+        response_cache.set(etag, body)
+        return http_cache.json_response(current_app.response_class, current_app.json, body, etag)
 
-    except Error as e:
+    except pymysql.MySQLError as e:
         return jsonify({"error": str(e)}), 500
 
-    finally:
-        if connection.is_connected():
-            cursor.close()
-            connection.close()
-
 if __name__ == '__main__':
-    app.run(debug=True)
\ No newline at end of file
+    from app import create_app
+
+    create_app().run(debug=True)
@@ -0,0 +1,45 @@
+# food_jobs.py
+# 작업 큐 (jobs.py) 에서 실행하는 음식 분석 작업. ?async=1 인 /api/add_food, /api/update_food 가 접수한다.
+# 앱을 만들지 않으므로 app.py 와 asgi_app.py 가 함께 쓴다 (작업은 두 모드 모두 스레드에서 동기 DB/LLM 으로 실행).
+
+import db
+import food_store
+from llm import do
+from month_cache import invalidate_month
+
+
+def update_food_nutrition(user_id, date, food_index, nutrition_info):
+    with db.connection() as connection:
+        with connection.cursor() as cursor:
+            updated = food_store.update_food(cursor, user_id, date, food_index, nutrition_info)
+        connection.commit()
+    if updated:
+        invalidate_month(user_id, date)
+    return updated
+
+
+def resolve_food_nutrition(user_id, date, food_index, food_name):
+    """작업 큐에서 실행: LLM으로 영양 정보를 구해 FOOD 행을 채움. 그 사이 행이 지워졌으면 작업 실패"""
+    nutrition_info = do(food_name)
+    if not update_food_nutrition(user_id, date, food_index, nutrition_info):
+        raise LookupError(f"FOOD row ({user_id}, {date}, {food_index}) no longer exists")
+    return food_store.food_info_response(user_id, date, food_index, nutrition_info)
+
+
+def delete_pending_food(user_id, date, food_index, food_name):
+    """분석에 실패한 경우 영양 정보가 비어 있는 대기 행을 지움"""
+    with db.connection() as connection:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                """
+                DELETE FROM FOOD
+                WHERE ID = %s AND DATE = %s AND FOOD_INDEX = %s AND FOOD_KCAL IS NULL
+                """,
+                (user_id, date, food_index),
+            )
+            deleted = cursor.rowcount
+            if deleted:
+                food_store.bump_month_version(cursor, user_id, date)
+        connection.commit()
+    if deleted:
+        invalidate_month(user_id, date)
@@ -0,0 +1,270 @@
+# food_kb.py
+# 로컬 음식 영양성분표 (CSV / Parquet) 검색
+#   자주 먹는 음식은 LLM 을 거치지 않고 바로 답하고, 모르는 음식만 LLM 으로 보낸다.
+#
+# 파일 형식 (1인분 또는 1개 기준):
+#   food_name,aliases,serving_g,calorie,carbohydrate,protein,fat
+#   돈까스,돈가스|돈카츠,200,560,38,26,33
+#
+# 사용 예:
+#   python food_kb.py "돈까스 2개 먹었어"
+
+from array import array
+from dotenv import load_dotenv
+import csv
+import os
+import re
+import sys
+import unicodedata
+
+load_dotenv()
+
+NUMERIC_COLUMNS = ("serving_g", "calorie", "carbohydrate", "protein", "fat")
+
+# "2개", "1인분", "반 그릇", "200g" 같은 양 표현
+KOREAN_NUMBERS = {
+    "반": 0.5, "한": 1, "하나": 1, "두": 2, "둘": 2, "세": 3, "셋": 3, "석": 3,
+    "네": 4, "넷": 4, "다섯": 5, "여섯": 6, "일곱": 7, "여덟": 8, "아홉": 9, "열": 10,
+}
+COUNT_UNITS = ("인분", "그릇", "공기", "접시", "조각", "개", "잔", "캔", "봉지", "장", "마리", "줄", "컵", "병", "판")
+WEIGHT_UNITS = {"kg": 1000.0, "g": 1.0, "그램": 1.0, "ml": 1.0, "l": 1000.0}
+
+_number = r"(\d+(?:\.\d+)?|" + "|".join(sorted(KOREAN_NUMBERS, key=len, reverse=True)) + r")"
+_unit = "|".join(sorted(list(COUNT_UNITS) + list(WEIGHT_UNITS), key=len, reverse=True))
+QUANTITY_PATTERN = re.compile(_number + r"\s*(" + _unit + r")(?![a-z])")
+HALF_PATTERN = re.compile(r"(\d+)\s*(?:" + "|".join(COUNT_UNITS) + r")\s*반")
+
+# 문장 끝의 "먹었어", "마셨음" 같은 표현과 조사
+EATING_SUFFIX_PATTERN = re.compile(
+    r"\s*(?:을|를|이랑|랑)?\s*(?:먹|마시|마셨|드셨|섭취)\S*\s*$"
+)
+PARTICLE_PATTERN = re.compile(r"(?<=\S)(?:을|를)$")
+
+
+# 자주 헷갈려 쓰는 모음은 하나로 모음 (찌게 -> 찌개, 웬 -> 왠)
+VOWEL_FOLDS = {5: 1, 7: 3, 11: 10, 15: 10}  # ㅔ->ㅐ, ㅖ->ㅒ, ㅚ->ㅙ, ㅞ->ㅙ (중성 번호)
+
+
+def fold_vowels(text):
+    out = []
+    for char in text:
+        code = ord(char) - 0xAC00
+        if 0 <= code < 11172:
+            initial, vowel, final = code // 588, (code % 588) // 28, code % 28
+            vowel = VOWEL_FOLDS.get(vowel, vowel)
+            char = chr(0xAC00 + initial * 588 + vowel * 28 + final)
+        out.append(char)
+    return "".join(out)
+
+
+def normalize_name(text):
+    """검색 키: NFKC, 소문자, 공백과 문장부호 제거, 헷갈리는 모음 통일 ("김치 찌게!" -> "김치찌개")"""
+    text = unicodedata.normalize("NFKC", str(text)).lower()
+    return fold_vowels(re.sub(r"[\W_]+", "", text))
+
+
+def parse_quantity(text):
+    """
+    입력 문자열을 (음식 이름 부분, 양 배수 또는 None, 무게(g) 또는 None) 로 나눔
+    예) "돈까스 2개 먹었어" -> ("돈까스", 2.0, None)
+        "삼겹살 200g"      -> ("삼겹살", None, 200.0)
+        "짜장면 곱빼기"     -> ("짜장면 곱빼기", None, None)
+    """
+    text = unicodedata.normalize("NFKC", str(text)).strip().lower()
+    text = EATING_SUFFIX_PATTERN.sub("", text)
+
+    count = None
+    grams = None
+    half = HALF_PATTERN.search(text)
+    if half:
+        count = float(half.group(1)) + 0.5
+        text = text[:half.start()] + text[half.end():]
+    else:
+        match = QUANTITY_PATTERN.search(text)
+        if match:
+            raw, unit = match.groups()
+            value = KOREAN_NUMBERS.get(raw)
+            value = float(raw) if value is None else float(value)
+            if unit in WEIGHT_UNITS:
+                grams = value * WEIGHT_UNITS[unit]
+            else:
+                count = value
+            text = text[:match.start()] + text[match.end():]
+
+    name = PARTICLE_PATTERN.sub("", text.strip())
+    return name.strip(), count, grams
+
+
+def ngrams(key):
+    """음절 bigram 집합 (한 글자면 그 글자 하나)"""
+    if len(key) < 2:
+        return {key} if key else set()
+    return {key[i:i + 2] for i in range(len(key) - 1)}
+
+
+def format_amount(value):
+    return format(round(value, 1), "g")
+
+
+class FoodKnowledgeBase:
+    """
+    음식 이름/별칭 -> 영양성분 인덱스.
+
+    수치는 컬럼별 array('d') 에, 이름은 리스트 하나에 담아 행 수가 많아도 메모리를 적게 쓴다.
+    정확히 일치하는 이름은 dict 한 번으로 찾고, 아니면 음절 bigram 역색인으로 후보를 모아
+    Dice 계수가 min_score 이상인 가장 비슷한 음식을 고른다.
+    """
+
+    def __init__(self, min_score=0.8):
+        self.min_score = min_score
+        self.names = []
+        self.columns = {column: array("d") for column in NUMERIC_COLUMNS}
+        self._exact = {}  # 정규화한 이름/별칭 -> 행 번호
+        self._keys = []  # (bigram 개수, 행 번호)
+        self._postings = {}  # bigram -> array('I') of self._keys 위치
+
+        # counters
+        self.hits = 0
+        self.fuzzy_hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.names)
+
+    # --- 적재 ---
+
+    def add(self, food_name, serving_g, calorie, carbohydrate, protein, fat, aliases=()):
+        row = len(self.names)
+        self.names.append(food_name)
+        for column, value in zip(NUMERIC_COLUMNS, (serving_g, calorie, carbohydrate, protein, fat)):
+            self.columns[column].append(float(value or 0))
+        for name in (food_name, *aliases):
+            key = normalize_name(name)
+            if not key or key in self._exact:
+                continue
+            self._exact[key] = row
+            position = len(self._keys)
+            grams = ngrams(key)
+            self._keys.append((len(grams), row))
+            for gram in grams:
+                self._postings.setdefault(gram, array("I")).append(position)
+
+    def add_records(self, records):
+        for record in records:
+            aliases = [a.strip() for a in (record.get("aliases") or "").split("|") if a.strip()]
+            self.add(
+                record["food_name"].strip(),
+                record.get("serving_g"),
+                record["calorie"],
+                record["carbohydrate"],
+                record["protein"],
+                record["fat"],
+                aliases,
+            )
+
+    @classmethod
+    def load(cls, path, min_score=0.8):
+        kb = cls(min_score=min_score)
+        if path.endswith(".parquet"):
+            import pandas as pd  # Parquet 을 쓸 때만 필요
+
+            frame = pd.read_parquet(path)
+            kb.add_records(frame.astype(object).where(frame.notna(), None).to_dict("records"))
+        else:
+            with open(path, newline="", encoding="utf-8-sig") as f:
+                kb.add_records(csv.DictReader(f))
+        return kb
+
+    # --- 검색 ---
+
+    def match(self, name):
+        """(행 번호, 점수) 또는 None"""
+        key = normalize_name(name)
+        if not key:
+            return None
+        row = self._exact.get(key)
+        if row is not None:
+            return row, 1.0
+
+        grams = ngrams(key)
+        overlap = {}
+        for gram in grams:
+            for position in self._postings.get(gram, ()):
+                overlap[position] = overlap.get(position, 0) + 1
+        best = None
+        for position, common in overlap.items():
+            size, row = self._keys[position]
+            score = 2.0 * common / (len(grams) + size)
+            if best is None or score > best[1]:
+                best = (row, score)
+        if best is None or best[1] < self.min_score:
+            return None
+        return best
+
+    def lookup(self, text):
+        """
+        LLM 결과와 같은 형식의 dict 를 반환. 확신할 수 없으면 None (-> LLM 으로)
+        """
+        name, count, grams = parse_quantity(text)
+        found = self.match(name)
+        if found is None:
+            self.misses += 1
+            return None
+        row, score = found
+        if score < 1.0:
+            self.fuzzy_hits += 1
+        else:
+            self.hits += 1
+
+        serving_g = self.columns["serving_g"][row]
+        if grams is not None and serving_g > 0:
+            factor = grams / serving_g
+        else:
+            factor = count if count is not None else 1.0
+
+        return {
+            "food_name": self.names[row],
+            "calorie": format_amount(self.columns["calorie"][row] * factor),
+            "carbohydrate": format_amount(self.columns["carbohydrate"][row] * factor),
+            "protein": format_amount(self.columns["protein"][row] * factor),
+            "fat": format_amount(self.columns["fat"][row] * factor),
+        }
+
+    def stats(self):
+        return {
+            "foods": len(self.names),
+            "keys": len(self._keys),
+            "hits": self.hits,
+            "fuzzy_hits": self.fuzzy_hits,
+            "misses": self.misses,
+        }
+
+
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "food_kb.csv")
+
+_default_kb = None
+
+
+def default_kb():
+    """
+    FOOD_KB_PATH 의 성분표를 처음 쓸 때 한 번만 읽음. FOOD_KB_PATH 를 빈 값으로 두면 사용하지 않음.
+    """
+    global _default_kb
+    if _default_kb is None:
+        path = os.getenv("FOOD_KB_PATH", DEFAULT_PATH)
+        min_score = float(os.getenv("FOOD_KB_MIN_SCORE", "0.8"))
+        if path and os.path.exists(path):
+            _default_kb = FoodKnowledgeBase.load(path, min_score=min_score)
+        else:
+            _default_kb = FoodKnowledgeBase(min_score=min_score)
+    return _default_kb
+
+
+def lookup(text):
+    return default_kb().lookup(text)
+
+
+if __name__ == "__main__":
+    kb = default_kb()
+    for text in sys.argv[1:]:
+        print(text, "->", kb.lookup(text))
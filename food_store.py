@@ -0,0 +1,691 @@
+# food_store.py
+# FOOD 테이블 쓰기 공통 함수와 조회 응답 (월별/분기별) 을 만드는 함수
+# 쓰기 함수는 호출한 쪽의 트랜잭션 안에서 실행되며, commit 은 호출한 쪽에서 한다.
+# FOOD 를 바꾸는 함수는 같은 트랜잭션에서 USER_NT (ID, DATE) 일별 합계에 변화량을 반영하고,
+# 해당 (ID, 월) 의 데이터 버전을 올린다 (조회 API 의 ETag / 응답 캐시용, http_cache.py).
+#
+# 영양 값은 쓰기 전에 nutrition.normalize 로 숫자 (kcal, g) 로 바꿔 저장한다 (FOOD 컬럼은 DECIMAL).
+#
+# 합계 재계산: python food_store.py rebuild 2024-01-01 2025-01-01 [--user ID]
+# 기존 문자열 값 변환: python food_store.py normalize (migrations/005_food_numeric_nutrition.sql 참고)
+
+import argparse
+import calendar
+from datetime import date, datetime
+
+import nutrition
+
+# FOOD_INDEX 할당: (ID, DATE) 별 카운터 행을 원자적으로 증가시킨다 (migrations/001_food_index_seq.sql).
+# LAST_INSERT_ID(expr) 로 설정한 값은 같은 구문의 OK 패킷에 insert id 로 돌아오므로
+# (cursor.lastrowid) 별도의 SELECT 없이 한 번의 왕복으로 번호를 받는다.
+# 카운터 행은 트랜잭션이 끝날 때까지 잠겨 있으므로 같은 날짜에 동시에 추가해도 번호가 겹치지 않고,
+# 롤백되면 카운터도 함께 롤백되어 번호가 비지 않는다.
+ALLOCATE_FOOD_INDEX_QUERY = """
+INSERT INTO FOOD_INDEX_SEQ (ID, DATE, LAST_INDEX)
+VALUES (%s, %s, LAST_INSERT_ID(%s))
+ON DUPLICATE KEY UPDATE LAST_INDEX = LAST_INSERT_ID(LAST_INDEX + %s)
+"""
+
+INSERT_FOOD_QUERY = """
+INSERT INTO FOOD (ID, DATE, FOOD_INDEX, FOOD_NAME, FOOD_CH, FOOD_PT, FOOD_FAT, FOOD_KCAL)
+VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+"""
+
+INSERT_PENDING_FOOD_QUERY = """
+INSERT INTO FOOD (ID, DATE, FOOD_INDEX, FOOD_NAME) VALUES (%s, %s, %s, %s)
+"""
+
+
+# 새 날짜 행의 권장섭취량(RD_*)은 해당 사용자의 가장 최근 USER_NT 행에서 가져온다
+APPLY_DAILY_DELTA_QUERY = """
+INSERT INTO USER_NT (ID, DATE, CARBO, PROTEIN, FAT, KCAL, RD_CARBO, RD_PROTEIN, RD_FAT)
+SELECT %s, %s, %s, %s, %s, %s,
+       COALESCE(prev.RD_CARBO, 0), COALESCE(prev.RD_PROTEIN, 0), COALESCE(prev.RD_FAT, 0)
+FROM (SELECT 1) AS seed
+LEFT JOIN (
+    SELECT RD_CARBO, RD_PROTEIN, RD_FAT FROM USER_NT
+    WHERE ID = %s
+    ORDER BY DATE DESC
+    LIMIT 1
+) AS prev ON 1 = 1
+ON DUPLICATE KEY UPDATE
+    CARBO = USER_NT.CARBO + VALUES(CARBO),
+    PROTEIN = USER_NT.PROTEIN + VALUES(PROTEIN),
+    FAT = USER_NT.FAT + VALUES(FAT),
+    KCAL = USER_NT.KCAL + VALUES(KCAL)
+"""
+
+SELECT_FOOD_FOR_UPDATE_QUERY = """
+SELECT FOOD_CH, FOOD_PT, FOOD_FAT, FOOD_KCAL FROM FOOD
+WHERE ID = %s AND DATE = %s AND FOOD_INDEX = %s
+FOR UPDATE
+"""
+
+UPDATE_FOOD_QUERY = """
+UPDATE FOOD
+SET FOOD_NAME = %s, FOOD_CH = %s, FOOD_PT = %s, FOOD_FAT = %s, FOOD_KCAL = %s
+WHERE ID = %s AND DATE = %s AND FOOD_INDEX = %s
+"""
+
+DELETE_FOOD_QUERY = """
+DELETE FROM FOOD
+WHERE ID = %s AND DATE = %s AND FOOD_INDEX = %s
+"""
+
+# 날짜 문자열 해석은 DATE 컬럼에 저장할 때와 같게 MySQL 에 맡긴다 (migrations/004_data_versions.sql)
+BUMP_MONTH_VERSION_QUERY = """
+INSERT INTO USER_MONTH_VERSION (ID, MONTH, VERSION)
+VALUES (%s, DATE_FORMAT(%s, '%%Y-%%m-01'), 1)
+ON DUPLICATE KEY UPDATE VERSION = VERSION + 1
+"""
+
+BUMP_PROFILE_VERSION_QUERY = """
+UPDATE USER SET PROFILE_VERSION = PROFILE_VERSION + 1 WHERE ID = %s
+"""
+
+
+def nutrition_totals(nutrition_info):
+    """(탄수화물, 단백질, 지방, 칼로리) - USER_NT 컬럼 순서. 값이 없으면 0"""
+    return (
+        nutrition.amount(nutrition_info["carbohydrate"]),
+        nutrition.amount(nutrition_info["protein"]),
+        nutrition.amount(nutrition_info["fat"]),
+        nutrition.amount(nutrition_info["calorie"]),
+    )
+
+
+def apply_daily_delta(cursor, user_id, date, carbo, protein, fat, kcal):
+    """USER_NT (user_id, date) 합계에 변화량을 더함 (행이 없으면 만듦)"""
+    if not (carbo or protein or fat or kcal):
+        return
+    cursor.execute(
+        APPLY_DAILY_DELTA_QUERY,
+        (user_id, date, carbo, protein, fat, kcal, user_id),
+    )
+
+
+def bump_month_version(cursor, user_id, date):
+    """date 가 속한 (user_id, 월) 의 데이터 버전을 1 올림"""
+    cursor.execute(BUMP_MONTH_VERSION_QUERY, (user_id, date))
+
+
+def bump_profile_version(cursor, user_id):
+    """USER 정보 (체중, 키 등) 가 바뀌었을 때 - /api/calendar 응답에 포함됨"""
+    cursor.execute(BUMP_PROFILE_VERSION_QUERY, (user_id,))
+
+
+def month_versions_query(months):
+    placeholders = ", ".join(["%s"] * len(months))
+    return f"SELECT MONTH, VERSION FROM USER_MONTH_VERSION WHERE ID = %s AND MONTH IN ({placeholders})"
+
+
+def month_versions(cursor, user_id, months):
+    """각 월 (해당 월 1일 date) 의 데이터 버전 튜플. 한 번도 쓰지 않은 월은 0"""
+    cursor.execute(month_versions_query(months), (user_id, *months))
+    versions = {row[0]: row[1] for row in cursor.fetchall()}
+    return tuple(versions.get(month, 0) for month in months)
+
+
+def day_versions(cursor, user_id, date):
+    """(USER.PROFILE_VERSION, date 가 속한 월의 데이터 버전). 사용자가 없으면 None"""
+    cursor.execute(
+        """
+        SELECT u.PROFILE_VERSION, COALESCE(v.VERSION, 0)
+        FROM USER u
+        LEFT JOIN USER_MONTH_VERSION v
+          ON v.ID = u.ID AND v.MONTH = DATE_FORMAT(%s, '%%Y-%%m-01')
+        WHERE u.ID = %s
+        """,
+        (date, user_id),
+    )
+    row = cursor.fetchone()
+    return tuple(row) if row else None
+
+
+def allocate_food_indexes(cursor, user_id, date, count=1):
+    """(user_id, date) 에 연속된 FOOD_INDEX count 개를 할당하고 첫 번째 번호를 반환"""
+    cursor.execute(ALLOCATE_FOOD_INDEX_QUERY, (user_id, date, count - 1, count))
+    last_index = cursor.lastrowid
+    return last_index - count + 1
+
+
+def food_row(user_id, date, food_index, nutrition_info):
+    """INSERT_FOOD_QUERY 인자. nutrition_info 는 nutrition.normalize 를 거친 값"""
+    return (
+        user_id,
+        date,
+        food_index,
+        nutrition_info["food_name"],
+        nutrition_info["carbohydrate"],
+        nutrition_info["protein"],
+        nutrition_info["fat"],
+        nutrition_info["calorie"],
+    )
+
+
+def insert_foods(cursor, user_id, date, nutrition_infos):
+    """여러 음식을 한 번에 추가하고, 할당된 FOOD_INDEX 리스트를 반환"""
+    nutrition_infos = [nutrition.normalize(info) for info in nutrition_infos]
+    first_index = allocate_food_indexes(cursor, user_id, date, len(nutrition_infos))
+    indexes = [first_index + offset for offset in range(len(nutrition_infos))]
+    rows = [
+        food_row(user_id, date, food_index, nutrition_info)
+        for food_index, nutrition_info in zip(indexes, nutrition_infos)
+    ]
+    cursor.executemany(INSERT_FOOD_QUERY, rows)
+
+    delta = [sum(values) for values in zip(*(nutrition_totals(info) for info in nutrition_infos))]
+    apply_daily_delta(cursor, user_id, date, *delta)
+    bump_month_version(cursor, user_id, date)
+    return indexes
+
+
+def insert_food(cursor, user_id, date, nutrition_info):
+    return insert_foods(cursor, user_id, date, [nutrition_info])[0]
+
+
+def insert_pending_food(cursor, user_id, date, food_name):
+    """영양 정보가 비어 있는 대기 행을 추가 (백그라운드 분석용)"""
+    food_index = allocate_food_indexes(cursor, user_id, date)
+    cursor.execute(INSERT_PENDING_FOOD_QUERY, (user_id, date, food_index, food_name))
+    bump_month_version(cursor, user_id, date)
+    return food_index
+
+
+def update_food(cursor, user_id, date, food_index, nutrition_info):
+    """FOOD 행의 음식/영양 정보를 바꾸고 일별 합계를 보정. 행이 없으면 False"""
+    cursor.execute(SELECT_FOOD_FOR_UPDATE_QUERY, (user_id, date, food_index))
+    old = cursor.fetchone()
+    if old is None:
+        return False
+
+    nutrition_info = nutrition.normalize(nutrition_info)
+    cursor.execute(
+        UPDATE_FOOD_QUERY,
+        (
+            nutrition_info["food_name"],
+            nutrition_info["carbohydrate"],
+            nutrition_info["protein"],
+            nutrition_info["fat"],
+            nutrition_info["calorie"],
+            user_id,
+            date,
+            food_index,
+        ),
+    )
+    new_totals = nutrition_totals(nutrition_info)
+    old_totals = [nutrition.amount(value) for value in old]
+    apply_daily_delta(
+        cursor, user_id, date, *(new - prev for new, prev in zip(new_totals, old_totals))
+    )
+    bump_month_version(cursor, user_id, date)
+    return True
+
+
+def delete_food(cursor, user_id, date, food_index):
+    """FOOD 행을 지우고 일별 합계에서 뺌. 행이 없으면 False"""
+    cursor.execute(SELECT_FOOD_FOR_UPDATE_QUERY, (user_id, date, food_index))
+    old = cursor.fetchone()
+    if old is None:
+        return False
+
+    cursor.execute(DELETE_FOOD_QUERY, (user_id, date, food_index))
+    apply_daily_delta(cursor, user_id, date, *(-nutrition.amount(value) for value in old))
+    bump_month_version(cursor, user_id, date)
+    return True
+
+
+# --- aiomysql 커서용 (asgi_app.py). SQL 과 계산은 위 동기 함수와 같다. ---
+
+async def apply_daily_delta_async(cursor, user_id, date, carbo, protein, fat, kcal):
+    if not (carbo or protein or fat or kcal):
+        return
+    await cursor.execute(
+        APPLY_DAILY_DELTA_QUERY,
+        (user_id, date, carbo, protein, fat, kcal, user_id),
+    )
+
+
+async def bump_month_version_async(cursor, user_id, date):
+    await cursor.execute(BUMP_MONTH_VERSION_QUERY, (user_id, date))
+
+
+async def bump_profile_version_async(cursor, user_id):
+    await cursor.execute(BUMP_PROFILE_VERSION_QUERY, (user_id,))
+
+
+async def month_versions_async(cursor, user_id, months):
+    await cursor.execute(month_versions_query(months), (user_id, *months))
+    versions = {row[0]: row[1] for row in await cursor.fetchall()}
+    return tuple(versions.get(month, 0) for month in months)
+
+
+async def allocate_food_indexes_async(cursor, user_id, date, count=1):
+    await cursor.execute(ALLOCATE_FOOD_INDEX_QUERY, (user_id, date, count - 1, count))
+    return cursor.lastrowid - count + 1
+
+
+async def insert_foods_async(cursor, user_id, date, nutrition_infos):
+    nutrition_infos = [nutrition.normalize(info) for info in nutrition_infos]
+    first_index = await allocate_food_indexes_async(cursor, user_id, date, len(nutrition_infos))
+    indexes = [first_index + offset for offset in range(len(nutrition_infos))]
+    rows = [
+        food_row(user_id, date, food_index, nutrition_info)
+        for food_index, nutrition_info in zip(indexes, nutrition_infos)
+    ]
+    await cursor.executemany(INSERT_FOOD_QUERY, rows)
+
+    delta = [sum(values) for values in zip(*(nutrition_totals(info) for info in nutrition_infos))]
+    await apply_daily_delta_async(cursor, user_id, date, *delta)
+    await bump_month_version_async(cursor, user_id, date)
+    return indexes
+
+
+async def insert_food_async(cursor, user_id, date, nutrition_info):
+    return (await insert_foods_async(cursor, user_id, date, [nutrition_info]))[0]
+
+
+async def insert_pending_food_async(cursor, user_id, date, food_name):
+    food_index = await allocate_food_indexes_async(cursor, user_id, date)
+    await cursor.execute(INSERT_PENDING_FOOD_QUERY, (user_id, date, food_index, food_name))
+    await bump_month_version_async(cursor, user_id, date)
+    return food_index
+
+
+async def update_food_async(cursor, user_id, date, food_index, nutrition_info):
+    await cursor.execute(SELECT_FOOD_FOR_UPDATE_QUERY, (user_id, date, food_index))
+    old = await cursor.fetchone()
+    if old is None:
+        return False
+
+    nutrition_info = nutrition.normalize(nutrition_info)
+    await cursor.execute(
+        UPDATE_FOOD_QUERY,
+        (
+            nutrition_info["food_name"],
+            nutrition_info["carbohydrate"],
+            nutrition_info["protein"],
+            nutrition_info["fat"],
+            nutrition_info["calorie"],
+            user_id,
+            date,
+            food_index,
+        ),
+    )
+    new_totals = nutrition_totals(nutrition_info)
+    old_totals = [nutrition.amount(value) for value in old]
+    await apply_daily_delta_async(
+        cursor, user_id, date, *(new - prev for new, prev in zip(new_totals, old_totals))
+    )
+    await bump_month_version_async(cursor, user_id, date)
+    return True
+
+
+async def delete_food_async(cursor, user_id, date, food_index):
+    await cursor.execute(SELECT_FOOD_FOR_UPDATE_QUERY, (user_id, date, food_index))
+    old = await cursor.fetchone()
+    if old is None:
+        return False
+
+    await cursor.execute(DELETE_FOOD_QUERY, (user_id, date, food_index))
+    await apply_daily_delta_async(cursor, user_id, date, *(-nutrition.amount(value) for value in old))
+    await bump_month_version_async(cursor, user_id, date)
+    return True
+
+
+SET_DAILY_TOTALS_QUERY = """
+INSERT INTO USER_NT (ID, DATE, CARBO, PROTEIN, FAT, KCAL, RD_CARBO, RD_PROTEIN, RD_FAT)
+VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+ON DUPLICATE KEY UPDATE
+    CARBO = VALUES(CARBO),
+    PROTEIN = VALUES(PROTEIN),
+    FAT = VALUES(FAT),
+    KCAL = VALUES(KCAL)
+"""
+
+
+def rebuild_daily_totals(connection, start, end, user_id=None):
+    """
+    [start, end) 구간의 USER_NT 합계를 FOOD 로부터 다시 계산 (불일치 복구용).
+    (ID, DATE) 별 합계는 DB 에서 SUM 으로 구하고, 구간을 0 으로 초기화한 뒤 한 번의 executemany 로 덮어쓴다.
+    반환값: 합계가 기록된 (ID, DATE) 수
+    """
+    user_filter = " AND ID = %s" if user_id else ""
+    user_params = (user_id,) if user_id else ()
+
+    with connection.cursor() as cursor:
+        # 영양 컬럼이 DECIMAL 이므로 (migrations/005) 합계는 정확하고, 대기 행 (NULL) 은 빠진다
+        cursor.execute(
+            "SELECT ID, DATE, COALESCE(SUM(FOOD_CH), 0), COALESCE(SUM(FOOD_PT), 0),"
+            " COALESCE(SUM(FOOD_FAT), 0), COALESCE(SUM(FOOD_KCAL), 0) FROM FOOD"
+            " WHERE DATE >= %s AND DATE < %s" + user_filter + " GROUP BY ID, DATE",
+            (start, end) + user_params,
+        )
+        totals = {(food_user, food_date): values for food_user, food_date, *values in cursor.fetchall()}
+
+        # 새로 만들어지는 행에 넣을 사용자별 최근 권장섭취량
+        cursor.execute(
+            """
+            SELECT n.ID, n.RD_CARBO, n.RD_PROTEIN, n.RD_FAT
+            FROM USER_NT n
+            JOIN (SELECT ID, MAX(DATE) AS DATE FROM USER_NT GROUP BY ID) latest
+              ON latest.ID = n.ID AND latest.DATE = n.DATE
+            """
+            + (" WHERE n.ID = %s" if user_id else ""),
+            user_params,
+        )
+        recommended = {row[0]: row[1:] for row in cursor.fetchall()}
+
+        # 합계가 바뀔 수 있는 (ID, 월) 의 데이터 버전을 모두 올림 (조회 API 캐시 무효화)
+        cursor.execute(
+            "SELECT DISTINCT ID, DATE_FORMAT(DATE, '%%Y-%%m-01') FROM USER_NT"
+            " WHERE DATE >= %s AND DATE < %s" + user_filter,
+            (start, end) + user_params,
+        )
+        touched_months = set(cursor.fetchall())
+        touched_months.update(
+            (food_user, f"{food_date:%Y-%m}-01") for food_user, food_date in totals
+        )
+
+        cursor.execute(
+            "UPDATE USER_NT SET CARBO = 0, PROTEIN = 0, FAT = 0, KCAL = 0"
+            " WHERE DATE >= %s AND DATE < %s" + user_filter,
+            (start, end) + user_params,
+        )
+        rows = [
+            (food_user, food_date, *day_totals,
+             *(value or 0 for value in recommended.get(food_user, (0, 0, 0))))
+            for (food_user, food_date), day_totals in totals.items()
+        ]
+        if rows:
+            cursor.executemany(SET_DAILY_TOTALS_QUERY, rows)
+        if touched_months:
+            cursor.executemany(BUMP_MONTH_VERSION_QUERY, sorted(touched_months))
+    return len(rows)
+
+
+SELECT_FOOD_VALUES_PAGE_QUERY = """
+SELECT ID, DATE, FOOD_INDEX, FOOD_CH, FOOD_PT, FOOD_FAT, FOOD_KCAL FROM FOOD
+WHERE (ID, DATE, FOOD_INDEX) > (%s, %s, %s)
+ORDER BY ID, DATE, FOOD_INDEX
+LIMIT %s
+"""
+
+UPDATE_FOOD_VALUES_QUERY = """
+UPDATE FOOD SET FOOD_CH = %s, FOOD_PT = %s, FOOD_FAT = %s, FOOD_KCAL = %s
+WHERE ID = %s AND DATE = %s AND FOOD_INDEX = %s
+"""
+
+
+def normalize_food_values(connection, batch_size=1000):
+    """
+    FOOD 의 문자열 영양 값 ("1400kcal", "약 12" ...) 을 nutrition.parse_amount 결과로 바꿈.
+    컬럼을 DECIMAL 로 바꾸기 전에 (migrations/005) 실행한다. (ID, DATE, FOOD_INDEX) 순서로
+    batch_size 행씩 읽고, 바뀐 행만 executemany 로 고친 뒤 배치마다 commit 한다.
+    반환값: (읽은 행 수, 바꾼 행 수)
+    """
+    kinds = [nutrition.FIELDS[key] for key in ("carbohydrate", "protein", "fat", "calorie")]
+    last = ("", "0001-01-01", -1)
+    scanned = changed = 0
+    while True:
+        with connection.cursor() as cursor:
+            cursor.execute(SELECT_FOOD_VALUES_PAGE_QUERY, (*last, batch_size))
+            rows = cursor.fetchall()
+            if not rows:
+                break
+            updates = []
+            for food_user, food_date, food_index, *values in rows:
+                parsed = [nutrition.parse_amount(value, kind) for value, kind in zip(values, kinds)]
+                # 컬럼이 아직 문자열이므로 같은 표기 ("12.0" == "12") 인지 숫자로 비교
+                if any(
+                    value is not None and (number is None or str(value).strip() != format(number, "g"))
+                    for value, number in zip(values, parsed)
+                ):
+                    updates.append((*parsed, food_user, food_date, food_index))
+            if updates:
+                cursor.executemany(UPDATE_FOOD_VALUES_QUERY, updates)
+        connection.commit()
+        scanned += len(rows)
+        changed += len(updates)
+        last = rows[-1][:3]
+    return scanned, changed
+
+
+# --- 조회 응답 만들기 (app.py / asgi_app.py 공통, DB 나 앱에 의존하지 않음) ---
+
+# /api/add_foods 한 번에 추가할 수 있는 음식 수
+MAX_BATCH_FOODS = 20
+
+
+def month_start(year, month):
+    """해당 월 1일 (date)"""
+    return date(year, month, 1)
+
+
+def next_month_start(year, month):
+    """다음 달 1일 (date) - 반열림 구간 [month_start, next_month_start) 의 끝"""
+    return date(year + month // 12, month % 12 + 1, 1)
+
+
+FOOD_WINDOW_QUERY = """
+SELECT DATE, FOOD_INDEX, FOOD_NAME, FOOD_PT, FOOD_FAT, FOOD_CH, FOOD_KCAL
+FROM FOOD
+WHERE ID = %s AND DATE >= %s AND DATE < %s
+ORDER BY DATE
+"""
+
+DAILY_TOTALS_WINDOW_QUERY = """
+SELECT DATE, CARBO, PROTEIN, FAT, RD_CARBO, RD_PROTEIN, RD_FAT
+FROM USER_NT
+WHERE ID = %s AND DATE >= %s AND DATE < %s
+"""
+
+
+def index_daily_totals(totals_rows):
+    totals_by_date = {}
+    for row in totals_rows:
+        day = row[0].date() if isinstance(row[0], datetime) else row[0]
+        # 같은 날짜에 행이 여러 개면 (migrations/003 의 유일 키 적용 전 데이터) 첫 행만 사용
+        totals_by_date.setdefault(day, row[1:])
+    return totals_by_date
+
+
+def food_item(row):
+    """FOOD 행 (DATE, FOOD_INDEX, FOOD_NAME, FOOD_PT, FOOD_FAT, FOOD_CH, FOOD_KCAL) -> 응답용 dict"""
+    return {
+        "food_index": row[1],
+        "food_name": row[2],
+        "protein": nutrition.number(row[3]),
+        "fat": nutrition.number(row[4]),
+        "carbohydrates": nutrition.number(row[5]),
+        "calories": nutrition.number(row[6])
+    }
+
+
+def daily_percentages(daily_totals):
+    carb_total, protein_total, fat_total, rd_carb, rd_protein, rd_fat = daily_totals
+    return {
+        "carbohydrates_percentage": round((carb_total / rd_carb) * 100, 1) if rd_carb > 0 else 0,
+        "protein_percentage": round((protein_total / rd_protein) * 100, 1) if rd_protein > 0 else 0,
+        "fat_percentage": round((fat_total / rd_fat) * 100, 1) if rd_fat > 0 else 0
+    }
+
+
+def build_monthly_data(year, month, food_rows, totals_by_date):
+    """한 달치 FOOD 행과 일별 합계로 {"foods": [...], "percentages": [...]} 구조를 만든다."""
+    num_days = calendar.monthrange(year, month)[1]  # 해당 월의 일수 계산
+    foods_list = [[] for _ in range(num_days)]  # 각 날짜별 음식 리스트
+
+    for row in food_rows:
+        day = row[0].day - 1  # 0-based index for lists
+        foods_list[day].append(food_item(row))
+
+    return {
+        "foods": foods_list,
+        "percentages": monthly_percentages(year, month, totals_by_date)
+    }
+
+
+def monthly_percentages(year, month, totals_by_date):
+    """해당 월 각 날짜의 섭취 백분율 리스트 (USER_NT 행이 없는 날은 {})"""
+    percentages_list = []
+    for day in range(1, calendar.monthrange(year, month)[1] + 1):
+        daily_totals = totals_by_date.get(date(year, month, day))
+        percentages_list.append(daily_percentages(daily_totals) if daily_totals else {})
+    return percentages_list
+
+
+def group_foods_by_day(results):
+    """FOOD 행을 31일짜리 리스트로 묶음 (/api/monthly 응답 형식)"""
+    monthly_data = {}
+
+    for row in results:
+        monthly_data.setdefault(row[0].day, []).append(food_item(row))
+
+    # Create a list of 31 days, each day is a list of food items (which may be empty)
+    return [monthly_data.get(day, []) for day in range(1, 32)]
+
+
+def quarter_months(year, start_month):
+    months = []
+    for i in range(-1, 2):  # 이전 달, 현재 달, 다음 달 순서로 데이터를 가져오기
+        month = (start_month + i - 1) % 12 + 1
+        current_year = year + (start_month + i - 1) // 12
+        months.append((current_year, month))
+    return months
+
+
+def build_quarterly_data(months, food_rows, totals_by_date):
+    """3개월 구간의 행을 월별로 나눠 {"YYYY-MM": monthly_data} 를 만든다 (food_rows 가 None 이면 DB 오류)"""
+    rows_by_month = {key: [] for key in months}
+    for row in food_rows or []:
+        # 조회 구간에 months 에 없는 달(캐시에 있던 달)이 끼어 있을 수 있음
+        month_rows = rows_by_month.get((row[0].year, row[0].month))
+        if month_rows is not None:
+            month_rows.append(row)
+
+    quarterly_data = {}
+    for current_year, month in months:
+        if food_rows is None:
+            monthly_data = {"error": "Database error"}
+        else:
+            monthly_data = build_monthly_data(
+                current_year, month, rows_by_month[(current_year, month)], totals_by_date
+            )
+        quarterly_data[month_label(current_year, month)] = monthly_data
+    return quarterly_data
+
+
+def month_label(year, month):
+    return f"{year}-{str(month).zfill(2)}"
+
+
+def food_info_response(user_id, date, food_index, nutrition_info):
+    return {
+        "ID": user_id,
+        "DATE": date,
+        "FOOD_INDEX": food_index,
+        "food_name": nutrition_info["food_name"],
+        "carbohydrates": nutrition_info["carbohydrate"],
+        "protein": nutrition_info["protein"],
+        "fat": nutrition_info["fat"],
+        "calorie": nutrition_info["calorie"],
+    }
+
+
+# 스트리밍 응답 (?stream=1) 용 조각 생성기.
+# 조각을 이어 붙이면 jsonify 결과와 바이트 단위로 같다 (키 정렬, compact, 끝의 줄바꿈).
+
+class DaysWriter:
+    """
+    날짜순으로 들어오는 음식 조각을 [[day1...],[day2...],...] 형태의 JSON 조각으로 바꿈.
+    start() -> item() ... -> close() 순서로 호출해 나온 문자열을 이어 붙이면 된다.
+    """
+
+    def __init__(self, num_days):
+        self.num_days = num_days
+        self.day = 1
+        self.empty = True
+
+    def start(self):
+        return "[["
+
+    def item(self, day, fragment):
+        out = []
+        while self.day < day:
+            out.append("],[")
+            self.day += 1
+            self.empty = True
+        out.append(fragment if self.empty else "," + fragment)
+        self.empty = False
+        return "".join(out)
+
+    def close(self):
+        return "],[" * (self.num_days - self.day) + "]]"
+
+
+class QuarterlyWriter:
+    """build_quarterly_data 결과와 같은 JSON 을 FOOD 행(날짜순)을 하나씩 받아 조각으로 만듦"""
+
+    def __init__(self, months, totals_by_date, fragment):
+        # jsonify 는 키를 정렬하므로 "YYYY-MM" 키 순서 = 문자열 정렬 순서
+        self.months = sorted(months)
+        self.fragment = fragment  # 값 -> compact JSON 문자열 (앱의 JSON provider 로)
+        self.totals_by_date = totals_by_date
+        self.index = -1
+        self.days = None
+
+    def _open_month(self):
+        self.index += 1
+        year, month = self.months[self.index]
+        self.days = DaysWriter(calendar.monthrange(year, month)[1])
+        key = self.fragment(f"{year}-{str(month).zfill(2)}")
+        return ("," if self.index else "") + key + ':{"foods":' + self.days.start()
+
+    def _close_month(self):
+        year, month = self.months[self.index]
+        percentages = monthly_percentages(year, month, self.totals_by_date)
+        return self.days.close() + ',"percentages":' + self.fragment(percentages) + "}"
+
+    def start(self):
+        return "{" + self._open_month()
+
+    def row(self, row):
+        out = []
+        key = (row[0].year, row[0].month)
+        while self.months[self.index] != key:
+            out.append(self._close_month())
+            out.append(self._open_month())
+        out.append(self.days.item(row[0].day, self.fragment(food_item(row))))
+        return "".join(out)
+
+    def close(self):
+        out = [self._close_month()]
+        while self.index + 1 < len(self.months):
+            out.append(self._open_month())
+            out.append(self._close_month())
+        out.append("}\n")
+        return "".join(out)
+
+
+if __name__ == "__main__":
+    import db
+
+    parser = argparse.ArgumentParser(description="USER_NT 일별 합계 재계산")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    rebuild = subparsers.add_parser("rebuild", help="[start, end) 구간의 합계를 FOOD 로부터 다시 계산")
+    rebuild.add_argument("start", help="YYYY-MM-DD (포함)")
+    rebuild.add_argument("end", help="YYYY-MM-DD (미포함)")
+    rebuild.add_argument("--user", help="특정 사용자만 재계산")
+    normalize = subparsers.add_parser("normalize", help="FOOD 의 문자열 영양 값을 숫자 (kcal, g) 로 변환")
+    normalize.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    with db.connection() as connection:
+        if args.command == "normalize":
+            scanned, changed = normalize_food_values(connection, args.batch_size)
+            print(f"Normalized {changed} of {scanned} FOOD rows")
+        else:
+            count = rebuild_daily_totals(connection, args.start, args.end, args.user)
+            connection.commit()
+            print(f"Rebuilt {count} daily totals")
@@ -0,0 +1,44 @@
+# gunicorn.conf.py
+# 실행: gunicorn app:app   (필요 패키지: gunicorn)
+#
+# GUNICORN_PRELOAD=1 이면 master 가 app 과 LLM 파이프라인(langchain import, 프롬프트/파서), pandas 를 한 번만
+# 불러온 뒤 worker 를 fork 한다. worker 는 이미 import 된 모듈을 copy-on-write 로 공유하므로
+# 시작이 빠르고 worker 수만큼 메모리를 더 쓰지 않는다.
+# fork 를 넘어 공유하면 안 되는 것(SQLite 커넥션, 로그 리스너 스레드)은 post_fork 에서 새로 만든다.
+# 백그라운드 작업 상태는 FOOD_JOB_DB_PATH 의 SQLite 로 worker 끼리 공유한다 (jobs.py).
+# FOOD_JOB_DB_PATH="" 로 메모리에만 두려면 GUNICORN_WORKERS=1 로 띄워야 /api/jobs/<id> 가 404 를 내지 않는다.
+# DB 풀과 LLM 클라이언트는 처음 쓸 때 만들어지므로 master 에서는 열리지 않는다.
+
+import gc
+import multiprocessing
+import os
+
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:5000")
+workers = int(os.getenv("GUNICORN_WORKERS", str(multiprocessing.cpu_count() * 2 + 1)))
+threads = int(os.getenv("GUNICORN_THREADS", "4"))
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "120"))  # LLM 호출이 길어질 수 있음
+preload_app = os.getenv("GUNICORN_PRELOAD", "0").lower() in ("1", "true")
+
+
+def when_ready(server):
+    if not preload_app:
+        return
+    import llm
+    import trends
+
+    llm.preload()
+    trends.preload()
+    # fork 전에 지금까지 만든 객체를 GC 대상에서 빼서, worker 에서 GC 가 돌 때 공유 페이지가 복사되지 않게 함
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    if not preload_app:
+        return
+    import jobs
+    import llm
+    import log
+
+    log.after_fork()
+    llm.after_fork()
+    jobs.job_queue.after_fork()
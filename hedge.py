@@ -0,0 +1,306 @@
+# hedge.py
+# LLM 호출 마감 시간 (deadline) 과 hedged request
+#   - 요청마다 마감 시간을 정하고 (LLM_REQUEST_TIMEOUT 초, 백그라운드 작업은 LLM_JOB_TIMEOUT 초)
+#     대기열 (admission.py) 과 모델 호출에 남은 시간만 넘긴다. 모델에는 timeout= 으로 전달되어
+#     (openai 클라이언트의 요청별 timeout) 마감이 지나면 연결을 끊는다. 마감까지 결과가 없으면 DeadlineExceeded (-> 504)
+#   - 첫 호출이 최근 호출 시간의 p95 (LLM_HEDGE_QUANTILE) 보다 오래 걸리면 같은 프롬프트로 한 번 더 호출하고,
+#     먼저 파싱까지 성공한 쪽을 쓴다. 남은 호출은 취소한다 (스레드는 멈출 수 없으므로 동기 버전은 결과를 버리고,
+#     그 호출은 timeout 에 끝난다. 대신 on_abandon() 으로 등록한 정리 (LLM 대기열 자리 반납) 를 바로 한다).
+#     첫 호출이 파싱에 실패하면 기다리지 않고 바로 hedge 를 보낸다. 둘 다 실패하면 첫 호출의 오류를 올린다.
+#   - 추가 호출은 전체의 LLM_HEDGE_BUDGET (기본 10%) 까지만, 그리고 LLM 대기열에 빈자리가 있을 때만 보낸다
+#     (hedge 는 기다리지 않음). 그래서 평균 호출 수는 많아야 1.1 배.
+#
+# 측정: python bench/hedging.py  (지연시간 꼬리가 긴 가짜 모델로 hedge 전후 p99 / 호출 수 비교)
+
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextvars import ContextVar, copy_context
+from dotenv import load_dotenv
+import asyncio
+import logging
+import os
+import threading
+import time
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+REQUEST_TIMEOUT = float(os.getenv("LLM_REQUEST_TIMEOUT", "25"))
+JOB_TIMEOUT = float(os.getenv("LLM_JOB_TIMEOUT", "120"))
+
+# 현재 요청/작업의 마감 시각 (time.monotonic 기준)
+_deadline = ContextVar("llm_deadline", default=None)
+# Hedger 가 실행 중인 호출 (_Attempt). Hedger 밖에서는 None
+_attempt = ContextVar("llm_attempt", default=None)
+
+
+class DeadlineExceeded(TimeoutError):
+    """마감 시간 안에 LLM 결과를 받지 못함"""
+
+
+def set_deadline(seconds):
+    """지금부터 seconds 초 뒤를 현재 요청/작업의 마감으로"""
+    _deadline.set(time.monotonic() + seconds)
+
+
+def deadline():
+    """현재 요청의 마감 시각. 요청 밖에서 정해진 적이 없으면 지금부터 LLM_REQUEST_TIMEOUT 초"""
+    value = _deadline.get()
+    return value if value is not None else time.monotonic() + REQUEST_TIMEOUT
+
+
+def remaining(until):
+    """마감까지 남은 초. 이미 지났으면 DeadlineExceeded"""
+    left = until - time.monotonic()
+    if left <= 0:
+        raise DeadlineExceeded("LLM deadline exceeded")
+    return left
+
+
+class _Attempt:
+    """Hedger 의 호출 하나. 결과를 버리게 되면 (abandon) 등록된 정리 함수를 바로 부른다"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._callbacks = []
+        self.abandoned = False
+
+    def on_abandon(self, callback):
+        with self._lock:
+            if not self.abandoned:
+                self._callbacks.append(callback)
+                return
+        callback()
+
+    def abandon(self):
+        with self._lock:
+            self.abandoned = True
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception:
+                logger.exception("Hedge abandon callback failed")
+
+
+def on_abandon(callback):
+    """
+    Hedger.run 의 attempt 안에서 호출: 이 호출의 결과를 버리게 되면 (다른 호출이 이기거나 마감이 지남)
+    모델이 돌아오기 전에 callback 을 부른다. Hedger 밖이면 아무것도 하지 않음
+    """
+    attempt = _attempt.get()
+    if attempt is not None:
+        attempt.on_abandon(callback)
+
+
+def init_app(app):
+    """Flask: 요청이 시작될 때 마감 시간을 정함"""
+
+    @app.before_request
+    def _start_deadline():
+        set_deadline(REQUEST_TIMEOUT)
+
+
+def init_quart_app(app):
+    @app.before_request
+    async def _start_deadline():
+        set_deadline(REQUEST_TIMEOUT)
+
+
+class _HedgeState:
+    def __init__(self, enabled=True, quantile=0.95, min_delay=0.2, min_samples=20, budget=0.1, window=200):
+        self.enabled = enabled
+        self.quantile = quantile
+        self.min_delay = min_delay  # p95 가 이보다 짧아도 이만큼은 기다림
+        self.min_samples = min_samples  # 이만큼 쌓이기 전에는 p95 를 믿지 않고 hedge 하지 않음
+        self.budget = budget  # hedge 수 / 호출 수 상한
+        self._samples = deque(maxlen=window)  # 최근 성공한 호출 시간 (초)
+        self._lock = threading.Lock()
+
+        # counters
+        self.calls = 0
+        self.hedged = 0
+        self.hedge_wins = 0  # hedge 결과가 먼저 도착
+        self.cancelled = 0  # 진 호출을 취소 (또는 결과를 버림)
+        self.deadline_exceeded = 0
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            enabled=os.getenv("LLM_HEDGE", "1").lower() in ("1", "true"),
+            quantile=float(os.getenv("LLM_HEDGE_QUANTILE", "0.95")),
+            min_delay=float(os.getenv("LLM_HEDGE_MIN_DELAY_MS", "200")) / 1000,
+            min_samples=int(os.getenv("LLM_HEDGE_MIN_SAMPLES", "20")),
+            budget=float(os.getenv("LLM_HEDGE_BUDGET", "0.1")),
+        )
+
+    def _count(self, name, n=1):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + n)
+
+    def record(self, seconds):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def delay(self):
+        """hedge 를 보낼 때까지 기다릴 초. hedge 하지 않으면 None"""
+        if not self.enabled:
+            return None
+        with self._lock:
+            if len(self._samples) < self.min_samples:
+                return None
+            samples = sorted(self._samples)
+        return max(self.min_delay, samples[int(self.quantile * (len(samples) - 1))])
+
+    def _may_hedge(self):
+        with self._lock:
+            if self.hedged + 1 > self.budget * self.calls:
+                return False
+            self.hedged += 1
+            return True
+
+    def stats(self):
+        delay = self.delay()
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "calls": self.calls,
+                "hedged": self.hedged,
+                "hedge_wins": self.hedge_wins,
+                "cancelled": self.cancelled,
+                "deadline_exceeded": self.deadline_exceeded,
+                "hedge_delay_seconds": round(delay, 3) if delay is not None else 0,
+                "samples": len(self._samples),
+            }
+
+
+class Hedger(_HedgeState):
+    """
+    스레드용. attempt(until, hedged) 는 모델을 호출하고 파싱한 결과를 돌려주는 함수
+    (until: 마감 시각, hedged: 추가 호출인지).
+
+    사용 예:
+        result = hedger.run(attempt, hedge.deadline())
+
+    attempt 는 결과가 버려질 때 할 정리 (LLM 대기열 자리 반납 등) 를 hedge.on_abandon() 으로 등록할 수 있다.
+    """
+
+    def __init__(self, *args, workers=64, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="llm-call")
+
+    def _timed(self, attempt, until, hedged, handle):
+        _attempt.set(handle)
+        started = time.monotonic()
+        result = attempt(until, hedged)
+        self.record(time.monotonic() - started)
+        return result
+
+    def _submit(self, attempts, attempt, until, hedged):
+        handle = _Attempt()
+        # 요청의 contextvar (metrics 라우트, 우선순위 등) 를 호출 스레드로 넘김
+        future = self._executor.submit(copy_context().run, self._timed, attempt, until, hedged, handle)
+        attempts[future] = handle
+        return future
+
+    def run(self, attempt, until):
+        self._count("calls")
+        remaining(until)
+        delay = self.delay()
+
+        attempts = {}  # future -> _Attempt
+        # 모델이 timeout 을 지키지 않아도 마감에 돌아오도록 호출은 항상 executor 에서
+        primary = self._submit(attempts, attempt, until, False)
+        pending = {primary}
+        # None: hedge 를 보냈거나 보내지 않기로 함
+        hedge_at = None if delay is None else time.monotonic() + delay
+        hedge = None
+        errors = {}
+        while True:
+            now = time.monotonic()
+            wake = until if hedge_at is None else min(hedge_at, until)
+            done, pending = wait(pending, timeout=max(0.0, wake - now), return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    if future is hedge:
+                        self._count("hedge_wins")
+                    self._abandon(pending, attempts)
+                    return future.result()
+                errors[future] = future.exception()
+
+            now = time.monotonic()
+            if now >= until:
+                self._abandon(pending, attempts)
+                self._count("deadline_exceeded")
+                raise DeadlineExceeded("LLM deadline exceeded")
+            if hedge_at is not None and (now >= hedge_at or not pending):
+                hedge_at = None
+                if self._may_hedge():
+                    hedge = self._submit(attempts, attempt, until, True)
+                    pending.add(hedge)
+            if not pending:
+                # hedge 의 오류 (대기열이 차서 Overloaded 등) 보다 첫 호출의 오류가 원인을 잘 보여 줌
+                raise errors.get(primary) or errors[hedge]
+
+    def _abandon(self, futures, attempts):
+        for future in futures:
+            future.cancel()  # 아직 시작하지 않았으면 취소, 실행 중이면 결과를 버림
+            attempts[future].abandon()  # 실행 중이면 대기열 자리 등은 지금 반납
+        if futures:
+            self._count("cancelled", len(futures))
+
+
+class AsyncHedger(_HedgeState):
+    """
+    asyncio 용 (asgi_app.py). attempt(until, hedged) 는 코루틴 함수.
+    진 호출은 실제로 취소되므로 대기열 자리도 취소될 때 (async with 를 빠져나가며) 바로 반납된다.
+    """
+
+    async def _timed(self, attempt, until, hedged):
+        started = time.monotonic()
+        result = await attempt(until, hedged)
+        self.record(time.monotonic() - started)
+        return result
+
+    async def run(self, attempt, until):
+        self._count("calls")
+        remaining(until)
+        delay = self.delay()
+
+        primary = asyncio.ensure_future(self._timed(attempt, until, False))
+        pending = {primary}
+        hedge_at = None if delay is None else time.monotonic() + delay
+        hedge = None
+        errors = {}
+        try:
+            while True:
+                now = time.monotonic()
+                wake = until if hedge_at is None else min(hedge_at, until)
+                done, pending = await asyncio.wait(
+                    pending, timeout=max(0.0, wake - now), return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.exception() is None:
+                        if task is hedge:
+                            self._count("hedge_wins")
+                        return task.result()
+                    errors[task] = task.exception()
+
+                now = time.monotonic()
+                if now >= until:
+                    self._count("deadline_exceeded")
+                    raise DeadlineExceeded("LLM deadline exceeded")
+                if hedge_at is not None and (now >= hedge_at or not pending):
+                    hedge_at = None
+                    if self._may_hedge():
+                        hedge = asyncio.ensure_future(self._timed(attempt, until, True))
+                        pending.add(hedge)
+                if not pending:
+                    raise errors.get(primary) or errors[hedge]
+        finally:
+            # 진 호출 (또는 요청 취소 시 남은 호출) 취소
+            for task in pending:
+                task.cancel()
+            if pending:
+                self._count("cancelled", len(pending))
@@ -0,0 +1,123 @@
+# http_cache.py
+# 조회 API 의 HTTP 캐시 (ETag / If-None-Match -> 304) 와 렌더링된 응답 본문 캐시
+#
+# ETag 는 (엔드포인트, 요청 파라미터, 데이터 버전) 으로 만든다.
+# 데이터 버전은 FOOD/USER_NT 를 바꿀 때마다 같은 트랜잭션에서 올라가므로 (food_store.bump_month_version)
+# 버전이 같으면 응답 본문도 같고, 본문 캐시도 ETag 를 키로 그대로 쓸 수 있다 (무효화가 필요 없음).
+
+from collections import OrderedDict
+from dotenv import load_dotenv
+import hashlib
+import os
+import threading
+
+load_dotenv()
+
+
+class ResponseCache:
+    """ETag -> 렌더링된 JSON 본문(bytes) LRU"""
+
+    def __init__(self, capacity=512):
+        self.capacity = capacity
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+        # counters
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, etag):
+        with self._lock:
+            body = self._entries.get(etag)
+            if body is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(etag)
+            self.hits += 1
+            return body
+
+    def set(self, etag, body):
+        if self.capacity <= 0:
+            return
+        with self._lock:
+            self._entries[etag] = body
+            self._entries.move_to_end(etag)
+            while len(self._entries) > self.capacity:
+                self._entries.popitem(last=False)
+
+    def stats(self):
+        with self._lock:
+            size = len(self._entries)
+        return {"size": size, "hits": self.hits, "misses": self.misses}
+
+
+response_cache = ResponseCache(int(os.getenv("RESPONSE_CACHE_SIZE", "512")))
+
+
+def make_etag(*parts):
+    """("monthly", "user1", 2024, 6, 3) 같은 값들로 ETag 값 (따옴표 없이) 을 만든다"""
+    return hashlib.sha1("\0".join(str(part) for part in parts).encode("utf-8")).hexdigest()
+
+
+def is_fresh(request, etag):
+    """클라이언트가 If-None-Match 로 같은 ETag 를 보냈으면 True (-> 304)"""
+    return request.if_none_match.contains_weak(etag)
+
+
+def render_json(json_provider, value):
+    """jsonify(value) 와 같은 바이트를 만든다 (Flask / Quart 공통)"""
+    compact = json_provider.compact
+    if compact is False or (compact is None and json_provider._app.debug):
+        text = json_provider.dumps(value, indent=2)
+    else:
+        text = json_provider.dumps(value, separators=(",", ":"))
+    return f"{text}\n".encode("utf-8")
+
+
+def not_modified_response(response_class, etag):
+    response = response_class(status=304)
+    response.set_etag(etag)
+    return response
+
+
+def tag_response(response, etag):
+    response.set_etag(etag)
+    # 매번 서버에 확인하되, 바뀌지 않았으면 304 로 본문 없이 응답
+    response.headers["Cache-Control"] = "private, no-cache"
+    return response
+
+
+def json_response(response_class, json_provider, body, etag, status=200):
+    response = response_class(body, status=status, mimetype=json_provider.mimetype)
+    return tag_response(response, etag)
+
+
+def json_fragment(json_provider, value):
+    """value 의 compact JSON (스트리밍 응답 조각, SSE data 용)"""
+    return json_provider.dumps(value, separators=(",", ":"))
+
+
+def sse(json_provider, event, data):
+    """Server-Sent Events 이벤트 하나"""
+    return f"event: {event}\ndata: {json_fragment(json_provider, data)}\n\n"
+
+
+# --- 스트리밍 응답 (?stream=1) ---
+# 행을 전부 메모리에 올리지 않고 server-side cursor 로 하나씩 읽으며 JSON 을 조각으로 내보낸다 (food_store.DaysWriter).
+
+STREAM_CHUNK_SIZE = 16 * 1024
+
+
+def buffered(fragments, size=STREAM_CHUNK_SIZE):
+    """작은 조각을 size 바이트 정도로 모아서 내보냄 (조각마다 write 하지 않도록)"""
+    chunk = []
+    length = 0
+    for fragment in fragments:
+        chunk.append(fragment)
+        length += len(fragment)
+        if length >= size:
+            yield "".join(chunk)
+            chunk = []
+            length = 0
+    if chunk:
+        yield "".join(chunk)
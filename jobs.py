@@ -0,0 +1,209 @@
+# jobs.py
+# 백그라운드 작업 큐 (LLM 영양 분석처럼 오래 걸리는 작업용)
+#   작업은 접수한 프로세스의 스레드 풀에서 실행하고, 상태는 로컬 SQLite 파일 (FOOD_JOB_DB_PATH) 에도 기록한다.
+#   gunicorn worker 가 여럿이어도 상태 조회 (/api/jobs/<id>) 가 다른 worker 로 가면 SQLite 에서 읽으므로 404 가 나지 않는다.
+#   (같은 서버의 worker 끼리만 공유된다. 서버가 여러 대면 조회가 작업을 접수한 서버로 가야 함)
+#   FOOD_JOB_DB_PATH="" 이면 프로세스 메모리에만 보관하므로 worker 를 하나만 띄워야 한다.
+#
+# 작업에는 요청한 사용자 (owner) 를 함께 저장하고, 조회할 때 같은 사용자인지 확인한다 (app.get_job).
+
+from concurrent.futures import ThreadPoolExecutor
+from dotenv import load_dotenv
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+import admission
+import hedge
+import metrics
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+# 다른 프로세스가 실행 중인 작업을 long-poll 할 때 SQLite 를 다시 읽는 간격 (초)
+POLL_INTERVAL = 0.2
+
+
+class JobQueue:
+    """
+    ThreadPoolExecutor 위에 작업 상태 저장소를 얹은 간단한 큐.
+    외부 서비스 없이 동작하며, 끝난 작업은 retention 초 동안만 보관한다.
+    path 가 있으면 상태를 SQLite 에도 써서 같은 서버의 다른 프로세스에서 조회할 수 있다.
+    """
+
+    def __init__(self, workers=4, retention=3600, path=None):
+        self.retention = retention
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="food-job")
+        self._lock = threading.Lock()
+        self._jobs = {}  # job_id -> job dict (이 프로세스가 접수한 작업)
+        self._events = {}  # job_id -> threading.Event (완료 알림용)
+
+        self.path = path
+        self._db = None
+        self._db_lock = threading.Lock()
+        self._open()
+
+    def _open(self):
+        if not self.path:
+            return
+        self._db = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS food_jobs (
+                job_id TEXT PRIMARY KEY,
+                kind TEXT NOT NULL,
+                owner TEXT,
+                status TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                finished_at REAL,
+                result TEXT,
+                error TEXT
+            )
+            """
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS food_jobs_finished ON food_jobs (finished_at)")
+
+    def after_fork(self):
+        """fork 된 자식 프로세스에서 호출 (gunicorn preload 모드의 post_fork). SQLite 커넥션을 새로 연다"""
+        with self._db_lock:
+            self._open()
+
+    def submit(self, kind, func, *args, owner=None, on_failure=None):
+        """func(*args) 를 백그라운드에서 실행하고 job id 를 반환. owner: 조회할 수 있는 사용자"""
+        self._purge()
+        job_id = uuid.uuid4().hex
+        job = {
+            "job_id": job_id,
+            "kind": kind,
+            "owner": None if owner is None else str(owner),
+            "status": PENDING,
+            "created_at": time.time(),
+            "finished_at": None,
+            "result": None,
+            "error": None,
+        }
+        with self._lock:
+            self._jobs[job_id] = job
+            self._events[job_id] = threading.Event()
+        self._persist(job)
+        self._executor.submit(self._run, job_id, kind, func, args, on_failure)
+        return job_id
+
+    def _run(self, job_id, kind, func, args, on_failure):
+        # 작업 안의 DB/LLM 시간은 job:<kind> 라우트로 모음
+        metrics.set_route(f"job:{kind}")
+        # LLM 대기열에서 사용자 요청보다 뒤에 섬
+        admission.set_priority(admission.BACKGROUND)
+        # 사용자가 응답을 기다리지 않으므로 마감은 더 길게 (LLM_JOB_TIMEOUT)
+        hedge.set_deadline(hedge.JOB_TIMEOUT)
+        self._update(job_id, status=RUNNING)
+        try:
+            result = func(*args)
+        except Exception as e:
+            logger.exception("Job %s failed", job_id)
+            if on_failure is not None:
+                try:
+                    on_failure(*args)
+                except Exception:
+                    logger.exception("Cleanup for job %s failed", job_id)
+            self._update(job_id, status=FAILED, error=str(e), finished_at=time.time())
+        else:
+            self._update(job_id, status=DONE, result=result, finished_at=time.time())
+        finally:
+            self._events[job_id].set()
+
+    def _update(self, job_id, **fields):
+        with self._lock:
+            job = self._jobs[job_id]
+            job.update(fields)
+            job = dict(job)
+        self._persist(job)
+
+    # --- SQLite (path 가 없으면 아무것도 하지 않음) ---
+
+    def _persist(self, job):
+        if self._db is None:
+            return
+        try:
+            with self._db_lock:
+                self._db.execute(
+                    """
+                    INSERT OR REPLACE INTO food_jobs
+                        (job_id, kind, owner, status, created_at, finished_at, result, error)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                    """,
+                    (
+                        job["job_id"], job["kind"], job["owner"], job["status"], job["created_at"],
+                        job["finished_at"], json.dumps(job["result"], ensure_ascii=False, default=str),
+                        job["error"],
+                    ),
+                )
+        except sqlite3.Error as e:
+            # 이 프로세스에서는 메모리 상태로 계속 조회할 수 있음
+            logger.warning("Job store write failed: %s", e)
+
+    def _load(self, job_id):
+        if self._db is None:
+            return None
+        with self._db_lock:
+            row = self._db.execute(
+                """
+                SELECT job_id, kind, owner, status, created_at, finished_at, result, error
+                FROM food_jobs WHERE job_id = ?
+                """,
+                (job_id,),
+            ).fetchone()
+        if row is None:
+            return None
+        keys = ("job_id", "kind", "owner", "status", "created_at", "finished_at", "result", "error")
+        job = dict(zip(keys, row))
+        job["result"] = json.loads(job["result"]) if job["result"] is not None else None
+        return job
+
+    def _purge(self):
+        cutoff = time.time() - self.retention
+        with self._lock:
+            expired = [
+                job_id for job_id, job in self._jobs.items()
+                if job["finished_at"] is not None and job["finished_at"] < cutoff
+            ]
+            for job_id in expired:
+                del self._jobs[job_id]
+                del self._events[job_id]
+        if self._db is not None:
+            with self._db_lock:
+                self._db.execute("DELETE FROM food_jobs WHERE finished_at < ?", (cutoff,))
+
+    def get(self, job_id, wait=0):
+        """작업 상태를 반환. wait 초 동안 완료를 기다린다 (long-poll). 없는 작업이면 None"""
+        with self._lock:
+            event = self._events.get(job_id)
+        if event is None:
+            # 다른 프로세스가 접수한 작업: SQLite 를 다시 읽으며 기다림
+            deadline = time.monotonic() + wait
+            job = self._load(job_id)
+            while job is not None and job["status"] in (PENDING, RUNNING) and time.monotonic() < deadline:
+                time.sleep(min(POLL_INTERVAL, max(0.0, deadline - time.monotonic())))
+                job = self._load(job_id)
+            return job
+        if wait > 0:
+            event.wait(wait)
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job is not None else None
+
+
+job_queue = JobQueue(
+    workers=int(os.getenv("FOOD_JOB_WORKERS", "4")),
+    path=os.getenv("FOOD_JOB_DB_PATH", "food_jobs.sqlite3") or None,
+)
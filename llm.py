@@ -1,50 +1,264 @@
 # llm.py
+# 음식 영양 분석 LLM 파이프라인 (app.py, asgi_app.py 가 함께 사용)
+#   로컬 성분표(food_kb) -> LLM 결과 캐시 -> LLM 순으로 찾고, 같은 음식이 동시에 들어오면 모델 호출은 한 번만.
+#   모델 호출은 llm_admission (admission.py) 의 동시 호출 수 / 분당 토큰 한도 안에서만 한다.
+#   요청의 마감 시간 안에서 호출하고, 오래 걸리면 같은 프롬프트로 한 번 더 호출한다 (llm_hedger, hedge.py).
+#   do_stream() 은 모델 토큰 스트림을 부분 JSON 으로 파싱해 필드가 확정되는 대로 내보낸다 (/api/send SSE).
+#
+# 모델 클라이언트와 프롬프트/파서는 프로세스에 하나만, 처음 LLM 이 필요할 때 만든다.
+# langchain 도 그때 import 하므로 LLM 을 쓰지 않는 요청 (로그인, 월별 조회 등) 은 그 비용을 치르지 않는다.
 
-from langchain_core.prompts import ChatPromptTemplate
-from langchain_openai import AzureChatOpenAI
-from langchain_core.pydantic_v1 import BaseModel, Field
-from langchain_core.output_parsers import JsonOutputParser
 from dotenv import load_dotenv
-import os
+from types import SimpleNamespace
+import logging
+import threading
+import time
 
+import food_kb
+import hedge
+from admission import BACKGROUND, Admission
+import metrics
+import llm_backend
+import nutrition
+from llm_backend import create_model
+from nutrition_cache import REQUIRED_KEYS, create_cache
+from singleflight import SingleFlight, lease_ttl
 
 load_dotenv()
 
-model = AzureChatOpenAI(
-    azure_deployment=os.getenv("AZURE_OPENAI_DEPLOYMENT"),  # gpt-4o is set by env
-    temperature=1.0,
-)
+logger = logging.getLogger(__name__)
 
+nutrition_cache = create_cache("app")
+# 같은 음식이 동시에 들어오면 모델 호출은 한 번만
+nutrition_flight = SingleFlight(nutrition_cache, lease_ttl=lease_ttl())
+# 동시 호출 수 / 분당 토큰 한도. 넘치면 admission.Overloaded (-> 503 + Retry-After)
+llm_admission = Admission.from_env()
+# 마감 시간 / p95 보다 늦으면 hedge. 마감을 넘기면 hedge.DeadlineExceeded (-> 504)
+llm_hedger = hedge.Hedger.from_env()
 
-class NutritionInfo(BaseModel):
-    food_name: str = Field(description="The name of the food")
-    calorie: str = Field(description="The amount of Calories")
-    carbohydrate: str = Field(description="The amount of Carbohydrate")
-    protein: str = Field(description="The amount of Protein")
-    fat: str = Field(description="The amount of Fat")
+_lock = threading.Lock()
+_model = None
+_pipeline = None
 
 
-output_parser = JsonOutputParser(pydantic_object=NutritionInfo)
+def get_model():
+    """LLM_BACKEND=live|record|replay|synthetic 에 맞는 모델 (llm_backend.py). 처음 호출할 때 만듦"""
+    global _model
+    if _model is None:
+        with _lock:
+            if _model is None:
+                _model = create_model()
+    return _model
 
-prompt_template = ChatPromptTemplate.from_template(
+
+def set_model(model):
+    """벤치마크 등에서 모델을 바꿔 끼울 때 사용"""
+    global _model
+    _model = model
+
+
+def _build_pipeline():
+    from typing import List
+
+    from langchain_core.output_parsers import JsonOutputParser
+    from langchain_core.prompts import ChatPromptTemplate
+    from langchain_core.pydantic_v1 import BaseModel, Field
+
+    class NutritionInfo(BaseModel):
+        food_name: str = Field(description="The food name")
+        calorie: float = Field(description="The amount of Calories in kcal, as a number")
+        carbohydrate: float = Field(description="The amount of Carbohydrate in grams, as a number")
+        protein: float = Field(description="The amount of Protein in grams, as a number")
+        fat: float = Field(description="The amount of Fat in grams, as a number")
+
+    class MealNutritionInfo(BaseModel):
+        items: List[NutritionInfo] = Field(description="Nutrition info of each food, in input order")
+
+    output_parser = JsonOutputParser(pydantic_object=NutritionInfo)
+    prompt_template = ChatPromptTemplate.from_template(
+        """
+    음식이 입력되면 영양정보를 분석해줘
+    필수 요소는 음식 이름, 칼로리, 탄수화물, 단백질, 지방이야
+    입력: {string}
+
+    {format_instructions}
     """
-    음식이 입력되면 영양정보(이름, 칼로리, 탄수화물, 단백질, 지방)를 분석해줘
-    음식 이름을 입력받으면 다음과 같은 조건을 만족하여 추출해줘 
-    예를 들어 "돈까스 2개 먹었어"를 입력받으면, (돈까스, 1400,50,90,60) 이런식으로 출력해줘 
-    또 다른 예시로 "에너지바 1개 먹었어"를 입력받으면, 출력은 (에너지바, 200,20,12,10) 이런식으로 출력해줘
-    
-    입력:{string}
+    ).partial(format_instructions=output_parser.get_format_instructions())
+
+    meal_output_parser = JsonOutputParser(pydantic_object=MealNutritionInfo)
+    meal_prompt_template = ChatPromptTemplate.from_template(
+        """
+    여러 음식이 번호 목록으로 입력되면 각 음식의 영양정보를 분석해줘
+    필수 요소는 음식 이름, 칼로리, 탄수화물, 단백질, 지방이야
+    입력 순서와 같은 순서로, 입력 개수와 같은 개수만큼 items 에 넣어줘
+    입력:
+    {strings}
+
     {format_instructions}
     """
-).partial(format_instructions=output_parser.get_format_instructions())
+    ).partial(format_instructions=meal_output_parser.get_format_instructions())
+
+    return SimpleNamespace(
+        output_parser=output_parser,
+        prompt_template=prompt_template,
+        meal_output_parser=meal_output_parser,
+        meal_prompt_template=meal_prompt_template,
+    )
+
+
+def pipeline():
+    """프롬프트/파서 묶음 (prompt_template, output_parser, meal_prompt_template, meal_output_parser)"""
+    global _pipeline
+    if _pipeline is None:
+        with _lock:
+            if _pipeline is None:
+                _pipeline = _build_pipeline()
+    return _pipeline
+
+
+def preload():
+    """
+    langchain import 와 프롬프트/파서 생성을 지금 한다 (모델 클라이언트는 만들지 않음).
+    gunicorn preload 모드에서 fork 전에 부르면 worker 들이 이 메모리를 copy-on-write 로 공유한다.
+    """
+    llm_backend.preload()
+    pipeline()
+
+
+def after_fork():
+    nutrition_cache.after_fork()
+
+
+def invoke(prompt_value, parse, deadline=None):
+    """
+    입장 제어 -> 모델 호출 -> parse(model_output) 를 마감 시각 (deadline, 기본: 현재 요청의 마감) 안에.
+    오래 걸리거나 파싱에 실패하면 hedge 호출을 보내 먼저 성공한 결과를 쓴다.
+    (대기 시간은 llm_queue, 호출 시간은 llm 단계로 기록)
+    """
+    tokens = llm_admission.estimate(prompt_value.to_string())
+
+    def attempt(until, hedged):
+        # hedge 는 대기열에서 기다리지 않음: 빈자리가 없으면 Overloaded 로 포기하고 첫 호출을 기다림
+        with llm_admission.acquire(tokens, BACKGROUND if hedged else None,
+                                   timeout=0 if hedged else hedge.remaining(until)) as slot:
+            # 다른 호출이 이겨 결과를 버리게 되면 모델이 돌아올 때까지 기다리지 않고 자리를 반납
+            hedge.on_abandon(slot.release)
+            with metrics.phase("llm"):
+                model_output = get_model().invoke(prompt_value, timeout=hedge.remaining(until))
+        return parse(model_output)
+
+    return llm_hedger.run(attempt, deadline or hedge.deadline())
+
+
+def known_nutrition(param):
+    """로컬 성분표 -> LLM 결과 캐시 순으로 찾아봄. 둘 다 없으면 None (값은 숫자로 정규화)"""
+    found = food_kb.lookup(param)
+    if found is None:
+        found = nutrition_cache.get(param)  # 예전에 문자열로 저장된 항목이 있을 수 있음
+    return None if found is None else nutrition.normalize(found)
+
+
+def do(param, deadline=None):
+    logger.debug("Received input: %s", param)
+    cached = known_nutrition(param)
+    if cached is not None:
+        return cached
+    # follower 들이 같은 dict 를 받으므로 복사해서 반환
+    return dict(nutrition_flight.do(param, lambda: analyze(param, deadline), deadline))
+
+
+def analyze(param, deadline=None):
+    steps = pipeline()
+    prompt_value = steps.prompt_template.invoke({"string": param})
+    # 단위가 붙은 문자열 ("1400kcal", "약 12") 이 와도 여기서 한 번만 숫자로 바꿈
+    output = invoke(prompt_value, lambda model_output: nutrition.normalize(steps.output_parser.invoke(model_output)),
+                    deadline)
+    nutrition_cache.set(param, output)
+    return output
+
+
+def do_many(params, deadline=None):
+    """
+    한 끼에 먹은 여러 음식을 LLM 호출 한 번으로 분석 (성분표/캐시에 있는 음식은 제외).
+    deadline: 마감 시각 (time.monotonic 기준, 기본: 현재 요청의 마감)
+    """
+    logger.debug("Received inputs: %s", params)
+    results = [known_nutrition(param) for param in params]
+    missing = [i for i, result in enumerate(results) if result is None]
+    if not missing:
+        return results
+
+    steps = pipeline()
+    strings = "\n".join(f"{n}. {params[i]}" for n, i in enumerate(missing, start=1))
+    prompt_value = steps.meal_prompt_template.invoke({"strings": strings})
+    items = invoke(prompt_value, lambda model_output: steps.meal_output_parser.invoke(model_output).get("items") or [],
+                   deadline)
+
+    if len(items) != len(missing):
+        # 개수가 맞지 않으면 어느 결과가 어느 음식인지 알 수 없으므로 하나씩 다시 분석
+        logger.warning("Expected %d items, got %d; falling back to do()", len(missing), len(items))
+        for i in missing:
+            results[i] = do(params[i], deadline)
+        return results
+
+    for i, item in zip(missing, items):
+        item = nutrition.normalize(item)
+        if isinstance(item, dict) and all(key in item for key in REQUIRED_KEYS):
+            nutrition_cache.set(params[i], item)
+            results[i] = item
+        else:
+            results[i] = do(params[i], deadline)
+    return results
+
+
+def settled_fields(partial):
+    """
+    부분 파싱 결과에서 값이 확정된 필드만 (숫자로 정규화).
+    마지막 키는 아직 쓰는 중일 수 있으므로 ("14" 다음에 "00kcal" 이 올 수 있음) 다음 키가 나올 때까지 뺀다.
+    """
+    if not isinstance(partial, dict):
+        return {}
+    keys = list(partial)[:-1]
+    return nutrition.normalize({key: partial[key] for key in keys})
+
+
+def do_stream(param, deadline=None):
+    """
+    do() 의 스트리밍 버전. (fields, complete) 를 차례로 내보낸다.
+      - complete=False: 지금까지 확정된 필드 (settled_fields). 바뀔 때만
+      - complete=True: 마지막 하나. 전체 응답을 다시 파싱해 정규화한 결과 (캐시에 저장)
+    성분표/캐시에 있으면 완성된 결과 하나만. 이미 보낸 필드를 되돌릴 수 없으므로 hedge 하지 않고,
+    같은 음식의 동시 요청도 합치지 않는다 (입장 제어와 마감 시간은 invoke() 와 같음).
+    """
+    cached = known_nutrition(param)
+    if cached is not None:
+        yield cached, True
+        return
+
+    steps = pipeline()
+    prompt_value = steps.prompt_template.invoke({"string": param})
+    until = deadline or hedge.deadline()
+    pieces = []
+
+    def chunks():
+        started = time.perf_counter()
+        try:
+            for chunk in get_model().stream(prompt_value, timeout=hedge.remaining(until)):
+                pieces.append(chunk.content)
+                yield chunk
+                hedge.remaining(until)  # 마감이 지나면 DeadlineExceeded
+        finally:
+            metrics.record_phase("llm", time.perf_counter() - started)
 
+    tokens = llm_admission.estimate(prompt_value.to_string())
+    with llm_admission.acquire(tokens, timeout=hedge.remaining(until)):
+        sent = {}
+        for partial in steps.output_parser.transform(chunks()):
+            fields = settled_fields(partial)
+            if fields != sent:
+                sent = fields
+                yield fields, False
 
-def do(param):
-    print(f"Received input: {param}")  # Debugging 출력 추가
-    prompt_value = prompt_template.invoke({"string": param})
-    model_output = model.invoke(prompt_value)
-    output = output_parser.invoke(model_output)
-    output_dict = output  # 이미 딕셔너리 형태로 반환됨
-    output_dict["food_name"] = param  # 음식 이름을 추가
-    print(f"Parsed output: {output_dict}")  # Debugging 출력 추가
-    return output_dict
+    output = nutrition.normalize(steps.output_parser.parse("".join(pieces)))
+    nutrition_cache.set(param, output)
+    yield output, True
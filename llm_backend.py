@@ -0,0 +1,260 @@
+# llm_backend.py
+# app.py / llm.py 가 쓰는 채팅 모델을 환경변수로 바꿔 끼우기
+#   LLM_BACKEND=live       AzureChatOpenAI (기본값)
+#   LLM_BACKEND=record     live 로 호출하면서 (프롬프트, 응답) 쌍을 LLM_RECORD_PATH 에 JSONL 로 추가
+#   LLM_BACKEND=replay     기록된 응답을 LLM_LATENCY_MS (+- LLM_JITTER_MS) 만큼 기다린 뒤 돌려줌
+#   LLM_BACKEND=synthetic  음식 이름으로부터 항상 같은 NutritionInfo JSON 을 만들어 돌려줌 (외부 호출 없음)
+#
+# replay 에서 기록에 없는 프롬프트를 만나면 ReplayMiss 를 내고, LLM_REPLAY_FALLBACK=synthetic 이면
+# synthetic 응답으로 대신한다. 모든 모델은 invoke / ainvoke 를 제공하고 langchain 의 AIMessage 를 돌려준다.
+# stream / astream 은 응답을 STREAM_CHUNK_CHARS 글자씩 AIMessageChunk 로 나눠 지연시간에 걸쳐 내보낸다 (/api/send SSE).
+# langchain 은 모델을 처음 호출할 때 import 한다 (app 을 불러오는 것만으로는 로드하지 않음).
+
+from dotenv import load_dotenv
+import asyncio
+import hashlib
+import json
+import os
+import random
+import re
+import threading
+import time
+
+load_dotenv()
+
+LIVE = "live"
+RECORD = "record"
+REPLAY = "replay"
+SYNTHETIC = "synthetic"
+
+STREAM_CHUNK_CHARS = 4  # 토큰 하나 정도
+
+DEFAULT_RECORD_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "llm_recordings.jsonl")
+
+
+class ReplayMiss(LookupError):
+    """replay 모드에서 기록되지 않은 프롬프트가 들어왔을 때 발생"""
+
+
+def prompt_key(prompt_value):
+    """프롬프트 전체 텍스트의 해시 (기록/재생에서 같은 프롬프트를 찾는 키)"""
+    text = prompt_value.to_string() if hasattr(prompt_value, "to_string") else str(prompt_value)
+    return hashlib.sha1(text.encode("utf-8")).hexdigest(), text
+
+
+class Latency:
+    """정규분포 지연시간 (seed 를 주면 실행마다 같은 순서)"""
+
+    def __init__(self, latency_ms=0.0, jitter_ms=0.0, seed=None):
+        self.mean = latency_ms / 1000
+        self.jitter = jitter_ms / 1000
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def sample(self):
+        if not self.mean and not self.jitter:
+            return 0.0
+        with self._lock:
+            return max(0.0, self._rng.gauss(self.mean, self.jitter))
+
+
+def ai_message(content):
+    from langchain_core.messages import AIMessage
+
+    return AIMessage(content=content)
+
+
+def ai_message_chunk(content):
+    from langchain_core.messages import AIMessageChunk
+
+    return AIMessageChunk(content=content)
+
+
+def _pieces(content):
+    return [content[i:i + STREAM_CHUNK_CHARS] for i in range(0, len(content), STREAM_CHUNK_CHARS)] or [""]
+
+
+def preload(backend=None):
+    """모델 호출에 필요한 langchain 모듈을 미리 import (gunicorn preload 모드에서 fork 전에)"""
+    backend = (backend or os.getenv("LLM_BACKEND", LIVE)).lower()
+    import langchain_core.messages  # noqa: F401
+
+    if backend in (LIVE, RECORD):
+        import langchain_openai  # noqa: F401
+
+
+class _BaseModel:
+    def __init__(self, latency=None):
+        self.latency = latency or Latency()
+        self.calls = 0
+
+    def _content(self, key, text):
+        raise NotImplementedError
+
+    def invoke(self, prompt_value, *args, **kwargs):
+        self.calls += 1
+        key, text = prompt_key(prompt_value)
+        content = self._content(key, text)
+        delay = self.latency.sample()
+        if delay:
+            time.sleep(delay)
+        return ai_message(content)
+
+    async def ainvoke(self, prompt_value, *args, **kwargs):
+        self.calls += 1
+        key, text = prompt_key(prompt_value)
+        content = self._content(key, text)
+        delay = self.latency.sample()
+        if delay:
+            await asyncio.sleep(delay)
+        return ai_message(content)
+
+    def stream(self, prompt_value, *args, **kwargs):
+        self.calls += 1
+        key, text = prompt_key(prompt_value)
+        pieces = _pieces(self._content(key, text))
+        delay = self.latency.sample() / len(pieces)
+        for piece in pieces:
+            if delay:
+                time.sleep(delay)
+            yield ai_message_chunk(piece)
+
+    async def astream(self, prompt_value, *args, **kwargs):
+        self.calls += 1
+        key, text = prompt_key(prompt_value)
+        pieces = _pieces(self._content(key, text))
+        delay = self.latency.sample() / len(pieces)
+        for piece in pieces:
+            if delay:
+                await asyncio.sleep(delay)
+            yield ai_message_chunk(piece)
+
+
+class SyntheticModel(_BaseModel):
+    """
+    프롬프트의 "입력:" 부분에서 음식 이름을 읽어, 이름의 해시로 정한 영양 정보를 JSON 으로 돌려줌.
+    여러 음식 프롬프트 ("1. 음식" 번호 목록) 에는 {"items": [...]} 로 답한다.
+    """
+
+    @staticmethod
+    def nutrition(name):
+        digest = int(hashlib.sha1(name.encode("utf-8")).hexdigest()[:8], 16)
+        return {
+            "food_name": name,
+            "calorie": str(100 + digest % 700),
+            "carbohydrate": str(digest % 90),
+            "protein": str(digest % 35),
+            "fat": str(digest % 30),
+        }
+
+    def _content(self, key, text):
+        _, _, request = text.partition("입력:")
+        if re.match(r"\s*1\.\s", request):
+            names = re.findall(r"^\s*\d+\.\s*(.+?)\s*$", request, re.MULTILINE)
+            content = {"items": [self.nutrition(name) for name in names]}
+        else:
+            name = request.strip().splitlines()[0].strip() if request.strip() else "unknown"
+            content = self.nutrition(name)
+        return json.dumps(content, ensure_ascii=False)
+
+
+class ReplayModel(_BaseModel):
+    def __init__(self, path, latency=None, fallback=None):
+        super().__init__(latency)
+        self.path = path
+        self.fallback = fallback
+        self.misses = 0
+        self._responses = {}
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        self._responses[entry["key"]] = entry["content"]
+
+    def __len__(self):
+        return len(self._responses)
+
+    def _content(self, key, text):
+        content = self._responses.get(key)
+        if content is not None:
+            return content
+        self.misses += 1
+        if self.fallback is None:
+            raise ReplayMiss(f"No recorded response for prompt {key} in {self.path}")
+        return self.fallback._content(key, text)
+
+
+class RecordingModel:
+    """실제 모델을 감싸서 (프롬프트, 응답) 을 JSONL 로 남김. 같은 프롬프트는 마지막 기록이 재생됨"""
+
+    def __init__(self, inner, path):
+        self.inner = inner
+        self.path = path
+        self._lock = threading.Lock()
+        self.recorded = 0
+
+    def _record(self, prompt_value, output):
+        key, text = prompt_key(prompt_value)
+        line = json.dumps({"key": key, "prompt": text, "content": output.content}, ensure_ascii=False)
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+            self.recorded += 1
+
+    def invoke(self, prompt_value, *args, **kwargs):
+        output = self.inner.invoke(prompt_value, *args, **kwargs)
+        self._record(prompt_value, output)
+        return output
+
+    async def ainvoke(self, prompt_value, *args, **kwargs):
+        output = await self.inner.ainvoke(prompt_value, *args, **kwargs)
+        await asyncio.to_thread(self._record, prompt_value, output)
+        return output
+
+    def stream(self, prompt_value, *args, **kwargs):
+        # 끝까지 받은 응답만 기록 (중간에 끊긴 스트림은 남기지 않음)
+        pieces = []
+        for chunk in self.inner.stream(prompt_value, *args, **kwargs):
+            pieces.append(chunk.content)
+            yield chunk
+        self._record(prompt_value, ai_message("".join(pieces)))
+
+    async def astream(self, prompt_value, *args, **kwargs):
+        pieces = []
+        async for chunk in self.inner.astream(prompt_value, *args, **kwargs):
+            pieces.append(chunk.content)
+            yield chunk
+        await asyncio.to_thread(self._record, prompt_value, ai_message("".join(pieces)))
+
+
+def live_model():
+    from langchain_openai import AzureChatOpenAI  # live / record 모드에서만 필요
+
+    return AzureChatOpenAI(
+        azure_deployment=os.getenv("AZURE_OPENAI_DEPLOYMENT"),  # gpt-4o is set by env
+        temperature=1.0,
+    )
+
+
+def create_model(backend=None):
+    """LLM_BACKEND 에 따라 모델을 만든다"""
+    backend = (backend or os.getenv("LLM_BACKEND", LIVE)).lower()
+    path = os.getenv("LLM_RECORD_PATH", DEFAULT_RECORD_PATH)
+    seed = os.getenv("LLM_SEED")
+    latency = Latency(
+        float(os.getenv("LLM_LATENCY_MS", "0")),
+        float(os.getenv("LLM_JITTER_MS", "0")),
+        int(seed) if seed else None,
+    )
+
+    if backend == LIVE:
+        return live_model()
+    if backend == RECORD:
+        return RecordingModel(live_model(), path)
+    if backend == REPLAY:
+        fallback = SyntheticModel() if os.getenv("LLM_REPLAY_FALLBACK") == SYNTHETIC else None
+        return ReplayModel(path, latency, fallback)
+    if backend == SYNTHETIC:
+        return SyntheticModel(latency)
+    raise ValueError(f"Unknown LLM_BACKEND: {backend!r} (live, record, replay, synthetic)")
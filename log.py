@@ -0,0 +1,77 @@
+# log.py
+# 구조화(JSON 한 줄) 로깅 설정
+#   - 요청 스레드는 QueueHandler 로 큐에 넣기만 하고, 실제 출력(포맷/쓰기)은 QueueListener 스레드가 담당
+#   - LOG_LEVEL 보다 낮은 레벨의 로그는 logger 단계에서 걸러져 포맷팅 비용도 들지 않음
+#     (그래서 로그 메시지는 f-string 대신 logger.debug("... %s", value) 형태로 씀)
+#
+# 사용 예:
+#   import log
+#   log.setup_logging()
+#   logger = logging.getLogger(__name__)
+#   logger.info("saved", extra={"fields": {"user_id": user_id}})
+
+from dotenv import load_dotenv
+from logging.handlers import QueueHandler, QueueListener
+import atexit
+import json
+import logging
+import os
+import queue
+import sys
+import time
+
+load_dotenv()
+
+_listener = None
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            "ts": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(record.created))
+            + f".{int(record.msecs):03d}",
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        fields = getattr(record, "fields", None)
+        if fields:
+            entry.update(fields)
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+def setup_logging(level=None):
+    """
+    루트 logger 에 큐 핸들러를 한 번만 연결한다. 여러 모듈에서 불러도 안전.
+    LOG_LEVEL (기본 INFO), LOG_FORMAT=text 이면 JSON 대신 일반 텍스트로 출력.
+    """
+    global _listener
+    if _listener is not None:
+        return
+
+    level = level or os.getenv("LOG_LEVEL", "INFO").upper()
+    output = logging.StreamHandler(sys.stderr)
+    if os.getenv("LOG_FORMAT", "json").lower() == "text":
+        output.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+    else:
+        output.setFormatter(JsonFormatter())
+
+    log_queue = queue.SimpleQueue()
+    root = logging.getLogger()
+    root.handlers[:] = [QueueHandler(log_queue)]
+    root.setLevel(level)
+
+    _listener = QueueListener(log_queue, output, respect_handler_level=True)
+    _listener.start()
+    atexit.register(_listener.stop)
+
+
+def after_fork():
+    """fork 된 자식에는 리스너 스레드가 없으므로 새로 시작 (gunicorn preload 모드의 post_fork)"""
+    global _listener
+    if _listener is None:
+        return
+    _listener = None
+    setup_logging()
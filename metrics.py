@@ -0,0 +1,288 @@
+# metrics.py
+# 요청 처리 시간 계측 (Prometheus 텍스트 형식으로 /metrics 에 노출)
+#   - 라우트별 지연시간 히스토그램
+#   - 단계별 시간: db_connect (풀에서 커넥션 얻기), query (cursor.execute), llm (모델 호출), serialize (JSON 직렬화)
+#     llm_queue (LLM 입장 대기, admission.py)
+#   - 풀/캐시 통계 등은 register_collector() 로 등록한 함수에서 gauge 로 읽어 옴
+#
+# METRICS_ENABLED=0 이면 훅을 등록하지 않고 phase() 는 아무것도 하지 않는 객체를 돌려준다.
+
+from bisect import bisect_left
+from contextvars import ContextVar
+from dotenv import load_dotenv
+from inspect import iscoroutinefunction
+import logging
+import os
+import threading
+import time
+
+load_dotenv()
+
+ENABLED = os.getenv("METRICS_ENABLED", "1").lower() not in ("0", "false", "")
+
+PREFIX = "dietback"
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+logger = logging.getLogger("dietback.access")
+
+# 현재 요청(또는 작업)의 라우트 이름과 단계별 누적 시간
+_route = ContextVar("metrics_route", default="-")
+_phases = ContextVar("metrics_phases", default=None)
+
+
+class Histogram:
+    def __init__(self, name, help_text, label_names, buckets=BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._series = {}  # labels -> [버킷별 개수 (누적 아님), 합계, 개수]
+
+    def observe(self, labels, value):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def expose(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = {labels: (list(counts), total, count)
+                      for labels, (counts, total, count) in self._series.items()}
+        for labels, (counts, total, count) in sorted(series.items()):
+            label_text = ",".join(
+                f'{name}="{escape(value)}"' for name, value in zip(self.label_names, labels)
+            )
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f'{self.name}_bucket{{{label_text},le="{le}"}} {cumulative}')
+            lines.append(f"{self.name}_sum{{{label_text}}} {total}")
+            lines.append(f"{self.name}_count{{{label_text}}} {count}")
+        return lines
+
+
+def escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+request_seconds = Histogram(
+    f"{PREFIX}_request_duration_seconds", "HTTP request latency by route", ("route", "method", "status")
+)
+phase_seconds = Histogram(
+    f"{PREFIX}_phase_duration_seconds", "Time spent per phase of a request", ("route", "phase")
+)
+
+_collectors = {}  # 이름 -> stats dict 를 돌려주는 함수
+
+
+def register_collector(name, stats):
+    """stats() 가 돌려주는 dict 의 숫자 값을 dietback_<name>_<key> gauge 로 노출"""
+    _collectors[name] = stats
+
+
+# --- 단계 계측 ---
+
+class _Phase:
+    __slots__ = ("name", "started")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        record_phase(self.name, time.perf_counter() - self.started)
+        return False
+
+
+class _NoopPhase:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NOOP = _NoopPhase()
+
+
+def phase(name):
+    """with metrics.phase("llm"): ...  (비활성화 상태면 아무것도 하지 않음)"""
+    return _Phase(name) if ENABLED else _NOOP
+
+
+def record_phase(name, seconds):
+    if not ENABLED:
+        return
+    phase_seconds.observe((_route.get(), name), seconds)
+    phases = _phases.get()
+    if phases is not None:
+        phases[name] = phases.get(name, 0.0) + seconds
+
+
+def set_route(route):
+    """요청 밖(백그라운드 작업 등)에서 단계 시간을 어느 이름으로 모을지 지정"""
+    _route.set(route)
+
+
+# --- DB 커서 계측 (db.py 의 커넥션 / asgi_app.py 의 aiomysql 풀에서 사용) ---
+
+class _TimedExecuteMixin:
+    def execute(self, query, args=None):
+        started = time.perf_counter()
+        try:
+            return super().execute(query, args)
+        finally:
+            record_phase("query", time.perf_counter() - started)
+
+
+class _TimedAsyncExecuteMixin:
+    async def execute(self, query, args=None):
+        started = time.perf_counter()
+        try:
+            return await super().execute(query, args)
+        finally:
+            record_phase("query", time.perf_counter() - started)
+
+
+_timed_cursor_classes = {}
+
+
+def timed_cursor_class(cursor_class):
+    """
+    cursor_class 의 execute 시간을 query 단계로 기록하는 하위 클래스 (executemany 도 execute 를 거침).
+    pymysql 커서와 aiomysql 커서(async execute) 모두 사용 가능
+    """
+    if not ENABLED:
+        return cursor_class
+    timed = _timed_cursor_classes.get(cursor_class)
+    if timed is None:
+        mixin = _TimedAsyncExecuteMixin if iscoroutinefunction(cursor_class.execute) else _TimedExecuteMixin
+        timed = type(f"Timed{cursor_class.__name__}", (mixin, cursor_class), {})
+        _timed_cursor_classes[cursor_class] = timed
+    return timed
+
+
+# --- Flask / Quart 연동 ---
+
+def instrument_json(app):
+    """app.json.dumps 시간을 serialize 단계로 기록 (jsonify, 스트리밍 조각, 렌더링 캐시 모두 포함)"""
+    provider_class = type(app.json)
+
+    class TimedJSONProvider(provider_class):
+        def dumps(self, obj, **kwargs):
+            started = time.perf_counter()
+            try:
+                return super().dumps(obj, **kwargs)
+            finally:
+                record_phase("serialize", time.perf_counter() - started)
+
+    app.json = TimedJSONProvider(app)
+
+
+def start_request(route):
+    _route.set(route)
+    _phases.set({})
+    return time.perf_counter()
+
+
+def finish_request(route, method, status, started):
+    elapsed = time.perf_counter() - started
+    request_seconds.observe((route, method, str(status)), elapsed)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(
+            "request",
+            extra={"fields": {
+                "route": route,
+                "method": method,
+                "status": status,
+                "duration_ms": round(elapsed * 1000, 2),
+                "phases_ms": {name: round(value * 1000, 2) for name, value in (_phases.get() or {}).items()},
+            }},
+        )
+
+
+def init_app(app):
+    """Flask 앱에 요청 계측 훅과 /metrics 라우트를 등록"""
+    from flask import g, request
+
+    @app.route("/metrics", methods=["GET"])
+    def metrics_endpoint():
+        return app.response_class(expose(), mimetype="text/plain; version=0.0.4")
+
+    if not ENABLED:
+        return
+
+    instrument_json(app)
+
+    @app.before_request
+    def _start():
+        route = request.url_rule.rule if request.url_rule is not None else "unmatched"
+        g.metrics_started = start_request(route)
+
+    @app.after_request
+    def _finish(response):
+        started = g.get("metrics_started")
+        if started is not None:
+            finish_request(_route.get(), request.method, response.status_code, started)
+        return response
+
+
+def init_quart_app(app):
+    """Quart (asgi_app.py) 용 init_app"""
+    from quart import g, request
+
+    @app.route("/metrics", methods=["GET"])
+    async def metrics_endpoint():
+        return app.response_class(expose(), mimetype="text/plain; version=0.0.4")
+
+    if not ENABLED:
+        return
+
+    instrument_json(app)
+
+    @app.before_request
+    async def _start():
+        route = request.url_rule.rule if request.url_rule is not None else "unmatched"
+        g.metrics_started = start_request(route)
+
+    @app.after_request
+    async def _finish(response):
+        started = g.get("metrics_started")
+        if started is not None:
+            finish_request(_route.get(), request.method, response.status_code, started)
+        return response
+
+
+# --- 노출 ---
+
+def expose():
+    if not ENABLED:
+        return "# metrics disabled (METRICS_ENABLED=0)\n"
+    lines = request_seconds.expose() + phase_seconds.expose()
+    for name, stats in sorted(_collectors.items()):
+        try:
+            values = stats()
+        except Exception as e:
+            logging.getLogger(__name__).warning("metrics collector %s failed: %s", name, e)
+            continue
+        for key, value in sorted(values.items()):
+            if isinstance(value, bool):
+                value = int(value)
+            if not isinstance(value, (int, float)):
+                continue
+            metric = f"{PREFIX}_{name}_{key}"
+            lines.append(f"# TYPE {metric} gauge")
+            lines.append(f"{metric} {value}")
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,20 @@
+-- 001_food_index_seq.sql
+-- FOOD_INDEX 를 (ID, DATE) 별 카운터 행으로 할당하기 위한 테이블 (food_store.allocate_food_indexes)
+-- LAST_INDEX 는 해당 날짜에 마지막으로 할당된 FOOD_INDEX 이다.
+
+-- 컬럼 타입은 FOOD 와 같게, 기존 데이터의 최댓값으로 초기화
+CREATE TABLE FOOD_INDEX_SEQ AS
+SELECT ID, DATE, MAX(FOOD_INDEX) AS LAST_INDEX
+FROM FOOD
+WHERE FOOD_INDEX IS NOT NULL
+GROUP BY ID, DATE;
+
+ALTER TABLE FOOD_INDEX_SEQ
+    MODIFY LAST_INDEX INT NOT NULL,
+    ADD PRIMARY KEY (ID, DATE);
+
+-- 같은 날짜에 같은 FOOD_INDEX 가 두 번 들어가지 않도록 보장
+-- (이미 중복된 행이 있으면 실패하므로 먼저 아래 쿼리로 확인)
+--   SELECT ID, DATE, FOOD_INDEX, COUNT(*) FROM FOOD
+--   GROUP BY ID, DATE, FOOD_INDEX HAVING COUNT(*) > 1;
+ALTER TABLE FOOD ADD UNIQUE KEY UQ_FOOD_ID_DATE_INDEX (ID, DATE, FOOD_INDEX);
@@ -0,0 +1,32 @@
+-- 002_food_date_range_index.sql
+-- 월별 조회(WHERE ID = ? AND DATE >= ? AND DATE < ?)가 인덱스 범위 스캔을 하도록
+-- FOOD (ID, DATE, FOOD_INDEX) 와 USER_NT (ID, DATE) 인덱스를 추가한다.
+-- 001 의 UQ_FOOD_ID_DATE_INDEX 가 이미 같은 컬럼 구성이면 FOOD 쪽은 건너뛴다.
+
+SET @has_food_index := (
+    SELECT COUNT(*) FROM information_schema.statistics
+    WHERE table_schema = DATABASE() AND table_name = 'FOOD'
+      AND index_name IN ('UQ_FOOD_ID_DATE_INDEX', 'IX_FOOD_ID_DATE_INDEX')
+);
+SET @ddl := IF(
+    @has_food_index = 0,
+    'CREATE INDEX IX_FOOD_ID_DATE_INDEX ON FOOD (ID, DATE, FOOD_INDEX)',
+    'DO 0'
+);
+PREPARE stmt FROM @ddl;
+EXECUTE stmt;
+DEALLOCATE PREPARE stmt;
+
+SET @has_user_nt_index := (
+    SELECT COUNT(*) FROM information_schema.statistics
+    WHERE table_schema = DATABASE() AND table_name = 'USER_NT'
+      AND index_name = 'IX_USER_NT_ID_DATE'
+);
+SET @ddl := IF(
+    @has_user_nt_index = 0,
+    'CREATE INDEX IX_USER_NT_ID_DATE ON USER_NT (ID, DATE)',
+    'DO 0'
+);
+PREPARE stmt FROM @ddl;
+EXECUTE stmt;
+DEALLOCATE PREPARE stmt;
@@ -0,0 +1,21 @@
+-- 003_user_nt_daily_key.sql
+-- USER_NT 를 (ID, DATE) 당 한 행으로 유지하기 위한 유일 키.
+-- food_store.apply_daily_delta 의 INSERT ... ON DUPLICATE KEY UPDATE 가 이 키에 의존한다.
+-- (이미 중복된 행이 있으면 실패하므로 먼저 아래 쿼리로 확인)
+--   SELECT ID, DATE, COUNT(*) FROM USER_NT GROUP BY ID, DATE HAVING COUNT(*) > 1;
+
+ALTER TABLE USER_NT ADD UNIQUE KEY UQ_USER_NT_ID_DATE (ID, DATE);
+
+-- 002 에서 만든 (ID, DATE) 일반 인덱스는 위 유일 키와 겹치므로 제거
+SET @has_user_nt_index := (
+    SELECT COUNT(*) FROM information_schema.statistics
+    WHERE table_schema = DATABASE() AND table_name = 'USER_NT'
+      AND index_name = 'IX_USER_NT_ID_DATE'
+);
+SET @ddl := IF(@has_user_nt_index > 0, 'DROP INDEX IX_USER_NT_ID_DATE ON USER_NT', 'DO 0');
+PREPARE stmt FROM @ddl;
+EXECUTE stmt;
+DEALLOCATE PREPARE stmt;
+
+-- 기존 합계를 FOOD 기준으로 맞추려면:
+--   python food_store.py rebuild 2000-01-01 2100-01-01
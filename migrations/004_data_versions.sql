@@ -0,0 +1,17 @@
+-- 004_data_versions.sql
+-- 조회 API 의 ETag / 응답 캐시용 데이터 버전 (http_cache.py)
+--   USER_MONTH_VERSION: (ID, 월) 별 FOOD/USER_NT 버전. food_store 의 쓰기 함수가 같은 트랜잭션에서 올린다.
+--   USER.PROFILE_VERSION: 사용자 정보 버전 (/api/calendar 응답에 체중, 키가 포함됨)
+
+-- ID 컬럼 타입은 FOOD 와 같게
+CREATE TABLE USER_MONTH_VERSION AS
+SELECT ID, DATE AS MONTH, 0 AS VERSION
+FROM FOOD
+WHERE 1 = 0;
+
+ALTER TABLE USER_MONTH_VERSION
+    MODIFY MONTH DATE NOT NULL,
+    MODIFY VERSION BIGINT NOT NULL DEFAULT 0,
+    ADD PRIMARY KEY (ID, MONTH);
+
+ALTER TABLE USER ADD COLUMN PROFILE_VERSION INT NOT NULL DEFAULT 0;
@@ -0,0 +1,22 @@
+-- 005_food_numeric_nutrition.sql
+-- FOOD 영양 컬럼을 문자열에서 DECIMAL 로 (칼로리는 kcal, 나머지는 g).
+-- 새로 쓰는 값은 food_store 가 nutrition.normalize 로 숫자로 바꿔 넣는다.
+--
+-- 순서:
+--   1) python food_store.py normalize
+--      기존 값 ("1400kcal", "50 g", "약 12" ...) 을 숫자 문자열로 바꿈. 숫자가 없는 값은 NULL.
+--      앱이 도는 중에 실행해도 됨 (배치마다 commit, 새로 들어오는 행은 이미 숫자)
+--   2) 이 파일 실행 (남은 숫자 문자열은 MySQL 이 DECIMAL 로 변환)
+--   3) python food_store.py rebuild 2000-01-01 2100-01-01
+--      USER_NT 합계를 FOOD 의 SUM 으로 다시 맞춤 (예전에는 해석할 수 없던 값이 0 으로 더해졌음)
+--
+-- 1) 을 건너뛰었는지 확인: 아래 쿼리가 0 이어야 함
+--   SELECT COUNT(*) FROM FOOD
+--   WHERE CONCAT(FOOD_CH, FOOD_PT, FOOD_FAT, FOOD_KCAL) REGEXP '[^0-9.]';
+
+ALTER TABLE FOOD
+    MODIFY FOOD_CH DECIMAL(8, 2) NULL,
+    MODIFY FOOD_PT DECIMAL(8, 2) NULL,
+    MODIFY FOOD_FAT DECIMAL(8, 2) NULL,
+    MODIFY FOOD_KCAL DECIMAL(8, 2) NULL;
+
@@ -0,0 +1,224 @@
+# month_cache.py
+# (사용자, 연, 월) 단위로 계산해 둔 월별 집계 캐시
+#   1단계: 프로세스 내 LRU
+#   2단계: Redis (REDIS_URL 이 있을 때만, 여러 프로세스/서버가 공유)
+#
+# 지난달 이전(마감된 달)은 거의 바뀌지 않으므로 오래 보관하고, 이번 달은 짧게 보관한다.
+# 쓰기 API 는 커밋 후 invalidate_month() 로 해당 (사용자, 월) 키만 지운다.
+# 항목에는 데이터 버전(USER_MONTH_VERSION)도 함께 저장해서, 다른 프로세스에서 쓰기가 일어나
+# 이 프로세스의 LRU 가 지워지지 않았더라도 버전이 다르면 사용하지 않는다 (get).
+#
+# 마감된 달은 조회할 때마다 버전을 읽지 않고, LRU 항목과 그 버전을 그대로 믿는다 (lookup).
+# 마지막으로 버전을 확인한 뒤 closed_trust 초 (MONTH_CACHE_CLOSED_TRUST, 기본 300) 가 지나면 다시 확인하므로
+# 다른 프로세스가 마감된 달에 쓴 내용은 이 프로세스에서 최대 그만큼 늦게 보인다 (같은 프로세스의 쓰기는 바로 지워짐).
+# 이번 달은 항상 버전을 확인한다.
+
+from collections import OrderedDict
+from datetime import date
+from dotenv import load_dotenv
+import json
+import logging
+import os
+import re
+import threading
+import time
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# 캐시하는 값의 종류 (invalidate 는 모든 종류를 지움)
+FOODS_BY_DAY = "foods_by_day"  # /api/monthly 응답 (group_foods_by_day)
+MONTHLY_DATA = "monthly_data"  # build_monthly_data 결과 (/api/food/quarterly 의 각 월)
+KINDS = (FOODS_BY_DAY, MONTHLY_DATA)
+
+
+def month_of(value):
+    """date/datetime 또는 "YYYY-MM-DD" 문자열 -> (year, month). 해석할 수 없으면 None"""
+    if hasattr(value, "year") and hasattr(value, "month"):
+        return value.year, value.month
+    match = re.match(r"\s*(\d{4})-(\d{1,2})", str(value))
+    if not match:
+        return None
+    return int(match.group(1)), int(match.group(2))
+
+
+class MonthCache:
+    def __init__(self, capacity=1024, open_ttl=60, closed_ttl=7 * 24 * 3600, closed_trust=300,
+                 redis_client=None, prefix="dietback:month", dumps=json.dumps):
+        self.capacity = capacity
+        self.open_ttl = open_ttl
+        self.closed_ttl = closed_ttl
+        self.closed_trust = closed_trust  # 마감된 달의 LRU 항목을 버전 확인 없이 쓰는 시간
+        self.prefix = prefix
+        self.dumps = dumps  # Redis 에 저장할 때 쓰는 직렬화 (Decimal/날짜 처리를 jsonify 와 같게)
+        self._redis = redis_client
+
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> (만료 시각, 버전을 확인한 시각, 버전, 값)
+
+        # counters
+        self.memory_hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+        self.trusted = 0  # lookup 으로 버전을 읽지 않고 쓴 횟수
+        self.stale = 0
+        self.invalidations = 0
+        self.redis_errors = 0
+
+    def _key(self, kind, user_id, year, month):
+        return f"{self.prefix}:{kind}:{user_id}:{year:04d}-{month:02d}"
+
+    def closed(self, year, month):
+        """지난달 이전 (마감된 달) 이면 True"""
+        today = date.today()
+        return (year, month) < (today.year, today.month)
+
+    def ttl(self, year, month):
+        return self.closed_ttl if self.closed(year, month) else self.open_ttl
+
+    # --- 1단계: LRU ---
+
+    def _memory_get(self, key, version, now):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, _, entry_version, value = entry
+            if now >= expires_at or entry_version != version:
+                del self._entries[key]
+                self.stale += 1
+                return None
+            self._entries[key] = (expires_at, now, entry_version, value)
+            self._entries.move_to_end(key)
+            return value
+
+    def _memory_set(self, key, version, value, expires_at):
+        with self._lock:
+            self._entries[key] = (expires_at, time.time(), version, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.capacity:
+                self._entries.popitem(last=False)
+
+    # --- 2단계: Redis (오류가 나면 LRU 만으로 동작) ---
+
+    def _redis_call(self, method, *args, **kwargs):
+        if self._redis is None:
+            return None
+        try:
+            return getattr(self._redis, method)(*args, **kwargs)
+        except Exception as e:
+            self.redis_errors += 1
+            logger.warning("Month cache redis %s failed: %s", method, e)
+            return None
+
+    # --- public ---
+
+    def get(self, kind, user_id, year, month, version):
+        key = self._key(kind, user_id, year, month)
+        now = time.time()
+
+        value = self._memory_get(key, version, now)
+        if value is not None:
+            self.memory_hits += 1
+            return value
+
+        raw = self._redis_call("get", key)
+        if raw is not None:
+            entry = json.loads(raw)
+            if entry["version"] == version:
+                value = entry["value"]
+                self._memory_set(key, version, value, now + self.ttl(year, month))
+                self.redis_hits += 1
+                return value
+            self.stale += 1
+
+        self.misses += 1
+        return None
+
+    def lookup(self, kind, user_id, year, month):
+        """
+        마감된 달의 LRU 항목을 버전 확인 없이 (버전, 값) 으로 반환 (응답 ETag 에 그 버전을 씀).
+        이번 달이거나, 항목이 없거나, 버전을 확인한 지 closed_trust 초가 지났으면 None
+        -> 호출한 쪽이 버전을 읽고 get()
+        """
+        if not self.closed(year, month):
+            return None
+        key = self._key(kind, user_id, year, month)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, checked_at, version, value = entry
+            if now >= expires_at or now - checked_at >= self.closed_trust:
+                return None
+            self._entries.move_to_end(key)
+        self.memory_hits += 1
+        self.trusted += 1
+        return version, value
+
+    def set(self, kind, user_id, year, month, version, value):
+        key = self._key(kind, user_id, year, month)
+        ttl = self.ttl(year, month)
+        self._memory_set(key, version, value, time.time() + ttl)
+        if self._redis is not None:
+            self._redis_call("set", key, self.dumps({"version": version, "value": value}), ex=ttl)
+
+    def invalidate(self, user_id, year, month):
+        keys = [self._key(kind, user_id, year, month) for kind in KINDS]
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+        self._redis_call("delete", *keys)
+        self.invalidations += 1
+
+    def stats(self):
+        with self._lock:
+            size = len(self._entries)
+        return {
+            "memory_size": size,
+            "redis": self._redis is not None,
+            "memory_hits": self.memory_hits,
+            "redis_hits": self.redis_hits,
+            "misses": self.misses,
+            "trusted": self.trusted,
+            "stale": self.stale,
+            "invalidations": self.invalidations,
+            "redis_errors": self.redis_errors,
+        }
+
+
+def create_month_cache(dumps=json.dumps):
+    """환경변수 설정으로 캐시를 만든다. REDIS_URL 이 없으면 LRU 만 사용."""
+    redis_client = None
+    redis_url = os.getenv("REDIS_URL")
+    if redis_url:
+        import redis  # REDIS_URL 을 쓸 때만 필요
+
+        redis_client = redis.Redis.from_url(
+            redis_url, socket_timeout=float(os.getenv("REDIS_TIMEOUT", "0.2"))
+        )
+    return MonthCache(
+        capacity=int(os.getenv("MONTH_CACHE_SIZE", "1024")),
+        open_ttl=int(os.getenv("MONTH_CACHE_OPEN_TTL", "60")),
+        closed_ttl=int(os.getenv("MONTH_CACHE_CLOSED_TTL", str(7 * 24 * 3600))),
+        closed_trust=int(os.getenv("MONTH_CACHE_CLOSED_TRUST", "300")),
+        redis_client=redis_client,
+        dumps=dumps,
+    )
+
+
+# 모든 앱 (app.py, asgi_app.py) 과 작업 큐가 함께 쓰는 캐시.
+# 앱을 만드는 쪽이 dumps 를 자기 JSON provider 로 바꿔서, Redis 에 저장할 때도 jsonify 와 같은 직렬화를 쓰게 한다
+month_cache = create_month_cache()
+
+
+def invalidate_month(user_id, day):
+    """쓰기를 커밋한 뒤 호출: day 가 속한 (user_id, 월) 의 캐시된 집계만 지움"""
+    month = month_of(day)
+    if month is None:
+        # 버전이 함께 저장되어 있으므로 지우지 못해도 오래된 값이 쓰이지는 않음
+        logger.warning("Cannot invalidate month cache for date %r", day)
+        return
+    month_cache.invalidate(user_id, *month)
@@ -1,75 +1,48 @@
 # monthly.py
 
-from flask import Flask, request, jsonify
-import pymysql
-import os
+from flask import Blueprint, request, jsonify
+from datetime import date
 from dotenv import load_dotenv
+import db
+from food_store import group_foods_by_day
 
 load_dotenv()
 
-app = Flask(__name__)
+# app.create_app() 에서 등록
+food_monthly_api = Blueprint("food_monthly", __name__)
 
-# DB Connection
-db_config = {
-    'host': os.getenv('DB_HOST'),
-    'user': os.getenv('DB_USER'),
-    'password': os.getenv('DB_PASSWORD'),
-    'database': os.getenv('DB_NAME')
-}
 
-@app.route('/api/food/monthly', methods=['GET'])
+@food_monthly_api.route('/api/food/monthly', methods=['GET'])
 def get_monthly_food():
     year = request.args.get('year')
     month = request.args.get('month')
-    
+
     if not year or not month:
         return jsonify({"error": "Year and month are required"}), 400
 
-    connection = pymysql.connect(**db_config)
     try:
+        start = date(int(year), int(month), 1)
+    except ValueError:
+        return jsonify({"error": "Invalid year or month"}), 400
+    end = date(start.year + 1, 1, 1) if start.month == 12 else date(start.year, start.month + 1, 1)
+
+    with db.connection() as connection:
         with connection.cursor() as cursor:
+            # YEAR(DATE)/MONTH(DATE) 대신 반열림 구간으로 조회해야 DATE 인덱스를 탈 수 있음
             sql = """
                 SELECT DATE, FOOD_INDEX, FOOD_NAME, FOOD_PT, FOOD_FAT, FOOD_CH, FOOD_KCAL
                 FROM FOOD
-                WHERE YEAR(DATE) = %s AND MONTH(DATE) = %s
+                WHERE DATE >= %s AND DATE < %s
                 ORDER BY DATE
             """
-            cursor.execute(sql, (year, month))
+            cursor.execute(sql, (start, end))
             results = cursor.fetchall()
-            monthly_data = {}
-
-            for row in results:
-                day = row[0].day
-                food_info = {
-                    "food_index": row[1],
-                    "food_name": row[2],
-                    "protein": row[3],
-                    "fat": row[4],
-                    "carbohydrates": row[5],
-                    "calories": row[6]
-                }
-
-                # Ensuring the output order
-                food_info_ordered = {
-                    "food_index": food_info["food_index"],
-                    "food_name": food_info["food_name"],
-                    "protein": food_info["protein"],
-                    "fat": food_info["fat"],
-                    "carbohydrates": food_info["carbohydrates"],
-                    "calories": food_info["calories"]
-                }
 
-                if day not in monthly_data:
-                    monthly_data[day] = []
+    # /api/monthly 와 같은 31일짜리 리스트
+    return jsonify(group_foods_by_day(results))
 
-                monthly_data[day].append(food_info_ordered)
-
-            # Create a list of 31 days, each day is a list of food items (which may be empty)
-            grouped_data = [monthly_data.get(day, []) for day in range(1, 32)]
-
-            return jsonify(grouped_data)
-    finally:
-        connection.close()
 
 if __name__ == '__main__':
-    app.run(host='0.0.0.0', port=5001)  # 다른 포트로 실행하여 send.py와 충돌 방지
\ No newline at end of file
+    from app import create_app
+
+    create_app().run(host='0.0.0.0', port=5001)
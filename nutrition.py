@@ -0,0 +1,92 @@
+# nutrition.py
+# 영양 정보 값을 저장하기 전에 한 번만 숫자로 정규화
+#   LLM / 캐시 / 클라이언트가 주는 "1,400kcal", "50 g", "약 12", "10~12g", "500mg", "2000kJ" 같은 값을
+#   칼로리는 kcal, 탄수화물/단백질/지방은 g 단위의 float (소수 둘째 자리) 로 바꾼다.
+# FOOD 의 영양 컬럼은 DECIMAL(8,2) 이고 (migrations/005_food_numeric_nutrition.sql) 합계와 백분율은
+# 저장된 숫자로 계산하므로, 읽을 때 문자열을 다시 해석하지 않는다.
+#
+# 사용 예:
+#   python nutrition.py "약 1,400kcal" "10~12 g" "500mg"
+
+import math
+import re
+import sys
+import unicodedata
+
+ENERGY = "energy"
+MASS = "mass"
+
+# 값 키 -> 단위 종류 (NutritionInfo 의 필드)
+FIELDS = {
+    "calorie": ENERGY,
+    "carbohydrate": MASS,
+    "protein": MASS,
+    "fat": MASS,
+}
+
+# 기준 단위 (kcal, g) 로 바꾸는 배수. 종류가 다른 단위가 붙어 있으면 숫자만 사용
+UNITS = {
+    ENERGY: {"kcal": 1.0, "cal": 1.0, "킬로칼로리": 1.0, "칼로리": 1.0, "kj": 1 / 4.184},
+    MASS: {"g": 1.0, "그램": 1.0, "mg": 0.001, "밀리그램": 0.001, "kg": 1000.0},
+}
+
+_unit = "|".join(sorted({unit for units in UNITS.values() for unit in units}, key=len, reverse=True))
+# "12", "12.5", "10~12", "10-12" 뒤에 선택적으로 단위 (앞의 "-" 는 음수 표시로 따로 잡음)
+AMOUNT_PATTERN = re.compile(
+    r"(-\s*)?(\d+(?:\.\d+)?)(?:\s*(?:~|-|to)\s*(\d+(?:\.\d+)?))?\s*(" + _unit + r")?(?![a-z])"
+)
+
+PRECISION = 2
+
+
+def parse_amount(value, kind=MASS):
+    """
+    값 하나를 기준 단위의 float 로. 숫자가 없거나 음수면 None
+    예) "1,400kcal" -> 1400.0, "약 12" -> 12.0, "10~12g" -> 11.0, "500mg" -> 0.5, "-5g" -> None
+    """
+    if value is None or isinstance(value, bool):
+        return None
+    if not isinstance(value, str):
+        # int, float, DB 에서 읽은 Decimal
+        number = float(value)
+        return round(number, PRECISION) if math.isfinite(number) and number >= 0 else None
+
+    text = unicodedata.normalize("NFKC", str(value)).lower()
+    text = re.sub(r"(?<=\d),(?=\d{3})", "", text)
+    match = AMOUNT_PATTERN.search(text)
+    if match is None:
+        return None
+    negative, low, high, unit = match.groups()
+    if negative:
+        return None
+    amount = float(low) if high is None else (float(low) + float(high)) / 2
+    return round(amount * UNITS[kind].get(unit, 1.0), PRECISION)
+
+
+def normalize(nutrition_info):
+    """NutritionInfo dict 의 값들을 숫자로 바꾼 새 dict (이미 숫자면 그대로). 다른 키는 유지"""
+    if not isinstance(nutrition_info, dict):
+        return nutrition_info  # 파서가 이상한 값을 돌려준 경우: 캐시/저장 단계에서 걸러짐
+    normalized = dict(nutrition_info)
+    if "food_name" in normalized and normalized["food_name"] is not None:
+        normalized["food_name"] = str(normalized["food_name"]).strip()
+    for key, kind in FIELDS.items():
+        if key in normalized:
+            normalized[key] = parse_amount(normalized[key], kind)
+    return normalized
+
+
+def number(value):
+    """응답용: DB 에서 읽은 값 (DECIMAL) -> JSON 숫자로 나가는 float. 비어 있으면 None"""
+    return parse_amount(value)
+
+
+def amount(value):
+    """합계 계산용: 저장된 값 (DECIMAL, float, 또는 마이그레이션 전의 문자열) -> float, 비어 있으면 0"""
+    parsed = parse_amount(value)
+    return 0.0 if parsed is None else parsed
+
+
+if __name__ == "__main__":
+    for arg in sys.argv[1:]:
+        print(f"{arg!r}: energy={parse_amount(arg, ENERGY)} mass={parse_amount(arg, MASS)}")
@@ -0,0 +1,276 @@
+# nutrition_cache.py
+# 음식 입력 문자열 -> LLM 영양정보 결과 캐시
+#   1단계: 프로세스 내 LRU (OrderedDict)
+#   2단계: 로컬 SQLite 파일 (프로세스/재시작 간 공유)
+
+from collections import OrderedDict
+from dotenv import load_dotenv
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+
+load_dotenv()
+
+REQUIRED_KEYS = ("food_name", "calorie", "carbohydrate", "protein", "fat")
+
+
+def normalize_food_text(text):
+    """
+    캐시 키용 정규화: 유니코드 NFKC, 앞뒤 공백 제거, 연속 공백을 하나로, 소문자화
+    예) "  돈까스   2개 " -> "돈까스 2개"
+    """
+    text = unicodedata.normalize("NFKC", str(text))
+    text = re.sub(r"\s+", " ", text).strip()
+    return text.lower()
+
+
+def cache_key(namespace, text):
+    normalized = normalize_food_text(text)
+    return hashlib.sha256(f"{namespace}\0{normalized}".encode("utf-8")).hexdigest()
+
+
+class NutritionCache:
+    """
+    정규화한 입력 문자열의 해시(content address)를 키로 쓰는 2단 캐시.
+
+    namespace 는 프롬프트별로 결과가 다르므로 구분하기 위한 값이다 (app.py / llm.py).
+    ttl 이 지난 항목은 읽을 때 버리고, 용량을 넘으면 가장 오래 쓰이지 않은 항목부터 지운다.
+    """
+
+    def __init__(self, namespace, capacity=1024, ttl=30 * 24 * 3600,
+                 path=None, persistent_capacity=100000):
+        self.namespace = namespace
+        self.capacity = capacity
+        self.ttl = ttl
+        self.persistent_capacity = persistent_capacity
+
+        self._lock = threading.Lock()
+        self._memory = OrderedDict()  # key -> (저장 시각, value)
+
+        self.path = path
+        self._db = None
+        self._db_lock = threading.Lock()
+        self._writes_since_prune = 0
+        self._open()
+
+        # counters
+        self.memory_hits = 0
+        self.persistent_hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evictions = 0
+
+    def _open(self):
+        self._owner = f"{os.getpid()}-{id(self)}"
+        if self.path:
+            self._db = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                """
+                CREATE TABLE IF NOT EXISTS nutrition_cache (
+                    key TEXT PRIMARY KEY,
+                    namespace TEXT NOT NULL,
+                    text TEXT NOT NULL,
+                    value TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                )
+                """
+            )
+            self._db.execute(
+                "CREATE INDEX IF NOT EXISTS nutrition_cache_accessed ON nutrition_cache (accessed_at)"
+            )
+            # 프로세스 간 중복 LLM 호출 방지용 임대(lease) 테이블 (singleflight.py)
+            self._db.execute(
+                """
+                CREATE TABLE IF NOT EXISTS nutrition_inflight (
+                    key TEXT PRIMARY KEY,
+                    owner TEXT NOT NULL,
+                    expires_at REAL NOT NULL
+                )
+                """
+            )
+
+    def after_fork(self):
+        """
+        fork 된 자식 프로세스에서 호출 (gunicorn preload 모드의 post_fork).
+        SQLite 커넥션은 fork 를 넘어 공유하면 안 되므로 새로 열고, lease owner 도 자식 pid 로 바꾼다.
+        """
+        with self._db_lock:
+            self._open()
+
+    # --- 1단계: 메모리 LRU ---
+
+    def _memory_get(self, key, now):
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is None:
+                return None
+            stored_at, value = entry
+            if now - stored_at > self.ttl:
+                del self._memory[key]
+                self.expired += 1
+                return None
+            self._memory.move_to_end(key)
+            return value
+
+    def _memory_set(self, key, value, stored_at):
+        with self._lock:
+            self._memory[key] = (stored_at, value)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.capacity:
+                self._memory.popitem(last=False)
+                self.evictions += 1
+
+    # --- 2단계: SQLite ---
+
+    def _persistent_get(self, key, now):
+        if self._db is None:
+            return None
+        with self._db_lock:
+            row = self._db.execute(
+                "SELECT value, created_at FROM nutrition_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            value, created_at = row
+            if now - created_at > self.ttl:
+                self._db.execute("DELETE FROM nutrition_cache WHERE key = ?", (key,))
+                self.expired += 1
+                return None
+            self._db.execute(
+                "UPDATE nutrition_cache SET accessed_at = ? WHERE key = ?", (now, key)
+            )
+        return json.loads(value), created_at
+
+    def _persistent_set(self, key, text, value, now):
+        if self._db is None:
+            return
+        with self._db_lock:
+            self._db.execute(
+                """
+                INSERT OR REPLACE INTO nutrition_cache
+                    (key, namespace, text, value, created_at, accessed_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+                """,
+                (key, self.namespace, normalize_food_text(text),
+                 json.dumps(value, ensure_ascii=False), now, now),
+            )
+            self._writes_since_prune += 1
+            if self._writes_since_prune >= 100:
+                self._writes_since_prune = 0
+                self._prune(now)
+
+    def _prune(self, now):
+        """만료된 행과 용량을 넘는 오래된 행을 정리 (_db_lock 안에서 호출)"""
+        self._db.execute("DELETE FROM nutrition_cache WHERE created_at < ?", (now - self.ttl,))
+        (count,) = self._db.execute("SELECT COUNT(*) FROM nutrition_cache").fetchone()
+        overflow = count - self.persistent_capacity
+        if overflow > 0:
+            self._db.execute(
+                """
+                DELETE FROM nutrition_cache WHERE key IN (
+                    SELECT key FROM nutrition_cache ORDER BY accessed_at LIMIT ?
+                )
+                """,
+                (overflow,),
+            )
+            self.evictions += overflow
+
+    # --- public ---
+
+    def get(self, text, record=True):
+        """record=False 면 hit/miss 카운터를 건드리지 않음 (다른 프로세스 결과를 기다리며 폴링할 때)"""
+        key = cache_key(self.namespace, text)
+        now = time.time()
+
+        value = self._memory_get(key, now)
+        if value is not None:
+            if record:
+                self.memory_hits += 1
+            return dict(value)
+
+        found = self._persistent_get(key, now)
+        if found is not None:
+            value, created_at = found
+            self._memory_set(key, value, created_at)
+            if record:
+                self.persistent_hits += 1
+            return dict(value)
+
+        if record:
+            self.misses += 1
+        return None
+
+    def set(self, text, value):
+        # 필수 필드가 빠진 (파싱이 덜 된) 결과는 저장하지 않음
+        if not isinstance(value, dict) or any(k not in value for k in REQUIRED_KEYS):
+            return
+        key = cache_key(self.namespace, text)
+        now = time.time()
+        value = dict(value)
+        self._memory_set(key, value, now)
+        self._persistent_set(key, text, value, now)
+
+    # --- 프로세스 간 lease (영속 계층이 없으면 항상 획득 성공) ---
+
+    def acquire_lease(self, text, ttl):
+        """같은 음식에 대해 한 프로세스만 LLM 을 호출하도록 lease 를 잡는다. 성공하면 True"""
+        if self._db is None:
+            return True
+        key = cache_key(self.namespace, text)
+        now = time.time()
+        with self._db_lock:
+            self._db.execute(
+                "DELETE FROM nutrition_inflight WHERE key = ? AND expires_at < ?", (key, now)
+            )
+            cursor = self._db.execute(
+                "INSERT OR IGNORE INTO nutrition_inflight (key, owner, expires_at) VALUES (?, ?, ?)",
+                (key, self._owner, now + ttl),
+            )
+            return cursor.rowcount == 1
+
+    def release_lease(self, text):
+        if self._db is None:
+            return
+        key = cache_key(self.namespace, text)
+        with self._db_lock:
+            self._db.execute(
+                "DELETE FROM nutrition_inflight WHERE key = ? AND owner = ?", (key, self._owner)
+            )
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+        if self._db is not None:
+            with self._db_lock:
+                self._db.execute("DELETE FROM nutrition_cache WHERE namespace = ?", (self.namespace,))
+
+    def stats(self):
+        with self._lock:
+            memory_size = len(self._memory)
+        return {
+            "namespace": self.namespace,
+            "memory_size": memory_size,
+            "memory_hits": self.memory_hits,
+            "persistent_hits": self.persistent_hits,
+            "misses": self.misses,
+            "expired": self.expired,
+            "evictions": self.evictions,
+        }
+
+
+def create_cache(namespace):
+    """환경변수 설정으로 캐시를 만든다. NUTRITION_CACHE_PATH 를 빈 값으로 두면 메모리 캐시만 사용."""
+    return NutritionCache(
+        namespace,
+        capacity=int(os.getenv("NUTRITION_CACHE_SIZE", "1024")),
+        ttl=int(os.getenv("NUTRITION_CACHE_TTL", str(30 * 24 * 3600))),
+        path=os.getenv("NUTRITION_CACHE_PATH", "nutrition_cache.sqlite3") or None,
+        persistent_capacity=int(os.getenv("NUTRITION_CACHE_MAX_ROWS", "100000")),
+    )
@@ -0,0 +1,199 @@
+# singleflight.py
+# 같은 음식 문자열에 대한 동시 LLM 호출을 하나로 합치는 계층
+#   - 프로세스 내: 먼저 온 요청(leader)만 모델을 호출하고, 나머지(follower)는 그 결과를 기다림
+#   - 프로세스 간 (gunicorn 등 worker pool): NutritionCache 의 SQLite lease 로 한 프로세스만 호출하고,
+#     다른 프로세스는 결과가 캐시에 들어올 때까지 폴링
+# follower 와 폴링도 요청의 마감 시각 (hedge.deadline) 까지만 기다리고, 넘으면 hedge.DeadlineExceeded
+
+import asyncio
+import os
+import threading
+import time
+
+import hedge
+from nutrition_cache import normalize_food_text
+
+
+class _Call:
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class _FlightStats:
+    def __init__(self, cache=None, lease_ttl=60.0, poll_interval=0.05):
+        self.cache = cache  # lease 와 결과 공유에 쓰는 NutritionCache (None 이면 프로세스 내에서만 합침)
+        self.lease_ttl = lease_ttl
+        self.poll_interval = poll_interval
+        self._stats_lock = threading.Lock()
+
+        # counters
+        self.calls = 0
+        self.leaders = 0
+        self.deduplicated = 0  # 같은 프로세스의 진행 중인 호출에 합류
+        self.cross_process_deduplicated = 0  # 다른 프로세스의 결과를 받아 씀
+        self.deadline_exceeded = 0  # 마감 시각까지 leader / 다른 프로세스의 결과가 오지 않음
+
+    def _count(self, name):
+        with self._stats_lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def _remaining(self, until):
+        """hedge.remaining 과 같지만, 마감을 넘기면 통계에 남김"""
+        try:
+            return hedge.remaining(until)
+        except hedge.DeadlineExceeded:
+            self._count("deadline_exceeded")
+            raise
+
+    def _deadline_exceeded(self):
+        self._count("deadline_exceeded")
+        return hedge.DeadlineExceeded("LLM deadline exceeded while waiting for another call")
+
+    def stats(self):
+        with self._stats_lock:
+            return {
+                "calls": self.calls,
+                "leaders": self.leaders,
+                "deduplicated": self.deduplicated,
+                "cross_process_deduplicated": self.cross_process_deduplicated,
+                "deadline_exceeded": self.deadline_exceeded,
+                "in_flight": self._in_flight(),
+            }
+
+
+class SingleFlight(_FlightStats):
+    """
+    스레드용 single-flight.
+
+    사용 예:
+        flight.do(param, lambda: call_model_and_cache(param))
+        flight.do(param, fn, deadline)  # deadline: time.monotonic 기준 마감 (기본: 현재 요청의 마감)
+
+    fn 은 결과를 cache 에 저장해야 다른 프로세스의 follower 가 받아 갈 수 있다.
+    leader 가 실패하면 기다리던 follower 들도 같은 예외를 받는다.
+    """
+
+    def __init__(self, cache=None, lease_ttl=60.0, poll_interval=0.05):
+        super().__init__(cache, lease_ttl, poll_interval)
+        self._lock = threading.Lock()
+        self._calls = {}  # 정규화한 문자열 -> _Call
+
+    def _in_flight(self):
+        return len(self._calls)
+
+    def do(self, text, fn, deadline=None):
+        key = normalize_food_text(text)
+        until = deadline or hedge.deadline()
+        self._count("calls")
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+
+        if not leader:
+            self._count("deduplicated")
+            if not call.event.wait(self._remaining(until)):
+                raise self._deadline_exceeded()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        self._count("leaders")
+        try:
+            call.result = self._lead(text, fn, until)
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.event.set()
+        return call.result
+
+    def _lead(self, text, fn, until):
+        if self.cache is None:
+            return fn()
+        while not self.cache.acquire_lease(text, self.lease_ttl):
+            # 다른 프로세스가 같은 음식을 분석 중 -> 결과가 캐시에 들어올 때까지 대기
+            # (그 프로세스가 실패하거나 죽으면 lease 가 풀리거나 만료되어 여기서 다시 획득)
+            # lease 가 남아 있어도 마감 시각이 지나면 그만 기다림
+            cached = self.cache.get(text, record=False)
+            if cached is not None:
+                self._count("cross_process_deduplicated")
+                return cached
+            time.sleep(min(self.poll_interval, self._remaining(until)))
+        try:
+            # lease 를 잡기 직전에 다른 프로세스가 끝냈을 수 있음
+            cached = self.cache.get(text, record=False)
+            if cached is not None:
+                self._count("cross_process_deduplicated")
+                return cached
+            return fn()
+        finally:
+            self.cache.release_lease(text)
+
+
+class AsyncSingleFlight(_FlightStats):
+    """asyncio 용 single-flight (asgi_app.py). coro_fn 은 코루틴을 만드는 함수."""
+
+    def __init__(self, cache=None, lease_ttl=60.0, poll_interval=0.05):
+        super().__init__(cache, lease_ttl, poll_interval)
+        self._calls = {}  # 정규화한 문자열 -> asyncio.Future
+
+    def _in_flight(self):
+        return len(self._calls)
+
+    async def do(self, text, coro_fn, deadline=None):
+        key = normalize_food_text(text)
+        until = deadline or hedge.deadline()
+        self._count("calls")
+        future = self._calls.get(key)
+        if future is not None:
+            self._count("deduplicated")
+            # follower 가 취소되거나 마감을 넘겨도 leader 의 호출은 계속 진행
+            try:
+                return await asyncio.wait_for(asyncio.shield(future), self._remaining(until))
+            except asyncio.TimeoutError:
+                raise self._deadline_exceeded() from None
+
+        self._count("leaders")
+        future = asyncio.get_running_loop().create_future()
+        self._calls[key] = future
+        try:
+            result = await self._lead(text, coro_fn, until)
+        except BaseException as e:
+            future.set_exception(e)
+            future.exception()  # 기다리는 follower 가 없을 때 경고가 나지 않도록
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            del self._calls[key]
+
+    async def _lead(self, text, coro_fn, until):
+        if self.cache is None:
+            return await coro_fn()
+        while not await asyncio.to_thread(self.cache.acquire_lease, text, self.lease_ttl):
+            cached = await asyncio.to_thread(self.cache.get, text, False)
+            if cached is not None:
+                self._count("cross_process_deduplicated")
+                return cached
+            await asyncio.sleep(min(self.poll_interval, self._remaining(until)))
+        try:
+            cached = await asyncio.to_thread(self.cache.get, text, False)
+            if cached is not None:
+                self._count("cross_process_deduplicated")
+                return cached
+            return await coro_fn()
+        finally:
+            await asyncio.to_thread(self.cache.release_lease, text)
+
+
+def lease_ttl():
+    """lease 만료 시간: 모델 호출이 이보다 오래 걸리면 다른 프로세스도 호출을 시작한다."""
+    return float(os.getenv("LLM_LEASE_TTL", "60"))
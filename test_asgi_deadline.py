@@ -0,0 +1,54 @@
+# test_asgi_deadline.py
+# asgi_app.ado / ado_many 가 llm.do / do_many 처럼 마감 시각을 singleflight 와 모델 호출까지 전달하는지 확인
+#   python -m pytest test_asgi_deadline.py
+
+import asyncio
+import os
+import time
+
+os.environ.setdefault("NUTRITION_CACHE_PATH", "")
+os.environ.setdefault("FOOD_JOB_DB_PATH", "")
+os.environ.setdefault("LLM_BACKEND", "synthetic")
+
+import pytest
+
+import asgi_app
+import llm
+
+RESULT = {"food_name": "김치찌개", "calorie": 255.5, "carbohydrate": 10.0, "protein": 20.0, "fat": 15.0}
+
+
+@pytest.fixture
+def calls(monkeypatch):
+    seen = {"flight": [], "invoke": [], "replies": []}
+    flight_do = asgi_app.nutrition_flight.do
+
+    async def recording_flight_do(text, coro_fn, deadline=None):
+        seen["flight"].append(deadline)
+        return await flight_do(text, coro_fn, deadline)
+
+    async def fake_ainvoke(prompt_value, parse, deadline=None):
+        seen["invoke"].append(deadline)
+        return seen["replies"].pop(0) if seen["replies"] else dict(RESULT)
+
+    monkeypatch.setattr(llm, "known_nutrition", lambda param: None)
+    monkeypatch.setattr(asgi_app.nutrition_flight, "do", recording_flight_do)
+    monkeypatch.setattr(asgi_app, "ainvoke", fake_ainvoke)
+    return seen
+
+
+def test_ado_passes_deadline_to_singleflight_and_model(calls):
+    until = time.monotonic() + 5
+    assert asyncio.run(asgi_app.ado("마감 전달 김치찌개", until)) == RESULT
+    assert calls["flight"] == [until]
+    assert calls["invoke"] == [until]
+
+
+def test_ado_many_fallback_keeps_deadline(calls):
+    # 배치 결과 개수가 맞지 않으면 하나씩 다시 분석: 같은 마감을 그대로 씀
+    until = time.monotonic() + 5
+    calls["replies"].append([])  # 배치 호출이 항목을 하나도 돌려주지 않음
+    results = asyncio.run(asgi_app.ado_many(["마감 전달 라면", "마감 전달 김밥"], until))
+    assert results == [RESULT, RESULT]
+    assert calls["flight"] == [until, until]
+    assert calls["invoke"] == [until, until, until]
@@ -0,0 +1,134 @@
+# test_auth_profile.py
+# 로그인 토큰에 담긴 프로필 (BODY_WEIGHT, RDI ...) 로 /api/nutritional_needs 를 DB 없이 답하고,
+# PUT /api/register 로 프로필을 바꾸면 새 토큰을 돌려주는지 확인 (가짜 커넥션으로):
+#   python -m pytest test_auth_profile.py
+
+import contextlib
+import os
+from decimal import Decimal
+
+os.environ.setdefault("NUTRITION_CACHE_PATH", "")
+os.environ.setdefault("FOOD_JOB_DB_PATH", "")
+os.environ.setdefault("LLM_BACKEND", "synthetic")
+
+import pytest
+
+import app as app_module
+import auth
+import db
+
+USER = {
+    "ID": "profile-user", "PASSWORD": "pw", "BODY_WEIGHT": Decimal("70.50"), "HEIGHT": Decimal("175.00"),
+    "AGE": 30, "GENDER": 1, "ACTIVITY": 3, "RDI": Decimal("2100.00"), "PROFILE_VERSION": 4,
+}
+
+
+class FakeCursor:
+    """execute 마다 준비된 fetchone 결과를 하나씩 돌려줌"""
+
+    def __init__(self, results):
+        self.results = results
+        self.queries = []
+        self.rowcount = 1
+
+    def execute(self, sql, args=None):
+        self.queries.append(sql)
+
+    def fetchone(self):
+        return self.results.pop(0)
+
+
+class FakeConnection:
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    def cursor(self, *args):
+        return contextlib.nullcontext(self._cursor)
+
+    def commit(self):
+        pass
+
+
+@pytest.fixture
+def database(monkeypatch):
+    """database(결과, ...) -> 커서. 인자 없이 부르면 DB 에 가면 실패하는 커넥션"""
+
+    def install(*results):
+        cursor = FakeCursor(list(results))
+
+        @contextlib.contextmanager
+        def fake_connection(*args, **kwargs):
+            if not results:
+                raise AssertionError("unexpected database round trip")
+            yield FakeConnection(cursor)
+
+        monkeypatch.setattr(db, "connection", fake_connection)
+        return cursor
+
+    return install
+
+
+@pytest.fixture
+def client():
+    return app_module.app.test_client()
+
+
+def login(client, database):
+    database(dict(USER))
+    response = client.post("/api/login", json={"id": USER["ID"], "password": "pw"})
+    assert response.status_code == 200
+    return response.get_json()["token"]
+
+
+def test_token_answers_nutritional_needs_without_db(client, database):
+    token = login(client, database)
+    database()  # 이후 DB 에 가면 실패
+    hits = auth.stats()["profile_hits"]
+
+    response = client.get("/api/nutritional_needs", headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 200
+    assert response.get_json() == {"ID": USER["ID"], "BODY_WEIGHT": 70.5, "RDI": 2100.0}
+    assert auth.stats()["profile_hits"] == hits + 1
+
+
+def test_nutritional_needs_without_token_reads_user(client, database):
+    cursor = database((Decimal("70.50"), Decimal("2100.00")))
+    response = client.get("/api/nutritional_needs", query_string={"ID": USER["ID"]})
+    assert response.status_code == 200
+    # DB 에서 읽어도 토큰과 같은 응답
+    assert response.get_json() == {"ID": USER["ID"], "BODY_WEIGHT": 70.5, "RDI": 2100.0}
+    assert len(cursor.queries) == 1
+
+
+def test_profile_update_reissues_token(client, database):
+    token = login(client, database)
+    database(dict(USER), {"RD_PROTEIN": 60, "RD_CARBO": 300, "RD_FAT": 50})
+    response = client.put(
+        "/api/register",
+        json={"id": USER["ID"], "pw": "pw", "bodyweight": 68.0, "height": 175.0, "age": 31,
+              "gender": 1, "activity": 2},
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    assert response.status_code == 200
+    profile = auth.verify_token(response.get_json()["token"])
+    assert profile["BODY_WEIGHT"] == 68.0 and profile["AGE"] == 31 and profile["ACTIVITY"] == 2
+    assert profile["RDI"] == 2100.0
+    assert profile["PROFILE_VERSION"] == USER["PROFILE_VERSION"] + 1
+    assert "PASSWORD" not in profile
+
+    # 새 토큰으로는 바뀐 체중을 DB 없이 답함
+    database()
+    response = client.get("/api/nutritional_needs",
+                          headers={"Authorization": f"Bearer {response.get_json()['token']}"})
+    assert response.get_json()["BODY_WEIGHT"] == 68.0
+
+
+def test_profile_update_without_token_returns_no_token(client, database):
+    database(dict(USER), {"RD_PROTEIN": 60, "RD_CARBO": 300, "RD_FAT": 50})
+    response = client.put(
+        "/api/register",
+        json={"id": USER["ID"], "pw": "pw", "bodyweight": 68.0, "height": 175.0, "age": 31,
+              "gender": 1, "activity": 2},
+    )
+    assert response.status_code == 200
+    assert "token" not in response.get_json()
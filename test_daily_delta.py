@@ -0,0 +1,131 @@
+# test_daily_delta.py
+# food_store 의 USER_NT 증분 갱신 (apply_daily_delta) 이 추가 / 수정 / 삭제 후에도 FOOD 합계와 맞는지 확인
+# FOOD / USER_NT 를 메모리에서 흉내 내는 커서로 실행 (DB 없이):
+#   python -m pytest test_daily_delta.py
+
+import os
+
+os.environ.setdefault("NUTRITION_CACHE_PATH", "")
+
+import pytest
+
+import food_store
+
+USER = "delta-user"
+DAY = "2024-06-01"
+
+
+class FakeCursor:
+    """food_store 의 쿼리 상수만 처리하는 FOOD / USER_NT 모형"""
+
+    def __init__(self):
+        self.food = {}  # (ID, DATE, FOOD_INDEX) -> [FOOD_CH, FOOD_PT, FOOD_FAT, FOOD_KCAL]
+        self.user_nt = {}  # (ID, DATE) -> [CARBO, PROTEIN, FAT, KCAL]
+        self.seq = {}
+        self.deltas = []  # APPLY_DAILY_DELTA_QUERY 로 넘어간 (CARBO, PROTEIN, FAT, KCAL)
+        self.lastrowid = None
+        self.result = None
+
+    def execute(self, sql, args):
+        if sql == food_store.ALLOCATE_FOOD_INDEX_QUERY:
+            user_id, date, first, step = args
+            key = (user_id, date)
+            self.seq[key] = self.seq[key] + step if key in self.seq else first
+            self.lastrowid = self.seq[key]
+        elif sql == food_store.APPLY_DAILY_DELTA_QUERY:
+            user_id, date, *delta, _ = args
+            self.deltas.append(tuple(delta))
+            totals = self.user_nt.setdefault((user_id, date), [0.0, 0.0, 0.0, 0.0])
+            for i, value in enumerate(delta):
+                totals[i] += value
+        elif sql == food_store.SELECT_FOOD_FOR_UPDATE_QUERY:
+            row = self.food.get(tuple(args))
+            self.result = tuple(row) if row is not None else None
+        elif sql == food_store.UPDATE_FOOD_QUERY:
+            _, ch, pt, fat, kcal, *key = args
+            self.food[tuple(key)] = [ch, pt, fat, kcal]
+        elif sql == food_store.DELETE_FOOD_QUERY:
+            del self.food[tuple(args)]
+        elif sql == food_store.BUMP_MONTH_VERSION_QUERY:
+            pass
+        else:
+            raise AssertionError(f"unexpected query: {sql}")
+
+    def executemany(self, sql, rows):
+        assert sql == food_store.INSERT_FOOD_QUERY
+        for user_id, date, food_index, _, ch, pt, fat, kcal in rows:
+            self.food[(user_id, date, food_index)] = [ch, pt, fat, kcal]
+
+    def fetchone(self):
+        return self.result
+
+    def totals(self):
+        return self.user_nt.get((USER, DAY), [0.0, 0.0, 0.0, 0.0])
+
+    def food_sums(self):
+        rows = list(self.food.values()) or [[0.0, 0.0, 0.0, 0.0]]
+        return [sum(value or 0.0 for value in column) for column in zip(*rows)]  # SUM 은 NULL 을 건너뜀
+
+
+def info(name, carbohydrate, protein, fat, calorie):
+    return {"food_name": name, "carbohydrate": carbohydrate, "protein": protein, "fat": fat, "calorie": calorie}
+
+
+@pytest.fixture
+def cursor():
+    return FakeCursor()
+
+
+def test_insert_adds_normalized_values(cursor):
+    food_store.insert_foods(cursor, USER, DAY, [
+        info("비빔밥", "90g", "18 g", "12", "560kcal"),
+        info("김치", "약 5", "500mg", None, "30"),
+    ])
+    # 한 번의 upsert 로 두 음식의 합 (값이 없으면 0)
+    assert cursor.deltas == [(95.0, 18.5, 12.0, 590.0)]
+    assert cursor.totals() == [95.0, 18.5, 12.0, 590.0]
+
+
+def test_update_applies_difference(cursor):
+    food_index = food_store.insert_food(cursor, USER, DAY, info("라면", "80", "10", "16", "500"))
+    assert food_store.update_food(cursor, USER, DAY, food_index, info("라면 반 개", "40", "5.5", "16", "250"))
+    assert cursor.deltas[-1] == (-40.0, -4.5, 0.0, -250.0)
+    assert cursor.totals() == [40.0, 5.5, 16.0, 250.0]
+
+
+def test_update_without_change_skips_upsert(cursor):
+    food_index = food_store.insert_food(cursor, USER, DAY, info("김밥", "60", "8", "6", "320"))
+    assert food_store.update_food(cursor, USER, DAY, food_index, info("김밥 한 줄", "60g", "8g", "6g", "320kcal"))
+    assert len(cursor.deltas) == 1
+
+
+def test_delete_subtracts_stored_values_back_to_zero(cursor):
+    indexes = food_store.insert_foods(cursor, USER, DAY, [
+        info("떡볶이", "10.1", "0.2", "3.3", "100.7"),
+        info("순대", "20.2", "0.1", "6.6", "200.35"),
+    ])
+    food_index = food_store.insert_food(cursor, USER, DAY, info("튀김", "0.7", "1.1", "2.2", "50.05"))
+    assert food_store.update_food(cursor, USER, DAY, food_index, info("튀김 2개", "1.4", "2.2", "4.4", "100.1"))
+
+    for index in [*indexes, food_index]:
+        assert food_store.delete_food(cursor, USER, DAY, index)
+
+    assert cursor.food == {}
+    assert cursor.totals() == pytest.approx([0.0, 0.0, 0.0, 0.0], abs=1e-9)
+
+
+def test_delete_missing_row_changes_nothing(cursor):
+    assert not food_store.delete_food(cursor, USER, DAY, 7)
+    assert cursor.deltas == []
+
+
+def test_totals_follow_food_rows(cursor):
+    indexes = []
+    for n in range(10):
+        indexes.append(food_store.insert_food(cursor, USER, DAY, info(f"음식 {n}", n * 1.25, n, "0.5", n * 33.3)))
+    for n, food_index in enumerate(indexes[::2]):
+        food_store.update_food(cursor, USER, DAY, food_index, info("수정", n, n * 0.75, None, "12.34"))
+    for food_index in indexes[1::3]:
+        food_store.delete_food(cursor, USER, DAY, food_index)
+
+    assert cursor.totals() == pytest.approx(cursor.food_sums(), abs=1e-9)
@@ -0,0 +1,55 @@
+# test_db_pool.py
+# db.py 의 ConnectionPool 재사용 / recycle 동작 확인 (MySQL 없이)
+#   python -m pytest test_db_pool.py
+
+import time
+
+import db
+
+
+class FakeConnection:
+    def __init__(self):
+        self.open = True
+        self.pings = 0
+        self.created_at = time.monotonic()
+
+    def ping(self, reconnect=False):
+        self.pings += 1
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        self.open = False
+
+
+def make_pool(**kwargs):
+    pool = db.ConnectionPool(max_size=2, timeout=1.0, **kwargs)
+    pool._connect = FakeConnection
+    return pool
+
+
+def test_busy_connection_is_recycled_by_age():
+    pool = make_pool(recycle=60, ping_after=30)
+    with pool.connection() as first:
+        pass
+    # 계속 쓰이고 있어 idle 시간은 짧아도, 연결한 지 recycle 초가 지나면 새로 연결
+    first.created_at -= 61
+    with pool.connection() as second:
+        pass
+    assert second is not first
+    assert not first.open
+    assert pool.stats()["recycled"] == 1
+    assert pool.stats()["size"] == 1
+
+
+def test_young_connection_is_reused_and_pinged_after_idle():
+    pool = make_pool(recycle=60, ping_after=0)
+    with pool.connection() as first:
+        pass
+    time.sleep(0.01)
+    with pool.connection() as second:
+        pass
+    assert second is first
+    assert first.pings == 1
+    assert pool.stats()["recycled"] == 0
@@ -0,0 +1,92 @@
+# test_food_index_race.py
+# 동시에 같은 (ID, DATE) 에 음식을 추가해도 FOOD_INDEX 가 겹치지 않는지 실제 MySQL/MariaDB 로 확인
+# .env 의 DB_* 가 가리키는 (로컬/테스트용) DB 에 migrations/ 를 적용한 뒤 실행.
+# DB 에 연결할 수 없거나 FOOD_INDEX_SEQ 가 없으면 skip:
+#   python -m pytest test_food_index_race.py
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+os.environ.setdefault("NUTRITION_CACHE_PATH", "")
+
+import pymysql
+import pytest
+
+import db
+import food_store
+
+USER = "pytest_food_index_race"
+TEST_DATE = "2000-01-01"
+WRITERS = int(os.getenv("TEST_FOOD_INDEX_WRITERS", "32"))
+ADDS = int(os.getenv("TEST_FOOD_INDEX_ADDS", "300"))
+
+
+def execute(sql, args=()):
+    with db.connection() as connection:
+        with connection.cursor() as cursor:
+            cursor.execute(sql, args)
+            rows = cursor.fetchall()
+        connection.commit()
+    return rows
+
+
+def cleanup():
+    with db.connection() as connection:
+        with connection.cursor() as cursor:
+            cursor.execute("DELETE FROM FOOD WHERE ID = %s AND DATE = %s", (USER, TEST_DATE))
+            cursor.execute("DELETE FROM FOOD_INDEX_SEQ WHERE ID = %s AND DATE = %s", (USER, TEST_DATE))
+            cursor.execute("DELETE FROM USER_NT WHERE ID = %s AND DATE = %s", (USER, TEST_DATE))
+            cursor.execute("DELETE FROM USER_MONTH_VERSION WHERE ID = %s", (USER,))
+        connection.commit()
+
+
+@pytest.fixture
+def mysql(monkeypatch):
+    try:
+        execute("SELECT 1 FROM FOOD_INDEX_SEQ LIMIT 1")
+    except pymysql.MySQLError as e:
+        pytest.skip(f"MySQL with migrations/ applied is not available: {e}")
+
+    monkeypatch.setattr(db.pool, "max_size", max(db.pool.max_size, WRITERS))
+    execute(
+        """INSERT IGNORE INTO USER (ID, PASSWORD, BODY_WEIGHT, HEIGHT, AGE, GENDER, ACTIVITY, RDI)
+           VALUES (%s, %s, %s, %s, %s, %s, %s, %s)""",
+        (USER, "pytest", 70, 175, 30, 1, 3, None),
+    )
+    cleanup()
+    yield
+    cleanup()
+
+
+def add_foods(n, count):
+    nutrition_infos = [
+        {"food_name": f"race-{n}-{i}", "calorie": "100", "carbohydrate": "10", "protein": "5", "fat": "2"}
+        for i in range(count)
+    ]
+    with db.connection() as connection:
+        with connection.cursor() as cursor:
+            indexes = food_store.insert_foods(cursor, USER, TEST_DATE, nutrition_infos)
+        connection.commit()
+    return indexes
+
+
+def test_concurrent_writers_never_share_a_food_index(mysql):
+    # 한 개씩 추가하는 요청과 여러 개를 한 번에 추가하는 요청 (/api/add_foods) 을 섞음
+    counts = [1 + n % 3 for n in range(ADDS)]
+    with ThreadPoolExecutor(max_workers=WRITERS) as executor:
+        returned = [index for indexes in executor.map(add_foods, range(ADDS), counts) for index in indexes]
+
+    duplicates = execute(
+        """SELECT ID, DATE, FOOD_INDEX, COUNT(*) FROM FOOD
+           WHERE ID = %s AND DATE = %s
+           GROUP BY ID, DATE, FOOD_INDEX HAVING COUNT(*) > 1""",
+        (USER, TEST_DATE),
+    )
+    assert duplicates == ()
+
+    stored = [row[0] for row in execute(
+        "SELECT FOOD_INDEX FROM FOOD WHERE ID = %s AND DATE = %s ORDER BY FOOD_INDEX", (USER, TEST_DATE)
+    )]
+    # 번호는 겹치지 않고 빈틈도 없음 (롤백이 없으면 카운터가 연속으로 올라감)
+    assert stored == sorted(returned)
+    assert stored == list(range(stored[0], stored[0] + sum(counts)))
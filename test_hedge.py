@@ -0,0 +1,74 @@
+# test_hedge.py
+# hedge.py 의 Hedger / AsyncHedger 동작 확인 (DB / LLM 없이)
+#   python -m pytest test_hedge.py
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+import hedge
+from admission import Admission, Overloaded
+
+
+def make_hedger(cls=hedge.Hedger):
+    # 표본 하나로 바로 hedge 할 수 있게 (지연 10ms, 예산 제한 없음)
+    hedger = cls(min_delay=0.01, min_samples=1, budget=1.0)
+    hedger.record(0.01)
+    return hedger
+
+
+def test_abandoned_attempt_releases_admission_slot():
+    admission = Admission(max_in_flight=2, queue_timeout=1.0)
+    hedger = make_hedger()
+    primary_started = threading.Event()
+    primary_unblocked = threading.Event()
+    primary_finished = threading.Event()
+
+    def attempt(until, hedged):
+        # llm.invoke 와 같은 모양: 자리를 잡고, 결과가 버려지면 자리를 먼저 반납
+        with admission.acquire(timeout=hedge.remaining(until)) as slot:
+            hedge.on_abandon(slot.release)
+            if hedged:
+                return "hedge"
+            primary_started.set()
+            primary_unblocked.wait(5)  # timeout 을 지키지 않는 느린 모델
+        primary_finished.set()
+        return "primary"
+
+    assert hedger.run(attempt, time.monotonic() + 5) == "hedge"
+    assert primary_started.is_set() and not primary_finished.is_set()
+    # 첫 호출은 아직 모델을 기다리는 중이지만 자리는 이미 반납됨
+    assert admission.stats()["in_flight"] == 0
+    assert hedger.stats()["cancelled"] == 1
+
+    primary_unblocked.set()
+    assert primary_finished.wait(5)
+    # 나중에 with 를 빠져나가도 두 번 반납하지 않음
+    assert admission.stats()["in_flight"] == 0
+
+
+def test_primary_error_wins_over_hedge_overload():
+    hedger = make_hedger()
+
+    def attempt(until, hedged):
+        if hedged:
+            raise Overloaded(1, "LLM queue is full")
+        raise ValueError("could not parse model output")
+
+    with pytest.raises(ValueError):
+        hedger.run(attempt, time.monotonic() + 5)
+    assert hedger.stats()["hedged"] == 1
+
+
+def test_async_primary_error_wins_over_hedge_overload():
+    hedger = make_hedger(hedge.AsyncHedger)
+
+    async def attempt(until, hedged):
+        if hedged:
+            raise Overloaded(1, "LLM queue is full")
+        raise ValueError("could not parse model output")
+
+    with pytest.raises(ValueError):
+        asyncio.run(hedger.run(attempt, time.monotonic() + 5))
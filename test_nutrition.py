@@ -0,0 +1,101 @@
+# test_nutrition.py
+# nutrition.parse_amount / normalize 의 경계 값 (Decimal, None, 단위 문자열, 음수 ...)
+#   python -m pytest test_nutrition.py
+
+import math
+from decimal import Decimal
+
+import pytest
+
+import nutrition
+from nutrition import ENERGY, MASS
+
+
+@pytest.mark.parametrize("value, kind, expected", [
+    # DB 에서 읽은 DECIMAL / 숫자
+    (Decimal("12.50"), MASS, 12.5),
+    (Decimal("0.00"), MASS, 0.0),
+    (Decimal("1400"), ENERGY, 1400.0),
+    (12, MASS, 12.0),
+    (12.345678, MASS, 12.35),
+    # 단위 문자열
+    ("1,400kcal", ENERGY, 1400.0),
+    ("약 1,400 kcal", ENERGY, 1400.0),
+    ("2000kJ", ENERGY, 478.01),
+    ("50 g", MASS, 50.0),
+    ("500mg", MASS, 0.5),
+    ("1.5kg", MASS, 1500.0),
+    ("12그램", MASS, 12.0),
+    ("10~12g", MASS, 11.0),
+    ("10-12g", MASS, 11.0),
+    ("10 to 12", MASS, 11.0),
+    ("１２ｇ", MASS, 12.0),  # 전각 숫자/단위 (NFKC)
+    ("12 grams", MASS, 12.0),  # 모르는 단위는 숫자만
+    ("500mg", ENERGY, 500.0),  # 종류가 다른 단위도 숫자만
+    ("0", MASS, 0.0),
+])
+def test_parse_amount(value, kind, expected):
+    assert nutrition.parse_amount(value, kind) == expected
+
+
+@pytest.mark.parametrize("value", [
+    None, "", "   ", "없음", "kcal", True, False,
+    float("nan"), float("inf"), Decimal("NaN"),
+])
+def test_parse_amount_without_number(value):
+    assert nutrition.parse_amount(value) is None
+
+
+@pytest.mark.parametrize("value", [-5, -0.5, Decimal("-12.50"), "-5g", "- 5 g", "약 -12", "-1,400kcal"])
+def test_negative_amounts_are_missing(value):
+    # 음수 영양 값은 잘못된 값: 부호를 떼고 양수로 저장하지 않음
+    assert nutrition.parse_amount(value, ENERGY) is None
+    assert nutrition.amount(value) == 0.0
+
+
+def test_number_and_amount_defaults():
+    assert nutrition.number(None) is None
+    assert nutrition.amount(None) == 0.0
+    assert nutrition.amount("약 12g") == 12.0
+    assert nutrition.number(Decimal("3.10")) == 3.1
+    assert isinstance(nutrition.number(Decimal("3")), float)
+
+
+def test_normalize_converts_fields_and_keeps_others():
+    original = {
+        "food_name": "  김치찌개 ",
+        "calorie": "약 255.5kcal",
+        "carbohydrate": Decimal("10.00"),
+        "protein": "20 g",
+        "fat": None,
+        "source": "kb",
+    }
+    normalized = nutrition.normalize(original)
+    assert normalized == {
+        "food_name": "김치찌개",
+        "calorie": 255.5,
+        "carbohydrate": 10.0,
+        "protein": 20.0,
+        "fat": None,
+        "source": "kb",
+    }
+    # 원본은 그대로
+    assert original["calorie"] == "약 255.5kcal"
+    # 이미 정규화된 값은 다시 해도 같음
+    assert nutrition.normalize(normalized) == normalized
+
+
+def test_normalize_partial_and_invalid_input():
+    # 스트리밍 중 일부 필드만 있는 경우
+    assert nutrition.normalize({"calorie": "-10kcal"}) == {"calorie": None}
+    assert nutrition.normalize({"food_name": None}) == {"food_name": None}
+    assert nutrition.normalize({}) == {}
+    # dict 가 아니면 그대로 (캐시/저장 단계에서 걸러짐)
+    for value in (None, [], "1400kcal"):
+        assert nutrition.normalize(value) is value
+
+
+def test_parse_amount_result_is_finite_float():
+    for value in ("3.14159g", Decimal("99999999.999")):
+        parsed = nutrition.parse_amount(value)
+        assert isinstance(parsed, float) and math.isfinite(parsed)
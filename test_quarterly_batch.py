@@ -0,0 +1,165 @@
+# test_quarterly_batch.py
+# /api/food/quarterly 의 범위 쿼리 경로가 예전 경로 (달마다 get_monthly_data, 날마다 get_daily_totals) 와
+# 바이트 단위로 같은 본문을 내는지 확인 (DB 없이 메모리의 FOOD / USER_NT 행으로)
+#   python -m pytest test_quarterly_batch.py
+
+import calendar
+import contextlib
+import os
+from datetime import date, datetime
+from decimal import Decimal
+
+os.environ.setdefault("NUTRITION_CACHE_PATH", "")
+os.environ.setdefault("FOOD_JOB_DB_PATH", "")
+os.environ.setdefault("LLM_BACKEND", "synthetic")
+
+import pytest
+from flask import jsonify
+
+import app as app_module
+import db
+import food_store
+import http_cache
+import nutrition
+from month_cache import month_cache
+
+USER = "quarterly-user"
+
+# (ID, DATE, FOOD_INDEX, FOOD_NAME, FOOD_PT, FOOD_FAT, FOOD_CH, FOOD_KCAL)
+FOOD = [
+    (USER, date(2023, 12, 1), 1, "떡국", Decimal("12.50"), Decimal("7.00"), Decimal("80.25"), Decimal("450.00")),
+    (USER, date(2023, 12, 31), 1, "잡채", Decimal("8.00"), Decimal("10.10"), Decimal("45.00"), Decimal("320.00")),
+    (USER, date(2024, 1, 15), 1, "김치찌개", Decimal("20.00"), Decimal("15.00"), Decimal("10.00"), Decimal("255.50")),
+    (USER, date(2024, 1, 15), 2, "공깃밥", Decimal("6.00"), Decimal("0.50"), Decimal("65.00"), Decimal("300.00")),
+    (USER, date(2024, 2, 29), 1, "비빔밥", Decimal("18.00"), Decimal("12.00"), Decimal("90.00"), Decimal("560.00")),
+    ("other-user", date(2024, 1, 15), 1, "라면", Decimal("10.00"), Decimal("16.00"), Decimal("80.00"), Decimal("500.00")),
+    (USER, date(2024, 3, 1), 1, "구간 밖", Decimal("1.00"), Decimal("1.00"), Decimal("1.00"), Decimal("1.00")),
+]
+
+# (ID, DATE, CARBO, PROTEIN, FAT, RD_CARBO, RD_PROTEIN, RD_FAT)
+USER_NT = [
+    (USER, datetime(2023, 12, 1), Decimal("80.25"), Decimal("12.50"), Decimal("7.00"),
+     Decimal("300.00"), Decimal("60.00"), Decimal("50.00")),
+    (USER, date(2024, 1, 15), Decimal("75.00"), Decimal("26.00"), Decimal("15.50"),
+     Decimal("300.00"), Decimal("60.00"), Decimal("0.00")),
+    # 같은 날짜의 두 번째 행: 예전 fetchone() 처럼 무시되어야 함
+    (USER, date(2024, 1, 15), Decimal("1.00"), Decimal("1.00"), Decimal("1.00"),
+     Decimal("1.00"), Decimal("1.00"), Decimal("1.00")),
+    (USER, date(2024, 2, 29), Decimal("90.00"), Decimal("18.00"), Decimal("12.00"),
+     Decimal("0.00"), Decimal("0.00"), Decimal("0.00")),
+]
+
+
+class FakeCursor:
+    """FOOD_WINDOW_QUERY / DAILY_TOTALS_WINDOW_QUERY 만 메모리의 행으로 답함"""
+
+    def __init__(self):
+        self.rows = []
+
+    def execute(self, sql, args):
+        user_id, start, end = args
+
+        def in_window(day):
+            day = day.date() if isinstance(day, datetime) else day
+            return start <= day < end
+
+        if sql == food_store.FOOD_WINDOW_QUERY:
+            rows = [row[1:] for row in FOOD if row[0] == user_id and in_window(row[1])]
+            self.rows = sorted(rows, key=lambda row: row[0])
+        elif sql == food_store.DAILY_TOTALS_WINDOW_QUERY:
+            self.rows = [row[1:] for row in USER_NT if row[0] == user_id and in_window(row[1])]
+        else:
+            raise AssertionError(f"unexpected query: {sql}")
+
+    def fetchall(self):
+        return list(self.rows)
+
+    def __iter__(self):
+        return iter(self.rows)
+
+
+class FakeConnection:
+    def cursor(self, *args):
+        return contextlib.nullcontext(FakeCursor())
+
+
+@pytest.fixture
+def fake_db(monkeypatch):
+    @contextlib.contextmanager
+    def fake_connection(*args, **kwargs):
+        yield FakeConnection()
+
+    monkeypatch.setattr(db, "connection", fake_connection)
+    # 버전 조회 / 캐시 적중 없이 매번 DB 경로를 타도록
+    monkeypatch.setattr(app_module, "cached_months",
+                        lambda kind, user_id, months: [(1, None) for _ in months])
+    monkeypatch.setattr(http_cache.response_cache, "get", lambda etag: None)
+    monkeypatch.setattr(month_cache, "set", lambda *args: None)
+
+
+# --- 예전 경로 (월 단위 YEAR()/MONTH() 조회 + 날짜별 USER_NT fetchone) ---
+
+def legacy_daily_totals(user_id, date_str):
+    for row in USER_NT:
+        day = row[1].date() if isinstance(row[1], datetime) else row[1]
+        if row[0] == user_id and day.isoformat() == date_str:
+            return row[2:]
+    return None
+
+
+def legacy_monthly_data(year, month, user_id):
+    results = sorted(
+        (row[1:] for row in FOOD if row[0] == user_id and row[1].year == year and row[1].month == month),
+        key=lambda row: row[0],
+    )
+    num_days = calendar.monthrange(year, month)[1]
+    foods_list = [[] for _ in range(num_days)]
+    percentages_list = [{} for _ in range(num_days)]
+
+    for row in results:
+        day = row[0].day - 1
+        # 값은 지금 응답 형식대로 숫자로 (nutrition.number)
+        food_info = {
+            "food_index": row[1],
+            "food_name": row[2],
+            "protein": nutrition.number(row[3]),
+            "fat": nutrition.number(row[4]),
+            "carbohydrates": nutrition.number(row[5]),
+            "calories": nutrition.number(row[6])
+        }
+        foods_list[day].append(food_info)
+
+    for day in range(num_days):
+        date_str = f"{year}-{str(month).zfill(2)}-{str(day+1).zfill(2)}"
+        daily_totals = legacy_daily_totals(user_id, date_str)
+        if daily_totals:
+            carb_total, protein_total, fat_total, rd_carb, rd_protein, rd_fat = daily_totals
+            percentages_list[day] = {
+                "carbohydrates_percentage": round((carb_total / rd_carb) * 100, 1) if rd_carb > 0 else 0,
+                "protein_percentage": round((protein_total / rd_protein) * 100, 1) if rd_protein > 0 else 0,
+                "fat_percentage": round((fat_total / rd_fat) * 100, 1) if rd_fat > 0 else 0
+            }
+
+    return {"foods": foods_list, "percentages": percentages_list}
+
+
+def legacy_quarterly(year, start_month, user_id):
+    quarterly_data = {}
+    for i in range(-1, 2):
+        month = (start_month + i - 1) % 12 + 1
+        current_year = year + (start_month + i - 1) // 12
+        quarterly_data[f"{current_year}-{str(month).zfill(2)}"] = legacy_monthly_data(current_year, month, user_id)
+    return quarterly_data
+
+
+@pytest.mark.parametrize("year, month", [(2024, 1), (2024, 2), (2024, 12)])
+def test_quarterly_matches_per_day_path_byte_for_byte(fake_db, year, month):
+    flask_app = app_module.app
+    with flask_app.app_context():
+        expected = jsonify(legacy_quarterly(year, month, USER)).get_data()
+
+    response = flask_app.test_client().post(
+        "/api/food/quarterly", json={"year": year, "month": month, "UID": USER}
+    )
+    assert response.status_code == 200
+    assert response.get_data() == expected
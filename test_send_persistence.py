@@ -0,0 +1,93 @@
+# test_send_persistence.py
+# /api/send 의 FOOD 저장 여부: 일반 (JSON) 응답은 기본적으로 저장하지 않고 (SEND_SAVES_TO_DB=1 이면 저장),
+# SSE 모드는 결과가 나오면 한 번 저장
+# DB / Azure 없이 synthetic 모델과 가짜 커넥션으로 실행:
+#   python -m pytest test_send_persistence.py
+
+import contextlib
+import json
+import os
+
+# LLM 결과 캐시 / 작업 상태를 디스크에 남기지 않음, Azure 설정 없이 불러오기
+os.environ.setdefault("NUTRITION_CACHE_PATH", "")
+os.environ.setdefault("FOOD_JOB_DB_PATH", "")
+os.environ.setdefault("LLM_BACKEND", "synthetic")
+
+import pytest
+
+import app as app_module
+import db
+import food_store
+
+
+class FakeConnection:
+    def __init__(self):
+        self.commits = 0
+
+    def cursor(self, *args):
+        return contextlib.nullcontext(object())
+
+    def commit(self):
+        self.commits += 1
+
+
+@pytest.fixture
+def inserted(monkeypatch):
+    rows = []
+    connection = FakeConnection()
+
+    @contextlib.contextmanager
+    def fake_connection(*args, **kwargs):
+        yield connection
+
+    def fake_insert_food(cursor, user_id, date, nutrition_info):
+        rows.append((user_id, date, nutrition_info["food_name"]))
+        return len(rows)
+
+    monkeypatch.setattr(db, "connection", fake_connection)
+    monkeypatch.setattr(food_store, "insert_food", fake_insert_food)
+    return rows
+
+
+def events(body):
+    """SSE 본문 -> [(event, data), ...]"""
+    parsed = []
+    for block in body.strip().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.split("\n"))
+        parsed.append((fields["event"], json.loads(fields["data"])))
+    return parsed
+
+
+def test_json_mode_does_not_save(inserted):
+    client = app_module.app.test_client()
+    response = client.post("/api/send", json={"user_id": "u1", "food_name": "저장 안 함 테스트 비빔밥"})
+    assert response.status_code == 200
+    assert response.get_json()["food_name"]
+    assert inserted == []
+
+
+def test_json_mode_saves_when_enabled(inserted, monkeypatch):
+    # 예전 send.py 서버의 동작 (python send.py 는 기본으로 켬)
+    monkeypatch.setattr(app_module, "SEND_SAVES_TO_DB", True)
+    client = app_module.app.test_client()
+    response = client.post("/api/send", json={"user_id": "u1", "food_name": "바로 저장 테스트 된장찌개"})
+    assert response.status_code == 200
+    result = response.get_json()
+    assert "FOOD_INDEX" not in result  # 응답 본문은 저장하지 않을 때와 같음
+    assert len(inserted) == 1
+    assert inserted[0][0] == "u1" and inserted[0][2] == result["food_name"]
+
+
+def test_sse_mode_saves_once(inserted):
+    client = app_module.app.test_client()
+    response = client.post("/api/send?events=1", json={"user_id": "u1", "food_name": "저장 테스트 김치찌개"})
+    assert response.status_code == 200
+    assert response.mimetype == "text/event-stream"
+
+    received = events(response.get_data(as_text=True))
+    name, result = received[-1]
+    assert name == "result"
+    assert len(inserted) == 1
+    user_id, day, food_name = inserted[0]
+    assert user_id == "u1" and food_name == result["food_name"]
+    assert result["DATE"] == day.isoformat() and result["FOOD_INDEX"] == 1
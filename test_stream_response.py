@@ -0,0 +1,135 @@
+# test_stream_response.py
+# ?stream=1 (server-side cursor 로 조각을 내보내는 응답) 본문이 일반 응답 본문과 바이트 단위로 같은지 확인
+# DB 없이 메모리의 FOOD / USER_NT 행으로:
+#   python -m pytest test_stream_response.py
+
+import contextlib
+import os
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+os.environ.setdefault("NUTRITION_CACHE_PATH", "")
+os.environ.setdefault("FOOD_JOB_DB_PATH", "")
+os.environ.setdefault("LLM_BACKEND", "synthetic")
+
+import pytest
+
+import app as app_module
+import db
+import food_store
+import http_cache
+from month_cache import month_cache
+
+USER = "stream-user"
+
+
+def food_rows():
+    """(ID, DATE, FOOD_INDEX, FOOD_NAME, FOOD_PT, FOOD_FAT, FOOD_CH, FOOD_KCAL)"""
+    rows = []
+    day = date(2023, 12, 30)
+    # 며칠 건너뛰며 하루 여러 개: 빈 날, 월말, 해 넘김, 값이 없는 (대기 중인) 행 포함
+    while day < date(2024, 2, 10):
+        for n in range(day.day % 4):
+            pending = n == 2
+            rows.append((
+                USER, day, n + 1, f"음식 \"{n}\" / {day.isoformat()}",
+                None if pending else Decimal(f"{n}.25"),
+                None if pending else Decimal("3.00"),
+                None if pending else Decimal(f"{day.day}.5"),
+                None if pending else Decimal(f"{100 + n}.75"),
+            ))
+        day += timedelta(days=1)
+    return rows
+
+
+# 테스트마다 바꿀 수 있게 dict 에 둠
+DATA = {"food": food_rows(), "iterated": 0}
+
+# (ID, DATE, CARBO, PROTEIN, FAT, RD_CARBO, RD_PROTEIN, RD_FAT)
+USER_NT = [
+    (USER, datetime(2024, 1, day), Decimal(f"{day}.5"), Decimal("12.25"), Decimal("3.00"),
+     Decimal("300.00"), Decimal("60.00") if day % 2 else Decimal("0.00"), Decimal("50.00"))
+    for day in range(1, 32, 3)
+]
+
+
+class FakeCursor:
+    """FOOD_WINDOW_QUERY / DAILY_TOTALS_WINDOW_QUERY 만 메모리의 행으로 답함 (SSCursor 처럼 순회도 가능)"""
+
+    def __init__(self):
+        self.rows = []
+
+    def execute(self, sql, args):
+        user_id, start, end = args
+
+        def in_window(day):
+            day = day.date() if isinstance(day, datetime) else day
+            return start <= day < end
+
+        if sql == food_store.FOOD_WINDOW_QUERY:
+            rows = [row[1:] for row in DATA["food"] if row[0] == user_id and in_window(row[1])]
+            self.rows = sorted(rows, key=lambda row: row[0])
+        elif sql == food_store.DAILY_TOTALS_WINDOW_QUERY:
+            self.rows = [row[1:] for row in USER_NT if row[0] == user_id and in_window(row[1])]
+        else:
+            raise AssertionError(f"unexpected query: {sql}")
+
+    def fetchall(self):
+        return list(self.rows)
+
+    def __iter__(self):
+        DATA["iterated"] += 1
+        return iter(self.rows)
+
+
+class FakeConnection:
+    def cursor(self, *args):
+        return contextlib.nullcontext(FakeCursor())
+
+
+@pytest.fixture
+def client(monkeypatch):
+    @contextlib.contextmanager
+    def fake_connection(*args, **kwargs):
+        yield FakeConnection()
+
+    monkeypatch.setattr(db, "connection", fake_connection)
+    # 버전 조회 / 캐시 적중 없이 매번 DB 경로를 타도록
+    monkeypatch.setattr(app_module, "cached_months",
+                        lambda kind, user_id, months: [(1, None) for _ in months])
+    monkeypatch.setattr(http_cache.response_cache, "get", lambda etag: None)
+    monkeypatch.setattr(month_cache, "set", lambda *args: None)
+    monkeypatch.setitem(DATA, "iterated", 0)
+    return app_module.app.test_client()
+
+
+def bodies(client, path, params):
+    buffered = client.get(path, query_string=params)
+    streamed = client.get(path, query_string={**params, "stream": "1"})
+    assert buffered.status_code == streamed.status_code == 200
+    assert buffered.mimetype == streamed.mimetype == "application/json"
+    # 스트리밍 경로만 fetchall 대신 커서를 순회함
+    assert DATA["iterated"] == 1
+    return buffered.get_data(), streamed.get_data()
+
+
+@pytest.mark.parametrize("year, month", [(2023, 12), (2024, 1), (2024, 2), (2024, 3)])
+def test_monthly_stream_matches_buffered(client, year, month):
+    buffered, streamed = bodies(client, "/api/monthly", {"year": year, "month": month, "UID": USER})
+    assert streamed == buffered
+
+
+@pytest.mark.parametrize("year, month", [(2024, 1), (2024, 2), (2024, 4), (2023, 12)])
+def test_quarterly_stream_matches_buffered(client, year, month):
+    buffered, streamed = bodies(client, "/api/food/quarterly", {"year": year, "month": month, "UID": USER})
+    assert streamed == buffered
+
+
+def test_stream_is_written_in_chunks(client, monkeypatch):
+    # 조각이 모여 여러 번에 나눠 나가도 이어 붙인 본문은 같음
+    many = [(USER, date(2024, 1, 1 + n % 31), n, "비빔밥" * 20, Decimal("1.00"), Decimal("2.00"),
+             Decimal("3.00"), Decimal("4.00")) for n in range(1, 2001)]
+    monkeypatch.setitem(DATA, "food", many)
+    buffered, streamed = bodies(client, "/api/food/quarterly", {"year": 2024, "month": 1, "UID": USER})
+    assert len(buffered) > 4 * http_cache.STREAM_CHUNK_SIZE
+    assert streamed == buffered
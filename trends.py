@@ -0,0 +1,206 @@
+# trends.py
+# 장기 영양 추세 (/api/trends)
+#   USER_NT 일별 합계를 범위 쿼리 한 번으로 읽어 pandas 로 한꺼번에 계산한다.
+#   - 날짜별 탄수화물/단백질/지방/칼로리 합계와 권장섭취량 대비 % (기록이 없는 날은 null)
+#   - 7일 / 30일 이동 평균 (기록한 날만 평균)
+#   - 연속 기록일, 연속 목표 달성일 (세 영양소 모두 TARGET_LOW ~ TARGET_HIGH %)
+#
+# 응답은 날짜 배열과 같은 길이의 열(column) 배열로 돌려준다 (수년치도 키 반복 없이 작게).
+# pandas 는 처음 요청할 때 import 한다 (app 을 불러오는 것만으로는 로드하지 않음, bench/import_time.py).
+#
+# GET /api/trends?ID=<user>&start=2020-01-01&end=2024-12-31   (start/end 포함, 기본: 오늘까지 90일)
+# 벤치마크: python bench/trends.py
+
+from flask import Blueprint, current_app, request, jsonify
+from datetime import date, timedelta
+from dotenv import load_dotenv
+import logging
+import os
+import pymysql
+import auth
+import db
+import food_store
+import http_cache
+from http_cache import response_cache
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# app.create_app() 에서 등록
+trends_api = Blueprint("trends", __name__)
+
+MAX_DAYS = int(os.getenv("TRENDS_MAX_DAYS", str(366 * 10)))
+DEFAULT_DAYS = 90
+TARGET_LOW = 80
+TARGET_HIGH = 120
+WINDOWS = (7, 30)
+
+TRENDS_QUERY = """
+SELECT DATE, CARBO, PROTEIN, FAT, KCAL, RD_CARBO, RD_PROTEIN, RD_FAT
+FROM USER_NT
+WHERE ID = %s AND DATE >= %s AND DATE < %s
+ORDER BY DATE
+"""
+COLUMNS = ("DATE", "CARBO", "PROTEIN", "FAT", "KCAL", "RD_CARBO", "RD_PROTEIN", "RD_FAT")
+
+# 응답 키 (app.food_item / daily_percentages 와 같은 이름)
+TOTALS = {
+    "carbohydrates": "CARBO",
+    "protein": "PROTEIN",
+    "fat": "FAT",
+    "calories": "KCAL",
+}
+PERCENTAGES = {
+    "carbohydrates_percentage": ("CARBO", "RD_CARBO"),
+    "protein_percentage": ("PROTEIN", "RD_PROTEIN"),
+    "fat_percentage": ("FAT", "RD_FAT"),
+}
+
+
+def parse_range(args, today=None):
+    """(start, end) date (둘 다 포함). 잘못된 입력이면 ValueError"""
+    today = today or date.today()
+    end = date.fromisoformat(args["end"]) if args.get("end") else today
+    start = date.fromisoformat(args["start"]) if args.get("start") else end - timedelta(days=DEFAULT_DAYS - 1)
+    if start > end:
+        raise ValueError("start must not be after end")
+    if (end - start).days + 1 > MAX_DAYS:
+        raise ValueError(f"Date range is limited to {MAX_DAYS} days")
+    return start, end
+
+
+def range_months(start, end):
+    """[start, end] 에 걸친 각 월의 1일 (데이터 버전 / ETag 용)"""
+    months = []
+    month = date(start.year, start.month, 1)
+    while month <= end:
+        months.append(month)
+        month = date(month.year + month.month // 12, month.month % 12 + 1, 1)
+    return months
+
+
+def fetch_daily_totals(user_id, start, end):
+    with db.connection() as connection, connection.cursor() as cursor:
+        cursor.execute(TRENDS_QUERY, (user_id, start, end + timedelta(days=1)))
+        return cursor.fetchall()
+
+
+def streaks(flags):
+    """bool 배열의 연속 구간: (현재 = 마지막 날에서 끝나는 구간 길이, 최장 길이, 최장 구간 시작 위치)"""
+    import numpy as np
+
+    edges = np.diff(np.concatenate(([0], flags.astype(np.int8), [0])))
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+    if not len(starts):
+        return 0, 0, None
+    lengths = ends - starts
+    best = int(np.argmax(lengths))  # 길이가 같으면 먼저 나온 구간
+    current = int(lengths[-1]) if ends[-1] == len(flags) else 0
+    return current, int(lengths[best]), int(starts[best])
+
+
+def _column(series):
+    """NaN -> None, 소수 첫째 자리"""
+    values = series.round(1).astype(object)
+    return values.where(series.notna(), None).tolist()
+
+
+def _streak(flags, dates):
+    current, longest, first = streaks(flags)
+    return {
+        "current": current,
+        "longest": longest,
+        "longest_start": dates[first] if first is not None else None,
+        "longest_end": dates[first + longest - 1] if first is not None else None,
+    }
+
+
+def build_trends(rows, start, end):
+    """
+    USER_NT 행 (COLUMNS 순서, 날짜순) 으로 [start, end] 의 추세를 계산.
+    같은 날짜에 행이 여러 개면 app.index_daily_totals 처럼 첫 행만 사용한다.
+    """
+    import numpy as np
+    import pandas as pd
+
+    frame = pd.DataFrame.from_records(list(rows), columns=COLUMNS)
+    frame["DATE"] = pd.to_datetime(frame["DATE"]).dt.normalize()
+    frame = frame.drop_duplicates("DATE").set_index("DATE")
+    days = pd.date_range(start, end, freq="D")
+    daily = frame.astype("float64").reindex(days)
+
+    # 음식을 모두 지워 합계가 0 이 된 행은 기록이 없는 날로 봄
+    logged = daily[list(TOTALS.values())].fillna(0).gt(0).any(axis=1)
+    daily = daily.where(logged, axis=0)
+    series = {}
+    for key, column in TOTALS.items():
+        series[key] = daily[column]
+    for key, (column, rd_column) in PERCENTAGES.items():
+        rd = daily[rd_column]
+        # daily_percentages 와 같게: 권장량이 0 이하면 0
+        series[key] = (daily[column] / rd.where(rd > 0) * 100).where(rd > 0, 0.0).where(logged)
+
+    values = pd.DataFrame(series, index=days)
+    dates = days.strftime("%Y-%m-%d").tolist()
+    result = {
+        "start": start.isoformat(),
+        "end": end.isoformat(),
+        "days": len(days),
+        "logged_days": int(logged.sum()),
+        "dates": dates,
+        "daily": {key: _column(values[key]) for key in values},
+    }
+    for window in WINDOWS:
+        # 기록이 없는 날은 평균에서 빠지고, 창 안에 기록이 하나도 없으면 null
+        rolling = values.rolling(window, min_periods=1).mean()
+        result[f"rolling_{window}"] = {key: _column(rolling[key]) for key in rolling}
+
+    percentages = values[list(PERCENTAGES)].to_numpy()
+    on_target = logged.to_numpy() & np.all((percentages >= TARGET_LOW) & (percentages <= TARGET_HIGH), axis=1)
+    result["streaks"] = {
+        "logged": _streak(logged.to_numpy(), dates),
+        "on_target": _streak(on_target, dates),
+    }
+    averages = values[logged].mean()
+    result["averages"] = {key: (round(float(averages[key]), 1) if logged.any() else None) for key in values}
+    return result
+
+
+def preload():
+    """pandas import 를 지금 한다 (gunicorn preload 모드에서 fork 전에)"""
+    import pandas  # noqa: F401
+
+
+@trends_api.route("/api/trends", methods=["GET"])
+def get_trends():
+    user_id = auth.user_id(request.args.get("ID"))
+    if not user_id:
+        return jsonify({"error": "ID is required"}), 400
+    try:
+        start, end = parse_range(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    try:
+        with db.connection() as connection, connection.cursor() as cursor:
+            versions = food_store.month_versions(cursor, user_id, range_months(start, end))
+        etag = http_cache.make_etag("trends", user_id, start, end, *versions)
+        if http_cache.is_fresh(request, etag):
+            return http_cache.not_modified_response(current_app.response_class, etag)
+        body = response_cache.get(etag)
+        if body is None:
+            result = build_trends(fetch_daily_totals(user_id, start, end), start, end)
+            body = http_cache.render_json(current_app.json, result)
+            response_cache.set(etag, body)
+        return http_cache.json_response(current_app.response_class, current_app.json, body, etag)
+    except pymysql.MySQLError as e:
+        logger.error("Database error: %s", e)
+        return jsonify({"error": "Database error"}), 500
+
+
+if __name__ == '__main__':
+    from app import create_app
+
+    create_app().run(debug=True)